@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: loading a year of sessions (n_sessions simulated P003e sessions)
+from the data .csv files vs. their .columns copies (p003_engine/columnar.py).
+
+"Loading" means getting every session's SessionTime (seconds) and Xcord
+(pixels, "NA" dropped) as numbers, then the mean peck x over the year.
+Also reports disk space, conversion time, and checks that every .columns
+file gives back its .csv byte for byte.
+
+Files written before the engine don't match their headers, so the same
+checks are run on sessions rewritten in those layouts (legacy_session()),
+and archive_paths() has to list them all: P003e (a HiddenPatch header but
+13 values per row) and P003Fb (12 header names, 13 values per row, the
+hidden patch before the date).
+
+    python benchmarks/bench_columnar.py [n_sessions]
+"""
+from csv import QUOTE_MINIMAL, reader, writer
+from os import path as os_path
+from sys import argv, path as sys_path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+repo_folder = os_path.dirname(os_path.dirname(os_path.abspath(__file__)))
+sys_path.insert(0, repo_folder)
+import numpy as np
+from p003_engine.columnar import (ColumnarSession, archive_paths, convert, convert_folder,
+                                  load_events, parse_session_time)
+from p003_engine.event_log import missing_coord
+from p003_engine.simulation import PoissonPecker, load_experiment, run_session
+
+
+def legacy_session(csv_path, layout):
+    # Rewrites a session .csv the way the experiment scripts wrote it before
+    # the engine: "P003e" adds HiddenPatch to the header only, "P003Fb"
+    # writes the hidden patch ("NA") before the date without naming it
+    with open(csv_path, newline='') as data_file:
+        rows = list(reader(data_file))
+    if layout == "P003e":
+        rows[0] = rows[0] + ["HiddenPatch"]
+    else:
+        rows[1:] = [row[:-1] + ["NA", row[-1]] for row in rows[1:]]
+    with open(csv_path, 'w', newline='') as data_file:
+        writer(data_file, quoting=QUOTE_MINIMAL).writerows(rows)
+    return csv_path
+
+
+def check_legacy(data_folder):
+    # Both legacy layouts convert, give back their .csv exactly and are
+    # listed by archive_paths() with their pecks where they belong
+    sessions = [("P003e/P003E_ExpProgram_RP.py", "Jagger", "RR5", "P003e"),
+                ("P003Fb/P003Fb_ExpProgram_RP.py", "Herriot", "INS", "P003Fb")]
+    csv_paths = []
+    for script, subject, condition, layout in sessions:
+        screen = run_session(load_experiment(os_path.join(repo_folder, script)), subject,
+                             condition, data_folder = data_folder, seed = 0)
+        csv_paths.append(legacy_session(screen.session_writer.file_path, layout))
+        with open(csv_paths[-1], newline='') as data_file:
+            header, first_row = next(reader(data_file)), next(reader(data_file))
+        print(f"{layout:>8} legacy layout: {len(header)} header names, "
+              f"{len(first_row)} values per row")
+    converted, skipped, failed = convert_folder(data_folder, workers = 1)
+    assert (converted, failed) == (len(sessions), []), (converted, failed)
+    columnar_paths = archive_paths(data_folder, workers = 1)
+    assert len(columnar_paths) == len(sessions), columnar_paths
+    for csv_path, columnar_path in zip(sorted(csv_paths), sorted(columnar_paths)):
+        with ColumnarSession(columnar_path) as session:
+            back_path = columnar_path + ".csv"
+            session.to_csv(back_path)
+            assert session.kind("Date") == "date", columnar_path
+            if "HiddenPatch" in session.header_list: # P003Fb's unnamed column
+                assert set(session.values("HiddenPatch")) == {"NA"}, columnar_path
+        with open(csv_path, "rb") as original, open(back_path, "rb") as back:
+            assert original.read() == back.read(), csv_path
+    data, labels = load_events(columnar_paths, ["key_peck"])
+    assert sorted(labels["subject"]) == ["Herriot", "Jagger"]
+    assert len(data["x"]) and not np.isnan(data["x"]).any()
+    print(f"{'':>8} both listed by archive_paths() and give back their .csv exactly\n")
+
+
+def load_csv(csv_paths):
+    total, count = 0, 0
+    for csv_path in csv_paths:
+        with open(csv_path, newline='') as data_file:
+            rows = reader(data_file)
+            header = next(rows)
+            time_column, x_column = header.index("SessionTime"), header.index("Xcord")
+            session_times, x = [], []
+            for row in rows:
+                session_times.append(parse_session_time(row[time_column]))
+                if row[x_column] != "NA":
+                    x.append(int(row[x_column]))
+        total += sum(x)
+        count += len(x)
+    return total / count
+
+
+def load_columnar(columnar_paths):
+    total, count = 0, 0
+    for columnar_path in columnar_paths:
+        with ColumnarSession(columnar_path) as session:
+            session_times = np.asarray(session.column("SessionTime"))
+            x = np.asarray(session.column("Xcord"))
+            x = x[x != missing_coord]
+            total += int(x.sum())
+            count += len(x)
+            del session_times, x # Release the views before the file is closed
+    return total / count
+
+
+def main(n_sessions=365):
+    with TemporaryDirectory() as data_folder:
+        check_legacy(data_folder)
+
+    screen_class = load_experiment(os_path.join(repo_folder, "P003e/P003E_ExpProgram_RP.py"))
+    with TemporaryDirectory() as data_folder:
+        csv_paths = []
+        for seed in range(n_sessions):
+            screen = run_session(screen_class, "Jagger", "RR5", PoissonPecker(rate = 1.5),
+                                 data_folder = os_path.join(data_folder, str(seed)), seed = seed)
+            csv_paths.append(screen.session_writer.file_path)
+
+        t0 = perf_counter()
+        columnar_paths = [convert(csv_path) for csv_path in csv_paths]
+        convert_s = perf_counter() - t0
+
+        for csv_path, columnar_path in zip(csv_paths, columnar_paths):
+            with ColumnarSession(columnar_path) as session:
+                back_path = columnar_path + ".csv"
+                session.to_csv(back_path)
+            with open(csv_path, "rb") as original, open(back_path, "rb") as back:
+                assert original.read() == back.read(), csv_path
+
+        csv_mb = sum(os_path.getsize(path) for path in csv_paths) / 1e6
+        columnar_mb = sum(os_path.getsize(path) for path in columnar_paths) / 1e6
+
+        t0 = perf_counter()
+        csv_mean = load_csv(csv_paths)
+        csv_s = perf_counter() - t0
+        t0 = perf_counter()
+        columnar_mean = load_columnar(columnar_paths)
+        columnar_s = perf_counter() - t0
+        assert csv_mean == columnar_mean
+
+    print(f"{n_sessions} sessions, converted in {convert_s:.2f} s; "
+          f"every .columns file gives back its .csv exactly\n")
+    print(f"{'Format':>8} | {'MB on disk':>10} | {'load s':>7}")
+    print(f"{'.csv':>8} | {csv_mb:>10.1f} | {csv_s:>7.3f}")
+    print(f"{'.columns':>8} | {columnar_mb:>10.1f} | {columnar_s:>7.3f}")
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:2]])
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simulation: time the Tkinter thread spends echoing a burst of pecks to a
+slow terminal, with a print() per peck vs. ConsoleEcho.
+
+The terminal is a stand-in stream where every write takes write_ms plus
+a little per character (like the Pi's framebuffer console or an SSH
+session). Reports the mean and worst time a peck handler is held up.
+
+    python benchmarks/bench_console.py [n_pecks] [write_ms]
+"""
+from datetime import timedelta
+from os import path as os_path
+from statistics import mean
+from sys import argv, path as sys_path
+from time import perf_counter, sleep
+
+sys_path.insert(0, os_path.dirname(os_path.dirname(os_path.abspath(__file__))))
+from p003_engine.console import ConsoleEcho
+
+
+class SlowTerminal(object):
+    def __init__(self, write_ms):
+        self.write_s = write_ms / 1000
+        self.lines = 0
+
+    def write(self, text):
+        sleep(self.write_s + len(text) * 1e-6)
+        self.lines += text.count("\n")
+
+    def flush(self):
+        pass
+
+
+def main(n_pecks=500, write_ms=2.0):
+    print(f"{'Echo':>21} | {'mean us/peck':>12} | {'max us/peck':>11} | {'lines':>6}")
+    for label, verbosity in [("print per peck", None), ("ConsoleEcho", "events"),
+                             ("ConsoleEcho", "summary")]:
+        terminal = SlowTerminal(write_ms)
+        console = None if verbosity is None else ConsoleEcho(verbosity, 20, terminal)
+        held = []
+        for i in range(n_pecks):
+            session_time = i * 0.005 # A 200 pecks/s burst
+            t0 = perf_counter()
+            if console is None:
+                print(f"{'key_peck':>30} | x: {500: ^3} y: {380:^3} | {'PAV':^5} | "
+                      f"{timedelta(seconds = session_time)}", file = terminal)
+            else:
+                console.event("key_peck", 500, 380, "PAV", session_time)
+            held.append(perf_counter() - t0)
+            sleep(0.001)
+        if console is not None:
+            console.close()
+        name = label if verbosity is None else f"{label} ({verbosity})"
+        print(f"{name:>21} | {mean(held) * 1e6:>12.1f} | {max(held) * 1e6:>11.1f} | "
+              f"{terminal.lines:>6}")
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:2]], *[float(a) for a in argv[2:3]])
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: memory held by a session's data matrix as the old list of lists
+vs. the columnar EventLog, plus the cost of writing each to .csv.
+
+Fills both with the same simulated high-rate session (n_events pecks over
+180 trials), measures what they hold with tracemalloc, then writes both
+through SessionWriter and checks the two .csv files are identical.
+
+    python benchmarks/bench_event_log.py [n_events]
+"""
+from datetime import date, timedelta
+from filecmp import cmp
+from os import path as os_path
+from random import choice, randint, random, seed
+from sys import argv, path as sys_path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import tracemalloc
+
+sys_path.insert(0, os_path.dirname(os_path.dirname(os_path.abspath(__file__))))
+from p003_engine.event_log import EventLog
+from p003_engine.session_writer import SessionWriter
+
+header_list = ["SessionTime", "Xcord", "Ycord", "Event", "TrialTime",
+               "TrialType", "TargetPeckNum", "BackgroundPeckNum",
+               "TrialNum", "TrialColor", "Subject", "ExpPhase", "Date"]
+
+
+def simulated_events(n_events, n_trials=180):
+    # The values write_data() would collect for each event of a session
+    seed(1234)
+    trial_types = ["PAV", "INS", "OMS"]
+    colors = {"PAV": "#2C9006", "INS": "#F81607", "OMS": "#FF8300"}
+    now = 0.0
+    key_pecks = background_pecks = 0
+    for i in range(n_events):
+        trial = 1 + i * n_trials // n_events
+        trial_type = trial_types[trial % 3]
+        now = round(now + random() * 0.4, 6)
+        outcome = choice(["key_peck", "key_peck", "background_peck", "ITI_peck"])
+        if outcome == "key_peck":
+            key_pecks += 1
+        else:
+            background_pecks += 1
+        yield [now, randint(0, 1023), randint(0, 767), outcome,
+               round(random() * 10, 5), trial_type, key_pecks,
+               background_pecks, trial, colors[trial_type], "Jagger", "RR5",
+               date.today()]
+
+
+def legacy_row(values):
+    # The old matrix row: SessionTime already a string
+    row = list(values)
+    row[0] = str(timedelta(seconds = row[0]))
+    return row
+
+
+def measure(build):
+    tracemalloc.start()
+    t0 = perf_counter()
+    frame = build()
+    seconds = perf_counter() - t0
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return frame, held, seconds
+
+
+def main(n_events=50000):
+    def build_legacy():
+        frame = [list(header_list)]
+        for values in simulated_events(n_events):
+            frame.append(legacy_row(values))
+        return frame
+
+    def build_columnar():
+        frame = EventLog(header_list)
+        for values in simulated_events(n_events):
+            frame.append(values)
+        return frame
+
+    legacy, legacy_bytes, legacy_s = measure(build_legacy)
+    columnar, columnar_bytes, columnar_s = measure(build_columnar)
+
+    with TemporaryDirectory() as temp_folder:
+        timings = []
+        for name, frame in [("legacy", legacy), ("columnar", columnar)]:
+            writer = SessionWriter(os_path.join(temp_folder, f"{name}.csv"))
+            t0 = perf_counter()
+            writer.flush(frame)
+            writer.close()
+            timings.append(perf_counter() - t0)
+        identical = cmp(os_path.join(temp_folder, "legacy.csv"),
+                        os_path.join(temp_folder, "columnar.csv"), shallow=False)
+
+    print(f"{n_events} events")
+    print(f"{'Matrix':>9} | {'MB held':>8} | {'bytes/event':>11} | {'append us':>9} | {'csv ms':>7}")
+    for name, held, seconds, write_s in [
+            ("list", legacy_bytes, legacy_s, timings[0]),
+            ("EventLog", columnar_bytes, columnar_s, timings[1])]:
+        print(f"{name:>9} | {held / 1e6:>8.2f} | {held / n_events:>11.1f} | "
+              f"{seconds / n_events * 1e6:>9.2f} | {write_s * 1000:>7.1f}")
+    print(f"Memory: {legacy_bytes / columnar_bytes:.1f}x smaller")
+    if not identical:
+        raise SystemExit("ERROR: the two .csv files differ")
+    print("Both matrices write identical .csv files.")
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:2]])
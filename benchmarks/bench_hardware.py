@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simulation: time the Tkinter thread spends on hopper/light commands when
+they are sent directly vs. through OperantBox's HardwareQueue.
+
+No pigpio needed: the board is a stand-in whose calls each take
+round_trip_ms (the socket round trip to pigpiod). Reports, per call of
+reinforce()/reset()/house_light(), the time the caller is blocked and,
+for the queue, the issue-to-acknowledge latency from its log. Also times
+shutdown(), which used to block the GUI for over a second.
+
+    python benchmarks/bench_hardware.py [round_trip_ms] [n_trials]
+"""
+from os import path as os_path
+from statistics import mean
+from sys import argv, path as sys_path
+from time import perf_counter, sleep
+
+sys_path.insert(0, os_path.dirname(os_path.dirname(os_path.abspath(__file__))))
+from p003_engine.hardware import HardwareQueue, OperantBox
+
+
+class SimulatedBoard(object):
+    def __init__(self, round_trip_ms):
+        self.round_trip = round_trip_ms / 1000
+
+    def _call(self, *args):
+        sleep(self.round_trip)
+
+    write = set_servo_pulsewidth = set_PWM_dutycycle = set_PWM_frequency = stop = _call
+
+
+def make_box(round_trip_ms):
+    # An OperantBox without pigpio, the .csv of hopper values or the
+    # touchscreen script
+    box = OperantBox.__new__(OperantBox)
+    box.rpi_board = SimulatedBoard(round_trip_ms)
+    box.hopper_up_val, box.hopper_down_val = 1000, 2000
+    box.commands = HardwareQueue()
+    return box
+
+
+def trial_commands(box, direct):
+    # What one reinforced trial sends: reset (ITI), house light, hopper up
+    if direct:
+        return [box._reset, lambda: box._house_light(True), box._reinforce]
+    return [box.reset, lambda: box.house_light(True), box.reinforce]
+
+
+def main(round_trip_ms=2.0, n_trials=50):
+    print(f"{'Mode':>7} | {'blocked us/call':>15} | {'shutdown blocked ms':>19} | "
+          f"{'hopper_up ack ms':>16}")
+    for direct in [True, False]:
+        box = make_box(round_trip_ms)
+        blocked = []
+        for _ in range(n_trials):
+            for command in trial_commands(box, direct):
+                t0 = perf_counter()
+                command()
+                blocked.append(perf_counter() - t0)
+            sleep(0.05) # The rest of the trial (real trials last seconds)
+        t0 = perf_counter()
+        if direct:
+            box._shutdown()
+        else:
+            box.shutdown()
+        shutdown_ms = (perf_counter() - t0) * 1000
+        box.commands.drain()
+        hopper_acks = [(acked - issued) * 1000
+                       for command, issued, acked, error in box.commands.log
+                       if command == "hopper_up"]
+        ack = f"{mean(hopper_acks):.2f}" if hopper_acks else "n/a"
+        print(f"{'direct' if direct else 'queued':>7} | {mean(blocked) * 1e6:>15.1f} | "
+              f"{shutdown_ms:>19.1f} | {ack:>16}")
+
+
+if __name__ == '__main__':
+    main(*[float(a) for a in argv[1:2]], *[int(a) for a in argv[2:3]])
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: peck-density heatmaps (p003_engine/heatmaps.py).
+
+Fills a temporary data folder with n_sessions simulated P003Fb sessions
+(spread over 8 subjects), then times counting every peck one at a time
+(Python loop) vs. np.bincount, and the cached renderer: first build, update
+with nothing new, and update after one more session.
+
+    python benchmarks/bench_heatmaps.py [n_sessions]
+"""
+from datetime import datetime, timedelta
+from os import makedirs, path as os_path
+from sys import argv, path as sys_path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+repo_folder = os_path.dirname(os_path.dirname(os_path.abspath(__file__)))
+sys_path.insert(0, repo_folder)
+import numpy as np
+from p003_engine.columnar import archive_paths
+from p003_engine.heatmaps import count_pecks, default_cell, grid_shape, heatmap_events, render_folder
+from p003_engine.simulation import load_experiment, run_session
+from p003_engine.spatial import load_pecks
+
+SUBJECTS = ["Herriot", "Peach", "Wario", "Kurt", "Hendrix", "Itzamna", "Iggy", "Hawthorne"]
+
+
+def timed(function, *args):
+    t0 = perf_counter()
+    result = function(*args)
+    return result, (perf_counter() - t0) * 1000
+
+
+def loop_counts(pecks, labels, cell):
+    # The same counts, one peck at a time
+    rows, columns = grid_shape(cell)
+    counts = {}
+    for subject, trial_type, x, y in zip(pecks["subject"].tolist(), pecks["trial_type"].tolist(),
+                                         pecks["x"].tolist(), pecks["y"].tolist()):
+        key = (labels["subject"][subject], labels["trial_type"][trial_type])
+        if key not in counts:
+            counts[key] = [[0] * columns for _ in range(rows)]
+        counts[key][int(min(max(y, 0), 767)) // cell][int(min(max(x, 0), 1023)) // cell] += 1
+    return counts
+
+
+def write_session(data_folder, template, i):
+    subject = SUBJECTS[i % len(SUBJECTS)]
+    start = datetime(2026, 1, 5, 9, 0, 0) + timedelta(days = i // len(SUBJECTS),
+                                                      minutes = i % len(SUBJECTS))
+    folder = os_path.join(data_folder, subject)
+    makedirs(folder, exist_ok = True)
+    file_name = f"{subject}_{start.strftime('%Y-%m-%d_%H.%M.%S')}_P003Fb_data.csv"
+    with open(os_path.join(folder, file_name), "wb") as data_file:
+        data_file.write(template.replace(b"Herriot", subject.encode()))
+
+
+def main(n_sessions=200):
+    screen_class = load_experiment(os_path.join(repo_folder, "P003Fb/P003Fb_ExpProgram_RP.py"))
+    with TemporaryDirectory() as temp_folder:
+        # A few real simulated sessions, copied under many names/dates
+        templates = []
+        for seed in range(4):
+            screen = run_session(screen_class, "Herriot", "INS", data_folder = temp_folder,
+                                 seed = seed)
+            with open(screen.session_writer.file_path, "rb") as data_file:
+                templates.append(data_file.read())
+        data_folder = os_path.join(temp_folder, "P003Fb_data")
+        for i in range(n_sessions):
+            write_session(data_folder, templates[i % len(templates)], i)
+
+        drawn, build_ms = timed(render_folder, data_folder)
+        noop, noop_ms = timed(render_folder, data_folder)
+        assert noop == []
+        write_session(data_folder, templates[0], n_sessions)
+        one, one_ms = timed(render_folder, data_folder)
+        assert 0 < len(one) < len(drawn)
+
+        pecks, labels = load_pecks(archive_paths(data_folder), heatmap_events)
+        expected, loop_ms = timed(loop_counts, pecks, labels, default_cell)
+        counts, numpy_ms = timed(count_pecks, pecks, labels, default_cell)
+        assert set(counts) == set(expected)
+        assert all(np.array_equal(counts[key], expected[key]) for key in counts)
+
+    n_pecks = len(pecks["x"])
+    print(f"{n_sessions + 1} sessions, {n_pecks:,} pecks, {len(drawn)} heatmaps\n")
+    print(f"{'Step':>38} | {'ms':>9}")
+    for label, ms in [("count pecks, loop", loop_ms),
+                      ("count pecks, np.bincount", numpy_ms),
+                      ("first build (convert + count + draw)", build_ms),
+                      ("update, nothing new", noop_ms),
+                      (f"update, one new session ({len(one)} drawn)", one_ms)]:
+        print(f"{label:>38} | {ms:>9.1f}")
+    print("Both give the same counts.")
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:2]])
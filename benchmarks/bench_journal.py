@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: cost of journaling every event (p003_engine/journal.py).
+
+Replays the events of a simulated P003Fc session n_events times over into
+an EventLog, without and with a SessionJournal, and times the group
+commit (fsync) at the trial boundaries separately. Then checks that the
+journal rebuilds into exactly the .csv SessionWriter writes.
+
+    python benchmarks/bench_journal.py [n_events]
+"""
+from datetime import date
+from os import path as os_path
+from sys import argv, path as sys_path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+repo_folder = os_path.dirname(os_path.dirname(os_path.abspath(__file__)))
+sys_path.insert(0, repo_folder)
+from p003_engine.columnar import csv_text
+from p003_engine.event_log import EventLog, decode_column
+from p003_engine.journal import SessionJournal, rebuild_csv, recover_sessions
+from p003_engine.simulation import load_experiment, run_session
+
+
+def raw_rows(log):
+    # The rows MainScreen.write_data() appended to a finished EventLog
+    columns = []
+    for kind, values in zip(log.kinds, log.columns):
+        if kind == "session_time":
+            columns.append(list(values))
+        elif kind == "date":
+            columns.append([date.fromordinal(value) for value in values])
+        else:
+            columns.append(decode_column(kind, values, log.code_values))
+    return list(map(list, zip(*columns)))
+
+
+def replay(rows, header_list, n_events, journal=None):
+    # Appends n_events rows to a new EventLog; returns (log, s appending,
+    # s committing, commits)
+    log = EventLog(header_list)
+    trial_column = header_list.index("TrialNum")
+    append_s = commit_s = 0.0
+    commits = 0
+    trial = rows[0][trial_column]
+    for i in range(n_events):
+        row = rows[i % len(rows)]
+        t0 = perf_counter()
+        log.append(row)
+        if journal is not None:
+            journal.append(log)
+        append_s += perf_counter() - t0
+        if journal is not None and row[trial_column] != trial:
+            t0 = perf_counter()
+            journal.commit()
+            commit_s += perf_counter() - t0
+            commits += 1
+        trial = row[trial_column]
+    return log, append_s, commit_s, commits
+
+
+def main(n_events=200000):
+    screen_class = load_experiment(os_path.join(repo_folder, "P003Fc/P003Fc_ExpProgram_RP.py"))
+    screen = run_session(screen_class, "Wario", "INS", seed = 0)
+    header_list = screen.header_list
+    rows = raw_rows(screen.session_data_frame)
+
+    _, plain_s, _, _ = replay(rows, header_list, n_events)
+    with TemporaryDirectory() as data_folder:
+        data_file = "Wario/Wario_2026-01-05_09.00.00_P003Fc_data.csv"
+        journal = SessionJournal(data_folder, data_file, header_list)
+        log, journal_s, commit_s, commits = replay(rows, header_list, n_events, journal)
+        journal_bytes = os_path.getsize(journal.path)
+        journal.close(remove_file = False)
+
+        t0 = perf_counter()
+        csv_path = rebuild_csv(journal.path, data_folder)
+        rebuild_s = perf_counter() - t0
+        with open(csv_path, "rb") as data_file:
+            assert data_file.read() == csv_text(log[:]).encode("utf-8")
+        assert recover_sessions(data_folder) == [] # The .csv is up to date now
+
+    print(f"{n_events:,} events, {commits:,} trial boundaries, journal {journal_bytes / n_events:.0f} B/event\n")
+    print(f"{'Step':>32} | {'us/event':>9}")
+    print(f"{'EventLog.append':>32} | {plain_s / n_events * 1e6:>9.2f}")
+    print(f"{'EventLog.append + journal':>32} | {journal_s / n_events * 1e6:>9.2f}")
+    print(f"{'journal overhead':>32} | {(journal_s - plain_s) / n_events * 1e6:>9.2f}")
+    print(f"\nGroup commit (fsync): {commit_s / max(commits, 1) * 1000:.2f} ms per trial boundary")
+    print(f"Recovery: {rebuild_s:.2f} s to rebuild the .csv; identical to SessionWriter's.")
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:2]])
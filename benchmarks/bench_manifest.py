@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: finding sessions in a data folder by re-reading every .csv vs.
+the incremental session manifest (p003_engine/manifest.py).
+
+Fills a temporary data folder with n_sessions simulated P003Fb sessions
+(spread over 8 subjects), then times a full re-scan, building the
+manifest, updating it with nothing / one session changed, and loading
+it and filtering one subject's complete sessions.
+
+    python benchmarks/bench_manifest.py [n_sessions]
+"""
+from datetime import datetime, timedelta
+from os import makedirs, path as os_path
+from sys import argv, path as sys_path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+repo_folder = os_path.dirname(os_path.dirname(os_path.abspath(__file__)))
+sys_path.insert(0, repo_folder)
+from p003_engine.manifest import SessionManifest, read_session_file
+from p003_engine.simulation import load_experiment, run_session
+
+SUBJECTS = ["Herriot", "Peach", "Wario", "Kurt", "Hendrix", "Itzamna", "Iggy", "Hawthorne"]
+
+
+def timed(function, *args):
+    t0 = perf_counter()
+    result = function(*args)
+    return result, (perf_counter() - t0) * 1000
+
+
+def main(n_sessions=500):
+    screen_class = load_experiment(os_path.join(repo_folder, "P003Fb/P003Fb_ExpProgram_RP.py"))
+    with TemporaryDirectory() as data_folder:
+        # A few real simulated sessions, copied under many names/dates
+        templates = []
+        for seed in range(4):
+            screen = run_session(screen_class, "Herriot", "INS", data_folder = data_folder,
+                                 seed = seed)
+            with open(screen.session_writer.file_path, "rb") as data_file:
+                templates.append(data_file.read())
+        first_day = datetime(2026, 1, 5, 9, 0, 0)
+        paths = []
+        for i in range(n_sessions):
+            subject = SUBJECTS[i % len(SUBJECTS)]
+            start = first_day + timedelta(days = i // len(SUBJECTS), minutes = i % len(SUBJECTS))
+            folder = os_path.join(data_folder, "P003Fb_data", subject)
+            makedirs(folder, exist_ok = True)
+            paths.append(os_path.join(folder, f"{subject}_{start.strftime('%Y-%m-%d_%H.%M.%S')}_P003Fb_data.csv"))
+            with open(paths[-1], "wb") as data_file:
+                data_file.write(templates[i % len(templates)])
+        megabytes = sum(len(templates[i % len(templates)]) for i in range(n_sessions)) / 1e6
+        print(f"{n_sessions} sessions, {megabytes:.0f} MB\n")
+
+        root = os_path.join(data_folder, "P003Fb_data")
+        _, rescan_ms = timed(lambda: [read_session_file(path) for path in paths])
+        counts, build_ms = timed(lambda: SessionManifest(root).update())
+        assert counts == (n_sessions, 0, 0)
+        counts, noop_ms = timed(lambda: SessionManifest(root).update())
+        assert counts == (0, 0, 0)
+
+        with open(paths[-1], "ab") as data_file:
+            data_file.write(templates[0].splitlines(keepends = True)[-1])
+        counts, changed_ms = timed(lambda: SessionManifest(root).update())
+        assert counts == (0, 1, 0)
+
+        def load_and_filter():
+            return SessionManifest(root).sessions("P003Fb", "Wario", since = "2026-02-01",
+                                                 complete = True)
+        matches, filter_ms = timed(load_and_filter)
+        assert all(entry["Subject"] == "Wario" for entry in matches)
+
+    print(f"{'Step':>38} | {'ms':>9}")
+    for label, ms in [("re-read every .csv (no manifest)", rescan_ms),
+                      ("build manifest (first time)", build_ms),
+                      ("update, nothing changed", noop_ms),
+                      ("update, one session changed", changed_ms),
+                      (f"load + filter ({len(matches)} matches)", filter_ms)]:
+        print(f"{label:>38} | {ms:>9.1f}")
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:2]])
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark and equivalence check: closed-form RandomRatio vs. the per-peck
+dice loop that calculate_trial_outcome used to run.
+
+For each RR schedule and peck count, both samplers are run for the same
+number of seeded trials. Their reinforcement rates must agree with each
+other and with 1 - (1 - 1/rr)^pecks to within 4 standard errors, otherwise
+the script exits with an error.
+
+    python benchmarks/bench_outcomes.py [n_trials]
+"""
+from math import sqrt
+from os import path as os_path
+from random import choice, seed
+from sys import argv, path as sys_path
+from time import perf_counter
+
+sys_path.insert(0, os_path.dirname(os_path.dirname(os_path.abspath(__file__))))
+from p003_engine.outcomes import RandomRatio
+
+
+def legacy_trial_outcome(rr_sched, key_pecks, omission):
+    # The old P003e loop (a new list per roll), for reference
+    reinforced = omission
+    for iteration in list(range(0, key_pecks)):
+        if choice(list(range(0, rr_sched))) == 0:
+            reinforced = not omission
+    return reinforced
+
+
+def main(n_trials=20000):
+    failures = 0
+    print(f"{'Sched':>6} | {'Pecks':>5} | {'Expected':>8} | {'Legacy':>7} | "
+          f"{'Closed':>7} | {'legacy us':>9} | {'closed us':>9}")
+    for rr_sched in [2, 5, 20, 50]:
+        for key_pecks in [0, 1, 5, 20, 100]:
+            for omission in [False, True]:
+                policy = RandomRatio(rr_sched, omission=omission)
+                p_met = policy.schedule_probability(key_pecks)
+                expected = (1 - p_met) if omission else p_met
+
+                seed(1234)
+                t0 = perf_counter()
+                legacy = sum(legacy_trial_outcome(rr_sched, key_pecks, omission)
+                             for _ in range(n_trials)) / n_trials
+                legacy_us = (perf_counter() - t0) / n_trials * 1e6
+
+                seed(1234)
+                t0 = perf_counter()
+                closed = sum(policy.trial_outcome(key_pecks, 0)
+                             for _ in range(n_trials)) / n_trials
+                closed_us = (perf_counter() - t0) / n_trials * 1e6
+
+                # Both are binomial proportions; allow 4 SE of slack (with a
+                # floor so p = 0 or 1 doesn't demand exact equality by chance)
+                se = max(sqrt(expected * (1 - expected) / n_trials), 1 / n_trials)
+                ok = (abs(legacy - expected) <= 4 * se
+                      and abs(closed - expected) <= 4 * se
+                      and abs(legacy - closed) <= 4 * sqrt(2) * se)
+                failures += not ok
+                label = f"{'OMS' if omission else 'INS'}{rr_sched}"
+                print(f"{label:>6} | {key_pecks:>5} | {expected:>8.4f} | "
+                      f"{legacy:>7.4f} | {closed:>7.4f} | {legacy_us:>9.2f} | "
+                      f"{closed_us:>9.2f}{'' if ok else '  <-- MISMATCH'}")
+    if failures:
+        raise SystemExit(f"ERROR: {failures} schedule/peck combinations differ")
+    print("All closed-form outcome rates match the per-peck dice loop.")
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:2]])
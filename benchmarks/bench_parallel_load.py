@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: loading a multi-subject data folder (p003_engine/columnar.py)
+with 1, 2, 4 and 8 worker processes.
+
+Fills a temporary data folder with n_sessions simulated P003Fb sessions
+(spread over 12 subjects), then for each number of workers deletes the
+.columns copies and times converting every .csv (convert_folder) and
+merging all key pecks into one set of arrays (load_events). Every run must
+give the same arrays.
+
+    python benchmarks/bench_parallel_load.py [n_sessions]
+"""
+from datetime import datetime, timedelta
+from glob import glob
+from os import cpu_count, makedirs, path as os_path, remove
+from sys import argv, path as sys_path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+repo_folder = os_path.dirname(os_path.dirname(os_path.abspath(__file__)))
+sys_path.insert(0, repo_folder)
+import numpy as np
+from p003_engine.columnar import columnar_suffix, convert_folder, load_events
+from p003_engine.simulation import load_experiment, run_session
+
+SUBJECTS = ["Herriot", "Peach", "Wario", "Kurt", "Hendrix", "Itzamna", "Iggy", "Hawthorne",
+            "Jubilee", "Evaristo", "Bowser", "Yoshi"]
+
+
+def main(n_sessions=480):
+    screen_class = load_experiment(os_path.join(repo_folder, "P003Fb/P003Fb_ExpProgram_RP.py"))
+    with TemporaryDirectory() as temp_folder:
+        # A few real simulated sessions, copied under many names/dates
+        templates = []
+        for seed in range(4):
+            screen = run_session(screen_class, "Herriot", "INS", data_folder = temp_folder,
+                                 seed = seed)
+            with open(screen.session_writer.file_path, "rb") as data_file:
+                templates.append(data_file.read())
+        data_folder = os_path.join(temp_folder, "P003Fb_data")
+        csv_paths = []
+        for i in range(n_sessions):
+            subject = SUBJECTS[i % len(SUBJECTS)]
+            start = datetime(2026, 1, 5, 9, 0, 0) + timedelta(days = i // len(SUBJECTS),
+                                                              minutes = i % len(SUBJECTS))
+            folder = os_path.join(data_folder, subject)
+            makedirs(folder, exist_ok = True)
+            csv_paths.append(os_path.join(
+                folder, f"{subject}_{start.strftime('%Y-%m-%d_%H.%M.%S')}_P003Fb_data.csv"))
+            with open(csv_paths[-1], "wb") as data_file:
+                data_file.write(templates[i % len(templates)].replace(b"Herriot", subject.encode()))
+        columnar_paths = [os_path.splitext(path)[0] + columnar_suffix for path in csv_paths]
+        megabytes = sum(os_path.getsize(path) for path in csv_paths) / 1e6
+        print(f"{n_sessions} sessions, {megabytes:.0f} MB of .csv, {cpu_count()} CPUs\n")
+
+        results, reference = [], None
+        for workers in [1, 2, 4, 8]:
+            for path in glob(os_path.join(data_folder, "*", "*" + columnar_suffix)):
+                remove(path)
+            t0 = perf_counter()
+            converted, _, failed = convert_folder(data_folder, workers)
+            convert_s = perf_counter() - t0
+            assert converted == n_sessions and not failed
+            t0 = perf_counter()
+            data, labels = load_events(columnar_paths, ["key_peck"])
+            merge_s = perf_counter() - t0
+            if reference is None:
+                reference = data, labels
+            assert labels == reference[1]
+            assert all(np.array_equal(data[name], reference[0][name], equal_nan = True)
+                       for name in data)
+            results.append((workers, convert_s, merge_s))
+
+    print(f"{len(data['event']):,} key pecks merged\n")
+    print(f"{'Workers':>8} | {'convert s':>10} | {'merge s':>8} | {'sessions/s':>10} | {'speedup':>8}")
+    for workers, convert_s, merge_s in results:
+        total_s = convert_s + merge_s
+        speedup = (results[0][1] + results[0][2]) / total_s
+        print(f"{workers:>8} | {convert_s:>10.2f} | {merge_s:>8.3f} | "
+              f"{n_sessions / total_s:>10.1f} | {speedup:>7.2f}x")
+    print("Every run gives the same arrays.")
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:2]])
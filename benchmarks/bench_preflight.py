@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: work moved from the spacebar to the control panel's preflight
+(MainScreen.preflight(): stimulus assignments, stimulus images, trial order,
+data folder check).
+
+For each experiment: the preflight with a cold and a warm stimulus cache
+(the experiment's .csv and stimuli/ are copied to a temporary folder so the
+real cache is left alone), then the MainScreen + spacebar (up to the first
+ITI being scheduled) of a headless session without and with the preflight.
+Before, the spacebar also had to decode the images (the cold/warm decode
+column); headless sessions don't decode them.
+
+    python benchmarks/bench_preflight.py [n_runs]
+"""
+from os import path as os_path
+from shutil import copytree
+from sys import argv, path as sys_path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+repo_folder = os_path.dirname(os_path.dirname(os_path.abspath(__file__)))
+sys_path.insert(0, repo_folder)
+from p003_engine.simulation import load_experiment, run_session
+
+EXPERIMENTS = [
+    ("P003e/P003E_ExpProgram_RP.py", "Jagger", "RR5"),
+    ("P003f/P003F_ExpProgram_RP.py", "Peach", None),
+    ("P003Fb/P003Fb_ExpProgram_RP.py", "Herriot", "INS"),
+    ("P003Fc/P003Fc_ExpProgram_RP.py", "Kurt", "OMS"),
+    ("P003B.ii/P003B.ii_ExpProgram_RP.py", "Herriot", None),
+]
+
+
+def best_ms(function, n_runs):
+    times = []
+    for _ in range(n_runs):
+        t0 = perf_counter()
+        function()
+        times.append(perf_counter() - t0)
+    return min(times) * 1000
+
+
+def main(n_runs=5):
+    print(f"{'Experiment':>10} | {'preflight cold ms':>17} | {'warm ms':>7} | {'decode cold/warm ms':>19} | "
+          f"{'spacebar ms before':>18} | {'now':>5}")
+    for script, subject, condition in EXPERIMENTS:
+        screen_class = load_experiment(os_path.join(repo_folder, script))
+        with TemporaryDirectory() as temp_folder:
+            experiment_directory = os_path.join(temp_folder, "experiment")
+            source_directory = os_path.dirname(os_path.join(repo_folder, script))
+            copytree(source_directory, experiment_directory,
+                     ignore = lambda folder, names: [name for name in names
+                                                     if name.endswith(".py") or name == ".cache"])
+            data_folder = os_path.join(temp_folder, "data")
+
+            def preflight():
+                return screen_class.preflight(subject, condition, data_folder, experiment_directory)
+            t0 = perf_counter()
+            plan = preflight()
+            cold_ms = (perf_counter() - t0) * 1000
+            warm_ms = best_ms(preflight, n_runs)
+
+            # The image decoding alone (cold, then warm cache)
+            decode_ms = [0.0, 0.0]
+            if screen_class.uses_image_stimuli:
+                planner = screen_class.__new__(screen_class)
+                planner.experiment_directory = os_path.join(temp_folder, "cold")
+                planner.stimulus_assignments_dict = plan["plan"]["stimulus_assignments"]
+                copytree(os_path.join(source_directory, "stimuli"),
+                         os_path.join(planner.experiment_directory, "stimuli"),
+                         ignore = lambda folder, names: [".cache"])
+                t0 = perf_counter()
+                planner.decode_stimulus_images()
+                decode_ms = [(perf_counter() - t0) * 1000,
+                             best_ms(planner.decode_stimulus_images, n_runs)]
+
+            before_ms = best_ms(lambda: run_session(screen_class, subject, condition, crash_after = 0),
+                                n_runs)
+            now_ms = min(timed_session(screen_class, subject, condition, preflight())
+                         for _ in range(n_runs))
+        name = script.split("/")[0]
+        print(f"{name:>10} | {cold_ms:>17.1f} | {warm_ms:>7.1f} | "
+              f"{decode_ms[0]:>9.1f} / {decode_ms[1]:>7.1f} | "
+              f"{before_ms + decode_ms[0]:>18.1f} | {now_ms:>5.1f}")
+    print("\n'spacebar ms before' = headless MainScreen + spacebar + cold image decoding.")
+
+
+def timed_session(screen_class, subject, condition, preflight):
+    # ms of run_session() with the preflight already built
+    t0 = perf_counter()
+    run_session(screen_class, subject, condition, crash_after = 0, preflight = preflight)
+    return (perf_counter() - t0) * 1000
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:2]])
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: classifying pecks with the precomputed region map
+(p003_engine/regions.py).
+
+    1. Building a map (once per hidden patch location).
+    2. Live: TrialScene.target_at() per peck during a trial vs. testing the
+       shapes one by one (what the items' hit tests amount to).
+    3. Offline: region_ids() over n_pecks archived coordinates vs. the same
+       geometry computed with NumPy, which it must match exactly.
+
+    python benchmarks/bench_regions.py [n_pecks]
+"""
+from random import Random
+from sys import argv, path as sys_path
+from os import path as os_path
+from time import perf_counter
+
+import numpy as np
+
+sys_path.insert(0, os_path.dirname(os_path.dirname(os_path.abspath(__file__))))
+from p003_engine import geometry
+from p003_engine.regions import (BACKGROUND, HIDDEN_PATCH, KEY_CORE, KEY_CORNER, KEY_RIM,
+                                 KEY_RIM_OUTER, OFF_SCREEN, region_ids, region_map,
+                                 region_maps, region_names)
+from p003_engine.scene import TrialScene
+from p003_engine.simulation import VirtualCanvas
+
+
+def in_oval(coords, x, y):
+    x1, y1, x2, y2 = coords
+    rx, ry = (x2 - x1) / 2, (y2 - y1) / 2
+    return ((x - x1 - rx) / rx) ** 2 + ((y - y1 - ry) / ry) ** 2 <= 1
+
+
+def in_rectangle(coords, x, y):
+    x1, y1, x2, y2 = coords
+    return (x1 <= x) & (x <= x2) & (y1 <= y) & (y <= y2)
+
+
+def shape_target(x, y, patch):
+    # The key phase of a PNG experiment with the hidden patch shown, by
+    # testing each shape from the top down
+    if not (0 <= x < geometry.mainscreen_width and 0 <= y < geometry.mainscreen_height):
+        return None
+    if in_rectangle(patch, x, y):
+        return "hidden_patch"
+    if (in_oval(geometry.midpoint_coord_list, x, y) or in_oval(geometry.key_coord_list, x, y)
+            or in_rectangle(geometry.key_coord_list, x, y)
+            or in_oval(geometry.outline_coords_list, x, y)):
+        return "key"
+    return "bkgrd"
+
+
+def geometric_ids(x, y, patch):
+    # region_ids() worked out from the shapes, with NumPy
+    ids = np.full(x.shape, BACKGROUND, dtype=np.uint8)
+    square = in_rectangle(geometry.key_coord_list, x, y)
+    outline = in_oval(geometry.outline_coords_list, x, y)
+    ids[square] = KEY_CORNER
+    ids[outline & ~square] = KEY_RIM_OUTER
+    ids[outline & square] = KEY_RIM
+    ids[in_oval(geometry.key_coord_list, x, y)] = KEY_CORE
+    ids[in_rectangle(patch, x, y)] = HIDDEN_PATCH
+    ids[~((x >= 0) & (x < geometry.mainscreen_width)
+          & (y >= 0) & (y < geometry.mainscreen_height))] = OFF_SCREEN
+    return ids
+
+
+def main(n_pecks=1000000):
+    patch = geometry.hidden_patch_coords("north-east")
+    t0 = perf_counter()
+    for location in geometry.hidden_patch_locations:
+        region_map(geometry.hidden_patch_coords(location))
+    build_ms = (perf_counter() - t0) * 1000 / len(geometry.hidden_patch_locations)
+
+    # Live: pecks mostly around the key, some anywhere (and a few off the screen)
+    rng = Random(0)
+    pecks = [(int(rng.gauss(512, 80)), int(rng.gauss(384, 80))) if rng.random() < 0.8
+             else (rng.randint(-10, 1033), rng.randint(-10, 777)) for _ in range(100000)]
+    scene = TrialScene(VirtualCanvas(), *[lambda event: None] * 5, uses_image_stimuli = True)
+    scene.place_hidden_patch(patch)
+    scene.show_key(image = "stimulus", hidden_patch = True)
+    t0 = perf_counter()
+    targets = [scene.target_at(x, y) for x, y in pecks]
+    lookup_us = (perf_counter() - t0) / len(pecks) * 1e6
+    t0 = perf_counter()
+    expected = [shape_target(x, y, patch) for x, y in pecks]
+    shapes_us = (perf_counter() - t0) / len(pecks) * 1e6
+    assert targets == expected
+
+    # Offline: archived coordinates (floats, with NaN for events without any)
+    np_rng = np.random.default_rng(0)
+    x = np.round(np_rng.normal(512, 120, n_pecks))
+    y = np.round(np_rng.normal(384, 120, n_pecks))
+    x[::1000] = np.nan
+    t0 = perf_counter()
+    ids = region_ids(x, y, patch)
+    offline_ms = (perf_counter() - t0) * 1000
+    t0 = perf_counter()
+    with np.errstate(invalid="ignore"):
+        reference = geometric_ids(x, y, patch)
+    geometric_ms = (perf_counter() - t0) * 1000
+    assert (ids == reference).all()
+
+    print(f"Region map: {build_ms:.1f} ms to build, {len(region_maps[None]) / 1024:.0f} KiB each\n")
+    print(f"{'Classification':>30} | {'lookup':>9} | {'shapes':>9}")
+    print(f"{'live, us/peck':>30} | {lookup_us:>9.2f} | {shapes_us:>9.2f}")
+    print(f"{f'offline, ms/{n_pecks:,} pecks':>30} | {offline_ms:>9.1f} | {geometric_ms:>9.1f}")
+    counts = np.bincount(ids[ids != OFF_SCREEN], minlength=len(region_names))
+    print("\nOffline pecks per region: " + ", ".join(f"{name} {count:,}"
+                                                    for name, count in zip(region_names, counts)))
+    print("Both match the shape-by-shape classification exactly.")
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:2]])
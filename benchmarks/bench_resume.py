@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: resuming an interrupted session (p003_engine/journal.py) vs.
+running it again from the start.
+
+Simulated P003e sessions (RR5) "crash" at 25%, 50% and 90% of the way
+through; each is then resumed (find_resumable() + a new MainScreen that
+restores the events, plan and random state, up to the point where the
+next trial is scheduled). Re-running instead costs the chamber time of
+every trial already done.
+
+    python benchmarks/bench_resume.py [subject]
+"""
+from os import path as os_path
+from sys import argv, path as sys_path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+repo_folder = os_path.dirname(os_path.dirname(os_path.abspath(__file__)))
+sys_path.insert(0, repo_folder)
+from p003_engine.journal import find_resumable, recover_sessions
+from p003_engine.simulation import load_experiment, run_session
+
+
+def main(subject="Jagger"):
+    screen_class = load_experiment(os_path.join(repo_folder, "P003e/P003E_ExpProgram_RP.py"))
+    full_length = run_session(screen_class, subject, "RR5", seed = 0).root.now
+
+    results = []
+    for share in [0.25, 0.5, 0.9]:
+        with TemporaryDirectory() as data_folder:
+            run_session(screen_class, subject, "RR5", data_folder = data_folder, seed = 0,
+                        crash_after = share * full_length)
+            t0 = perf_counter()
+            recover_sessions(data_folder) # As the control panel does at launch
+            recover_s = perf_counter() - t0
+            t0 = perf_counter()
+            resume = find_resumable(data_folder, subject)
+            # Resumed up to the point the first ITI is scheduled
+            screen = run_session(screen_class, subject, "RR5", data_folder = data_folder,
+                                 seed = 1, resume = resume, crash_after = 0)
+            resume_s = perf_counter() - t0
+            trials = resume["checkpoint"]["trials"]
+            assert screen.current_trial_counter == trials
+            assert len(screen.session_data_frame) - 1 == len(resume["events"]) + 1 # + SessionResumed
+            results.append((share, trials, len(resume["events"]), recover_s, resume_s,
+                            resume["session_time"]))
+
+    print(f"P003e RR5 session of {full_length / 60:.1f} min\n")
+    print(f"{'Crash at':>9} | {'trials done':>11} | {'events':>7} | {'recover ms':>10} | "
+          f"{'resume ms':>9} | {'re-run min':>10}")
+    for share, trials, events, recover_s, resume_s, session_time in results:
+        print(f"{share:>9.0%} | {trials:>11} | {events:>7} | {recover_s * 1000:>10.1f} | "
+              f"{resume_s * 1000:>9.1f} | {session_time / 60:>10.1f}")
+
+
+if __name__ == '__main__':
+    main(*argv[1:2])
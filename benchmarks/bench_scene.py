@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: stimulus-onset latency of the retained TrialScene vs. deleting
+and rebuilding the whole Canvas at every phase.
+
+Each simulated trial goes ITI -> key -> blank, the way a session does. The
+onset latency is the time from the "ITI timer fires" call to the key being
+drawn (update_idletasks() returning). Also reports how many Canvas items
+and Tcl commands (one per bound lambda) exist at the end, since the
+rebuild approach registers fresh callbacks every trial.
+
+Needs a display (e.g., run on a box, or under xvfb-run).
+
+    python benchmarks/bench_scene.py [n_trials]
+"""
+from os import path as os_path
+from statistics import mean, median
+from sys import argv, path as sys_path
+from time import perf_counter
+from tkinter import Tk, Canvas, PhotoImage, TclError
+
+sys_path.insert(0, os_path.dirname(os_path.dirname(os_path.abspath(__file__))))
+from p003_engine import geometry
+from p003_engine.scene import TrialScene
+
+
+def ignore(event):
+    pass
+
+
+def legacy_ITI(canvas):
+    canvas.delete("all")
+    canvas.create_rectangle(0, 0, geometry.mainscreen_width, geometry.mainscreen_height,
+                            fill = "black", outline = "black", tag = "bkgrd")
+    canvas.tag_bind("bkgrd", "<Button-1>", lambda event: ignore(event))
+
+
+def legacy_build_keys(canvas, fill, image, hidden_patch):
+    # What build_keys() drew before the retained scene
+    canvas.create_rectangle(0, 0, geometry.mainscreen_width, geometry.mainscreen_height,
+                            fill = "black", outline = "black", tag = "bkgrd")
+    canvas.tag_bind("bkgrd", "<Button-1>", lambda event: ignore(event))
+    canvas.create_oval(geometry.outline_coords_list,
+                       outline = "black", fill = "black", tag = "key")
+    if image is not None:
+        canvas.create_image(geometry.key_center[0], geometry.key_center[1],
+                            image = image, anchor = "center", tag = "key")
+    canvas.create_oval(geometry.key_coord_list,
+                       outline = "black", fill = fill, tag = "key")
+    canvas.create_oval(geometry.midpoint_coord_list,
+                       fill = "black", outline = "black", tag = "key")
+    canvas.tag_bind("key", "<Button-1>", lambda event: ignore(event))
+    if hidden_patch:
+        canvas.create_rectangle(geometry.hidden_patch_coords("north"),
+                                outline = "black", fill = "black", tag = "hidden_patch")
+        canvas.tag_bind("hidden_patch", "<Button-1>", lambda event: ignore(event))
+
+
+def make_images():
+    images = []
+    for color in ["#C00000", "#00A000", "#0000C0", "#C0C000"]:
+        image = PhotoImage(width = geometry.key_pixels, height = geometry.key_pixels)
+        image.put(color, to = (0, 0, geometry.key_pixels, geometry.key_pixels))
+        images.append(image)
+    return images
+
+
+def run(root, mode, n_trials, use_images):
+    canvas = Canvas(root, bg = "black",
+                    width = geometry.mainscreen_width,
+                    height = geometry.mainscreen_height)
+    canvas.pack()
+    root.update()
+    images = make_images() if use_images else [None]
+    colors = ["" if use_images else c for c in ["red", "green", "blue", "yellow"]]
+    commands_before = len(root.tk.call("info", "commands"))
+    if mode == "retained":
+        scene = TrialScene(canvas, ignore, ignore, ignore, ignore, ignore,
+                           uses_image_stimuli = use_images)
+        scene.place_hidden_patch(geometry.hidden_patch_coords("north"))
+
+    latencies = []
+    for trial in range(n_trials):
+        fill, image = colors[trial % len(colors)], images[trial % len(images)]
+        if mode == "retained":
+            scene.show_ITI()
+        else:
+            legacy_ITI(canvas)
+        canvas.update_idletasks()
+
+        t0 = perf_counter()
+        if mode == "retained":
+            scene.show_key(fill = fill, image = image, hidden_patch = True)
+        else:
+            canvas.delete("all")
+            legacy_build_keys(canvas, fill, image, True)
+        canvas.update_idletasks()
+        latencies.append((perf_counter() - t0) * 1e6)
+
+        if mode == "retained":
+            scene.hide_all()
+        else:
+            canvas.delete("all")
+        canvas.update_idletasks()
+
+    n_items = len(canvas.find_all())
+    new_commands = len(root.tk.call("info", "commands")) - commands_before
+    canvas.destroy()
+    return latencies, n_items, new_commands
+
+
+def main(n_trials=500):
+    try:
+        root = Tk()
+    except TclError as error:
+        raise SystemExit(f"ERROR: this benchmark needs a display ({error})")
+    root.geometry(f"{geometry.mainscreen_width}x{geometry.mainscreen_height}")
+    print(f"{'Stimuli':>7} | {'Mode':>8} | {'median us':>9} | {'mean us':>8} | "
+          f"{'max us':>8} | {'items':>5} | {'Tcl cmds':>8}")
+    for use_images in [False, True]:
+        for mode in ["rebuild", "retained"]:
+            latencies, n_items, new_commands = run(root, mode, n_trials, use_images)
+            print(f"{'PNG' if use_images else 'color':>7} | {mode:>8} | "
+                  f"{median(latencies):>9.1f} | {mean(latencies):>8.1f} | "
+                  f"{max(latencies):>8.1f} | {n_items:>5} | {new_commands:>8}")
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:2]])
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: simulated trials per second for each outcome policy, calling
+trial_outcome() once per trial (outcomes.py) vs. schedule_analysis's
+vectorized rules.
+
+Also checks both agree with the exact reinforcement probability (within
+4 standard errors).
+
+    python benchmarks/bench_schedule_analysis.py [n_trials]
+"""
+from math import sqrt
+from os import path as os_path
+from sys import argv, path as sys_path
+from time import perf_counter
+
+sys_path.insert(0, os_path.dirname(os_path.dirname(os_path.abspath(__file__))))
+import numpy as np
+from p003_engine.outcomes import FixedRatio, Pavlovian, RandomRatio, VariableRatio
+from p003_engine.schedule_analysis import describe, reinforced, reinforcement_probability
+
+POLICIES = [Pavlovian(0.353), RandomRatio(5), RandomRatio(20, omission=True),
+            VariableRatio(50), VariableRatio(20, omission=True), FixedRatio(2)]
+
+
+def main(n_trials=200000):
+    rng = np.random.default_rng(0)
+    key_pecks = rng.poisson(40, n_trials)
+    background_pecks = rng.poisson(5, n_trials)
+    print(f"{'Policy':>21} | {'loop trials/s':>13} | {'numpy trials/s':>14} | "
+          f"{'speedup':>7} | {'P (exact)':>9}")
+    for policy in POLICIES:
+        pecks = key_pecks.tolist()
+        background = background_pecks.tolist()
+        t0 = perf_counter()
+        loop = sum(policy.trial_outcome(k, b) for k, b in zip(pecks, background))
+        loop_s = perf_counter() - t0
+
+        t0 = perf_counter()
+        vectorized = int(reinforced(policy, key_pecks, background_pecks, rng).sum())
+        numpy_s = perf_counter() - t0
+
+        exact = reinforcement_probability(policy, key_pecks, background_pecks).mean()
+        tolerance = 4 * sqrt(max(exact * (1 - exact), 1e-12) / n_trials) + 1e-9
+        assert abs(loop / n_trials - exact) <= tolerance, describe(policy)
+        assert abs(vectorized / n_trials - exact) <= tolerance, describe(policy)
+        print(f"{describe(policy):>21} | {n_trials / loop_s:>13,.0f} | "
+              f"{n_trials / numpy_s:>14,.0f} | {loop_s / numpy_s:>6.0f}x | {exact:>9.4f}")
+    print("Both agree with the exact probabilities.")
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:2]])
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simulation: session drift with chained root.after() timers vs. SessionClock.
+
+Runs the ITI -> trial -> hopper cycle of a session on a simulated Tk event
+loop in which every callback fires a random 0-jitter ms late (as it does
+when the Pi is busy printing, drawing or writing data). Chained relative
+timers add that lateness to every following interval; SessionClock's
+absolute deadlines absorb it. Reports how far past its designed end time
+each session finishes.
+
+    python benchmarks/bench_scheduler.py [jitter_ms]
+"""
+from os import path as os_path
+from random import random, seed
+from sys import argv, path as sys_path
+
+sys_path.insert(0, os_path.dirname(os_path.dirname(os_path.abspath(__file__))))
+from p003_engine import scheduler
+from p003_engine.scheduler import SessionClock
+
+
+class SimulatedRoot(object):
+    # Just enough of a Tk root: after() callbacks run in time order, each
+    # one a random amount late
+    def __init__(self, jitter_ms):
+        self.jitter = jitter_ms / 1000
+        self.now = 0.0
+        self.queue = []
+
+    def after(self, delay_ms, callback):
+        self.queue.append((self.now + delay_ms / 1000 + random() * self.jitter,
+                           len(self.queue), callback))
+        return len(self.queue)
+
+    def run(self):
+        while self.queue:
+            self.queue.sort(key=lambda timer: timer[:2])
+            due, _, callback = self.queue.pop(0)
+            self.now = max(self.now, due)
+            callback()
+
+
+def chained_session(root, n_trials, durations):
+    # Old style: each timer counted from when its callback actually ran
+    trial = [0]
+
+    def ITI():
+        if trial[0] == n_trials:
+            return
+        trial[0] += 1
+        root.after(durations[0], trial_timer)
+
+    def trial_timer():
+        root.after(durations[1], hopper)
+
+    def hopper():
+        root.after(durations[2], ITI)
+
+    root.after(0, ITI)
+    root.run()
+    return root.now
+
+
+def clock_session(root, n_trials, durations):
+    clock = SessionClock(root)
+    trial = [0]
+
+    def ITI():
+        if trial[0] == n_trials:
+            return
+        trial[0] += 1
+        clock.after(durations[0], trial_timer)
+
+    def trial_timer():
+        clock.after(durations[1], hopper)
+
+    def hopper():
+        clock.after(durations[2], ITI)
+
+    clock.after(0, ITI)
+    root.run()
+    return clock.now(), clock.lateness_summary()
+
+
+def main(jitter_ms=5):
+    seed(1234)
+    print(f"{'Design':>22} | {'designed s':>10} | {'chained +ms':>11} | "
+          f"{'clock +ms':>9} | {'clock max late ms':>17}")
+    for label, n_trials, durations in [
+            ("P003Fb (80 x 1/10/4 s)", 80, (1000, 10000, 4000)),
+            ("P003f (160 x 6/10/4 s)", 160, (6000, 10000, 4000)),
+            ("P003e (180 x 6/10/4 s)", 180, (6000, 10000, 4000))]:
+        designed = n_trials * sum(durations) / 1000
+
+        chained_root = SimulatedRoot(jitter_ms)
+        chained_end = chained_session(chained_root, n_trials, durations)
+
+        clock_root = SimulatedRoot(jitter_ms)
+        scheduler.monotonic = lambda: clock_root.now # Simulated time
+        clock_end, (_, _, max_late) = clock_session(clock_root, n_trials, durations)
+
+        print(f"{label:>22} | {designed:>10.0f} | {(chained_end - designed) * 1000:>11.1f} | "
+              f"{(clock_end - designed) * 1000:>9.1f} | {max_late:>17.2f}")
+
+
+if __name__ == '__main__':
+    main(*[float(a) for a in argv[1:2]])
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark and uniformity check: constrained_shuffle() vs. the shuffle-and-
+reject loops the experiments used to build their trial orders with.
+
+Part 1 times both on the session designs (80, 160 and 180 trials) and on a
+1000-trial design. The rejection loop is given a time budget per sequence;
+past that it is reported as having given up.
+
+Part 2 draws many orders of a few small designs whose valid orders can all
+be listed, and compares how evenly each sampler covers them (total
+variation distance from uniform). constrained_shuffle() has to be as even
+as rejection sampling, which is exactly uniform, otherwise the script exits
+with an error. Its fallback for designs where valid orders are too rare
+(the mixing walk, forced here with max_attempts = 0) is only approximately
+uniform; its distance is shown for reference.
+
+    python benchmarks/bench_sequences.py [n_draws]
+"""
+from collections import Counter
+from itertools import permutations
+from os import path as os_path
+from random import seed, shuffle
+from sys import argv, path as sys_path
+from time import perf_counter
+
+sys_path.insert(0, os_path.dirname(os_path.dirname(os_path.abspath(__file__))))
+from p003_engine.sequences import constrained_shuffle
+
+
+def prefix(code):
+    return code.split("_")[0]
+
+
+def identity(code):
+    return code
+
+
+def longest_run(trial_codes, key):
+    longest = run = 1
+    for previous, current in zip(trial_codes, trial_codes[1:]):
+        run = run + 1 if key(current) == key(previous) else 1
+        longest = max(longest, run)
+    return longest
+
+
+def legacy_shuffle(trial_codes, max_run, key, budget=None):
+    # The old loop: reshuffle the whole list until no run is too long.
+    # Returns (order or None, attempts)
+    trial_codes = list(trial_codes)
+    start = perf_counter()
+    attempts = 0
+    while budget is None or perf_counter() - start < budget:
+        attempts += 1
+        shuffle(trial_codes)
+        if longest_run(trial_codes, key) <= max_run:
+            return trial_codes, attempts
+    return None, attempts
+
+
+DESIGNS = [
+    # (label, trial codes, key)
+    ("P003Fb (80)", ["INS_2", "INS_5", "INS_20", "INS_50"] * 20, identity),
+    ("P003f (160)", ["INS_2", "INS_5", "INS_20", "OMS_2", "OMS_5", "OMS_20",
+                     "PAV", "EXT"] * 20, prefix),
+    ("P003e (180)", ["PAV", "INS", "OMS"] * 60, identity),
+    ("4 x 250 (1000)", ["A", "B", "C", "D"] * 250, identity),
+    ("3 x 333 (999)", ["A", "B", "C"] * 333, identity),
+]
+
+SMALL_DESIGNS = [
+    # (trial codes, max run)
+    (["A", "B", "C"] * 3, 2),
+    (["A", "B", "C", "D"] * 2, 1),
+    (["A"] * 5 + ["B"] * 3 + ["C"] * 3, 3),
+    (["A"] * 4 + ["B"] * 4 + ["C"] * 2, 2),
+]
+
+
+def timing(n_runs=20, budget=5.0):
+    print(f"{'Design':>15} | {'legacy ms':>10} | {'attempts':>9} | "
+          f"{'new ms':>7} | {'speedup':>8}")
+    for label, trial_codes, key in DESIGNS:
+        seed(1234)
+        legacy_times, legacy_attempts, gave_up = [], [], False
+        for _ in range(n_runs):
+            t0 = perf_counter()
+            order, attempts = legacy_shuffle(trial_codes, 3, key, budget)
+            legacy_times.append(perf_counter() - t0)
+            legacy_attempts.append(attempts)
+            if order is None:
+                gave_up = True
+                break
+
+        seed(1234)
+        new_times = []
+        for _ in range(n_runs):
+            t0 = perf_counter()
+            order = constrained_shuffle(trial_codes, 3, key=key)
+            new_times.append(perf_counter() - t0)
+            assert sorted(order) == sorted(trial_codes)
+            assert longest_run(order, key) <= 3
+
+        new_ms = sum(new_times) / len(new_times) * 1000
+        if gave_up:
+            legacy = f">{budget * 1000:.0f}"
+            attempts = f">{legacy_attempts[-1]}"
+            speedup = f">{budget * 1000 / new_ms:.0f}x"
+        else:
+            legacy_ms = sum(legacy_times) / len(legacy_times) * 1000
+            legacy = f"{legacy_ms:.2f}"
+            attempts = f"{sum(legacy_attempts) / len(legacy_attempts):.1f}"
+            speedup = f"{legacy_ms / new_ms:.1f}x"
+        print(f"{label:>15} | {legacy:>10} | {attempts:>9} | "
+              f"{new_ms:>7.2f} | {speedup:>8}")
+
+
+def uniformity(n_draws):
+    failures = 0
+    print(f"{'Design':>22} | {'valid':>5} | {'TV legacy':>9} | {'TV new':>7} | {'TV walk':>7}")
+    for trial_codes, max_run in SMALL_DESIGNS:
+        valid = set(order for order in permutations(trial_codes)
+                    if longest_run(order, identity) <= max_run)
+        tv = {}
+        for name, sampler in [
+                ("legacy", lambda: legacy_shuffle(trial_codes, max_run, identity)[0]),
+                ("new", lambda: constrained_shuffle(trial_codes, max_run)),
+                ("walk", lambda: constrained_shuffle(trial_codes, max_run, max_attempts=0))]:
+            seed(1234)
+            counts = Counter(tuple(sampler()) for _ in range(n_draws))
+            assert set(counts) <= valid
+            tv[name] = 0.5 * sum(abs(counts[order] / n_draws - 1 / len(valid))
+                                 for order in valid)
+        # Both estimates carry the same sampling noise; allow a little slack
+        ok = tv["new"] <= 1.25 * tv["legacy"] + 0.005
+        failures += not ok
+        label = f"{''.join(sorted(trial_codes))} r={max_run}"
+        print(f"{label:>22} | {len(valid):>5} | {tv['legacy']:>9.4f} | "
+              f"{tv['new']:>7.4f} | {tv['walk']:>7.4f}{'' if ok else '  <-- NOT UNIFORM'}")
+    if failures:
+        raise SystemExit(f"ERROR: {failures} designs are sampled unevenly")
+    print("constrained_shuffle() covers valid orders as evenly as rejection.")
+
+
+def main(n_draws=100000):
+    timing()
+    print()
+    uniformity(n_draws)
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:2]])
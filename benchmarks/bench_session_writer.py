@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: per-ITI data flush cost, full rewrite vs. streaming SessionWriter.
+
+Simulates a long P003e-style session (180 trials with a high-rate bird) and
+times each ITI flush with the old "reopen with 'w' and rewrite everything"
+approach and with the append-only SessionWriter. Also checks that both files
+end up byte-identical.
+
+    python benchmarks/bench_session_writer.py [n_trials] [pecks_per_trial]
+"""
+from csv import writer, QUOTE_MINIMAL
+from datetime import date, timedelta
+from filecmp import cmp
+from os import path as os_path
+from sys import argv, path as sys_path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+sys_path.insert(0, os_path.dirname(os_path.dirname(os_path.abspath(__file__))))
+from p003_engine.session_writer import SessionWriter
+
+HEADER = ["SessionTime", "Xcord", "Ycord", "Event", "TrialTime",
+          "TrialType", "TargetPeckNum", "BackgroundPeckNum",
+          "TrialNum", "TrialColor", "Subject", "ExpPhase", "Date"]
+
+
+def fake_trial_rows(trial_num, pecks_per_trial):
+    # Rows shaped like the ones MainScreen.write_data appends
+    rows = []
+    for p in range(pecks_per_trial):
+        rows.append([str(timedelta(seconds=trial_num * 16 + p * 0.05)),
+                     400 + p % 200, 300 + p % 150, "key_peck",
+                     round(p * 0.05, 5), "INS", p + 1, 0, trial_num,
+                     "#951BFA", "Jagger", "RR20", date.today()])
+    rows.append([str(timedelta(seconds=trial_num * 16 + 10)), "NA", "NA",
+                 "reinforced_trial", 10.00012, "INS", pecks_per_trial, 0,
+                 trial_num, "#951BFA", "Jagger", "RR20", date.today()])
+    return rows
+
+
+def legacy_flush(file_path, session_data_frame):
+    # The old write_comp_data body
+    with open(file_path, 'w', newline='') as myFile:
+        w = writer(myFile, quoting=QUOTE_MINIMAL)
+        w.writerows(session_data_frame)
+
+
+def main(n_trials=180, pecks_per_trial=60):
+    data_frame = [HEADER]
+    legacy_times = []
+    stream_times = []
+    with TemporaryDirectory() as tmp:
+        legacy_path = os_path.join(tmp, "legacy.csv")
+        stream_path = os_path.join(tmp, "stream.csv")
+        session_writer = SessionWriter(stream_path)
+        for trial in range(1, n_trials + 1):
+            data_frame.extend(fake_trial_rows(trial, pecks_per_trial))
+            t0 = perf_counter()
+            legacy_flush(legacy_path, data_frame)
+            legacy_times.append(perf_counter() - t0)
+            t0 = perf_counter()
+            session_writer.flush(data_frame)
+            stream_times.append(perf_counter() - t0)
+        session_writer.close()
+        identical = cmp(legacy_path, stream_path, shallow=False)
+
+    print(f"{n_trials} trials x {pecks_per_trial} pecks "
+          f"({len(data_frame)} rows); files identical: {identical}")
+    print(f"{'Trial':>6} | {'Rows':>7} | {'rewrite (ms)':>12} | {'stream (ms)':>11}")
+    checkpoints = sorted(set([1, n_trials // 4, n_trials // 2,
+                              (3 * n_trials) // 4, n_trials]) - {0})
+    for trial in checkpoints:
+        rows = 1 + trial * (pecks_per_trial + 1)
+        print(f"{trial:>6} | {rows:>7} | {legacy_times[trial - 1] * 1000:>12.3f} "
+              f"| {stream_times[trial - 1] * 1000:>11.3f}")
+    print(f"{'Total':>6} | {'':>7} | {sum(legacy_times) * 1000:>12.1f} "
+          f"| {sum(stream_times) * 1000:>11.1f}")
+    if not identical:
+        raise SystemExit("ERROR: streamed file differs from full rewrite")
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:3]])
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: changeover between birds when one program runs the sessions back
+to back (the next MainScreen reuses the last one's window, see
+main_screen.Chamber) vs. restarting the program for every bird.
+
+Restarting costs a new interpreter and the experiment's imports (timed here
+in a subprocess), building the window again and, on the boxes, setting the
+box up again (pigpiod connection, Hopper_vals.csv, touchscreen mapping),
+which can't be timed on this machine. Back to back, the changeover is only
+the new MainScreen up to the first ITI (headless sessions). Each back-to-back
+session is checked to give the same data as the same session run fresh.
+
+    python benchmarks/bench_sessions.py [script] [n_sessions]
+"""
+from os import path as os_path
+from subprocess import run
+from sys import argv, executable, path as sys_path
+from time import perf_counter
+
+repo_folder = os_path.dirname(os_path.dirname(os_path.abspath(__file__)))
+sys_path.insert(0, repo_folder)
+from p003_engine.simulation import load_experiment, run_session
+
+SUBJECTS = {"P003Fc/P003Fc_ExpProgram_RP.py": [("Herriot", "INS"), ("Kurt", "OMS"),
+                                               ("Wario", "INS"), ("Peach", "INS")],
+            "P003e/P003E_ExpProgram_RP.py": [("Jagger", "RR5"), ("Bowie", "RR5"),
+                                             ("Zappa", "RR2"), ("Kurt", "RR20")],
+            "P003B.ii/P003B.ii_ExpProgram_RP.py": [("Herriot", None), ("Wario", None)]}
+
+
+def restart_ms(script_path):
+    # A new interpreter running the experiment script up to run_experiment()
+    code = f"import runpy; runpy.run_path({script_path!r}, run_name='restart')"
+    t0 = perf_counter()
+    run([executable, "-c", code], cwd=os_path.dirname(script_path), check=True,
+        capture_output=True)
+    return (perf_counter() - t0) * 1000
+
+
+def changeover_ms(screen_class, subject, condition, chamber):
+    # A new MainScreen (in chamber, if given) up to the first ITI, then ended
+    t0 = perf_counter()
+    screen = run_session(screen_class, subject, condition, crash_after = 0, chamber = chamber)
+    elapsed = (perf_counter() - t0) * 1000
+    screen.exit_program(None)
+    return elapsed
+
+
+def data_rows(screen):
+    # The events without their session times (which depend on when the
+    # window was made, to the last float bit)
+    return [row[1:] for row in screen.session_data_frame[:]]
+
+
+def main(script="P003Fc/P003Fc_ExpProgram_RP.py", n_sessions=8):
+    script_path = os_path.join(repo_folder, script)
+    screen_class = load_experiment(script_path)
+    birds = SUBJECTS.get(script, SUBJECTS["P003Fc/P003Fc_ExpProgram_RP.py"])
+    birds = [birds[i % len(birds)] for i in range(n_sessions)]
+
+    # Back to back: every session in the first one's window, checked against
+    # the same session run fresh
+    chamber = None
+    for i, (subject, condition) in enumerate(birds):
+        screen = run_session(screen_class, subject, condition, seed = i, chamber = chamber)
+        chamber = screen.chamber
+        fresh = run_session(screen_class, subject, condition, seed = i)
+        assert data_rows(screen) == data_rows(fresh)
+
+    restart = min(restart_ms(script_path) for _ in range(3))
+    fresh = min(changeover_ms(screen_class, subject, condition, None)
+                for subject, condition in birds)
+    reused = min(changeover_ms(screen_class, subject, condition, chamber)
+                 for subject, condition in birds)
+
+    print(f"{script}, {n_sessions} sessions back to back: same data as fresh sessions\n")
+    print(f"{'Changeover per bird (headless windows cost nothing)':>52} | {'ms':>7}")
+    print(f"{'restart: interpreter + imports':>52} | {restart:>7.1f}")
+    print(f"{'restart: box setup (pigpiod, touchscreen mapping)':>52} | {'not run':>7}")
+    print(f"{'restart: new MainScreen up to the first ITI':>52} | {fresh:>7.1f}")
+    print(f"{'back to back: MainScreen in the same window':>52} | {reused:>7.1f}")
+
+
+if __name__ == '__main__':
+    main(*argv[1:2], *[int(a) for a in argv[2:3]])
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: full-length headless sessions of every experiment on the
+virtual clock (see p003_engine/simulation.py).
+
+Runs n_sessions sessions per experiment with a simulated bird, writing the
+data .csv files to a temporary folder, and checks each file has the
+experiment's columns and one TrialNum per planned trial.
+
+    python benchmarks/bench_simulation.py [n_sessions]
+"""
+from csv import reader
+from os import path as os_path
+from sys import argv, path as sys_path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+repo_folder = os_path.dirname(os_path.dirname(os_path.abspath(__file__)))
+sys_path.insert(0, repo_folder)
+from p003_engine.simulation import PoissonPecker, load_experiment, run_session
+
+EXPERIMENTS = [
+    # (script, subject, condition)
+    ("P003e/P003E_ExpProgram_RP.py", "Jagger", "RR5"),
+    ("P003f/P003F_ExpProgram_RP.py", "Peach", None),
+    ("P003Fb/P003Fb_ExpProgram_RP.py", "Herriot", "INS"),
+    ("P003Fc/P003Fc_ExpProgram_RP.py", "Kurt", "OMS"),
+    ("P003Fc/P003Fc_ExpProgram_RP.py", "Peach", "INS"),
+    ("P003B.ii/P003B.ii_ExpProgram_RP.py", "Herriot", None),
+]
+
+
+def main(n_sessions=20):
+    print(f"{'Experiment':>12} | {'Subject':>8} | {'trials':>6} | {'events':>7} | "
+          f"{'sim. min':>8} | {'ms/session':>10}")
+    for script, subject, condition in EXPERIMENTS:
+        screen_class = load_experiment(os_path.join(repo_folder, script))
+        with TemporaryDirectory() as data_folder:
+            t0 = perf_counter()
+            for session in range(n_sessions):
+                screen = run_session(screen_class, subject, condition,
+                                     pecker = PoissonPecker(rate = 2.0),
+                                     data_folder = os_path.join(data_folder, str(session)),
+                                     seed = session)
+            ms = (perf_counter() - t0) * 1000 / n_sessions
+
+            with open(screen.session_writer.file_path, newline='') as data_file:
+                rows = list(reader(data_file))
+            assert rows[0] == screen.header_list
+            trial_nums = set(row[rows[0].index("TrialNum")] for row in rows[1:])
+            assert trial_nums == set(str(t) for t in range(1, screen.max_trials + 1))
+            assert rows[-1][rows[0].index("Event")] == "SessionEnds"
+
+        print(f"{screen.experiment_name:>12} | {subject:>8} | {screen.max_trials:>6} | "
+              f"{len(rows) - 1:>7} | {screen.root.now / 60:>8.1f} | {ms:>10.1f}")
+    print("Every simulated data file has the experiment's columns and trials.")
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:2]])
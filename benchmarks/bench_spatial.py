@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: per-trial spatial metrics (p003_engine/spatial.py) over
+n_pecks synthetic pecks, vectorized vs. a per-peck Python loop.
+
+Pecks are scattered around the key (some anywhere on the screen), about 20
+per trial. The loop is only run on the first 200,000 pecks; both agree
+there.
+
+    python benchmarks/bench_spatial.py [n_pecks]
+"""
+from collections import defaultdict
+from math import atan2, degrees, hypot, log2, pi, sqrt
+from os import path as os_path
+from sys import argv, path as sys_path
+from time import perf_counter
+
+sys_path.insert(0, os_path.dirname(os_path.dirname(os_path.abspath(__file__))))
+import numpy as np
+from p003_engine import geometry
+from p003_engine.spatial import dispersion, grid_cell, metric_columns
+
+
+def synthetic_pecks(n_pecks, rng):
+    on_key = rng.random(n_pecks) < 0.8
+    x = np.where(on_key, rng.normal(geometry.key_center[0], 40, n_pecks),
+                 rng.uniform(0, geometry.mainscreen_width, n_pecks))
+    y = np.where(on_key, rng.normal(geometry.key_center[1], 40, n_pecks),
+                 rng.uniform(0, geometry.mainscreen_height, n_pecks))
+    trial = np.sort(rng.integers(0, n_pecks // 20, n_pecks))
+    return {"session": trial // 180, "trial": trial % 180 + 1,
+            "x": np.clip(np.round(x), 0, 1023), "y": np.clip(np.round(y), 0, 767)}
+
+
+def loop_dispersion(pecks):
+    # The same metrics, one peck at a time
+    groups = defaultdict(list)
+    for session, trial, x, y in zip(pecks["session"].tolist(), pecks["trial"].tolist(),
+                                    pecks["x"].tolist(), pecks["y"].tolist()):
+        groups[(session, trial)].append((x, y))
+    columns = -(-geometry.mainscreen_width // grid_cell)
+    results = {}
+    for key, points in sorted(groups.items()):
+        n = len(points)
+        cx = sum(x for x, y in points) / n
+        cy = sum(y for x, y in points) / n
+        if n > 1:
+            var_x = sum((x - cx) ** 2 for x, y in points) / (n - 1)
+            var_y = sum((y - cy) ** 2 for x, y in points) / (n - 1)
+            cov = sum((x - cx) * (y - cy) for x, y in points) / (n - 1)
+            radius = sqrt(((var_x - var_y) / 2) ** 2 + cov ** 2)
+            major = sqrt((var_x + var_y) / 2 + radius)
+            minor = sqrt(max((var_x + var_y) / 2 - radius, 0))
+            angle = degrees(0.5 * atan2(-2 * cov, var_x - var_y))
+            sds = [sqrt(var_x), sqrt(var_y), major, minor, angle, pi * major * minor]
+        else:
+            sds = [float("nan")] * 6
+        distance = sum(hypot(x - geometry.key_center[0], y - geometry.key_center[1])
+                       for x, y in points) / n
+        cells = defaultdict(int)
+        for x, y in points:
+            cells[int(y // grid_cell) * columns + int(x // grid_cell)] += 1
+        entropy = -sum(c / n * log2(c / n) for c in cells.values())
+        results[key] = [n, cx, cy] + sds + [distance, entropy]
+    return results
+
+
+def main(n_pecks=5000000):
+    rng = np.random.default_rng(0)
+    pecks = synthetic_pecks(n_pecks, rng)
+
+    t0 = perf_counter()
+    metrics = dispersion(pecks)
+    numpy_s = perf_counter() - t0
+
+    n_loop = min(n_pecks, 200000)
+    subset = {name: values[:n_loop] for name, values in pecks.items()}
+    t0 = perf_counter()
+    expected = loop_dispersion(subset)
+    loop_s = perf_counter() - t0
+
+    check = dispersion(subset)
+    for i, key in enumerate(zip(check["session"].tolist(), check["trial"].tolist())):
+        got = [check[name][i] for name in metric_columns]
+        assert np.allclose(got, expected[key], equal_nan = True, rtol = 1e-9, atol = 1e-9), key
+
+    print(f"{n_pecks:,} pecks in {len(metrics['Pecks']):,} trials")
+    print(f"{'Engine':>10} | {'pecks/s':>12}")
+    print(f"{'loop':>10} | {n_loop / loop_s:>12,.0f}")
+    print(f"{'numpy':>10} | {n_pecks / numpy_s:>12,.0f}")
+    print("Both give the same metrics.")
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:2]])
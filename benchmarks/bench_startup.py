@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: cold start of the experiment scripts.
+
+For each experiment script, in a fresh interpreter:
+
+    1. Import-time report (python -X importtime): total time to run the
+       script up to run_experiment(), and the modules that cost the most
+       (cumulative, i.e., with everything they import).
+    2. Control panel time-to-interactive: wall time from launching the
+       script until the control panel prints "Control panel ready" (needs
+       a display; skipped otherwise), checked against target_s.
+
+On the operant boxes the pigpiod connection, Hopper_vals.csv and the
+touchscreen mapping are set up on a background thread (see hardware.py) and
+don't count towards either.
+
+    python benchmarks/bench_startup.py [target_s] [n_runs]
+"""
+from os import path as os_path
+from subprocess import PIPE, Popen, run
+from sys import argv, executable
+from time import perf_counter
+
+repo_folder = os_path.dirname(os_path.dirname(os_path.abspath(__file__)))
+SCRIPTS = ["P003B.ii/P003B.ii_ExpProgram_RP.py", "P003e/P003E_ExpProgram_RP.py",
+           "P003f/P003F_ExpProgram_RP.py", "P003Fb/P003Fb_ExpProgram_RP.py",
+           "P003Fc/P003Fc_ExpProgram_RP.py"]
+
+
+def imported(code, cwd=None):
+    # [(cumulative ms, module)] from python -X importtime -c code; nested
+    # imports are indented under the module that imported them
+    result = run([executable, "-X", "importtime", "-c", code], cwd=cwd,
+                 stdout=PIPE, stderr=PIPE, text=True, check=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((int(cumulative) / 1000, name.rstrip()))
+    return modules
+
+
+def import_report(script_path):
+    # (total ms, [(cumulative ms, module)]) of running the script without
+    # starting the control panel. What runpy itself imports is left out.
+    harness = {name.strip() for _, name in imported("import runpy, pkgutil")}
+    code = f"import runpy; runpy.run_path({script_path!r}, run_name='startup_report')"
+    modules = [(ms, name) for ms, name in imported(code, os_path.dirname(script_path))
+               if name.strip() not in harness]
+    # Top-level imports aren't indented; their cumulative times add up to the total
+    total = sum(ms for ms, name in modules if not name.startswith("  "))
+    return total, modules
+
+
+def time_to_interactive(script_path, timeout=30.0):
+    # Seconds from launch to "Control panel ready", or None if it never shows
+    t0 = perf_counter()
+    process = Popen([executable, "-u", script_path], cwd=os_path.dirname(script_path),
+                    stdout=PIPE, stderr=PIPE, text=True)
+    try:
+        for line in process.stdout:
+            if "Control panel ready" in line:
+                return perf_counter() - t0
+            if perf_counter() - t0 > timeout:
+                break
+        return None
+    finally:
+        process.kill()
+        process.wait()
+
+
+def has_display():
+    result = run([executable, "-c", "import tkinter; tkinter.Tk().destroy()"],
+                 stdout=PIPE, stderr=PIPE)
+    return result.returncode == 0
+
+
+def main(target_s=1.0, n_runs=3):
+    baseline = []
+    for _ in range(n_runs):
+        t0 = perf_counter()
+        run([executable, "-c", "pass"], check=True)
+        baseline.append(perf_counter() - t0)
+    print(f"Interpreter start alone: {min(baseline) * 1000:.0f} ms\n")
+
+    for script in SCRIPTS:
+        script_path = os_path.join(repo_folder, script)
+        total, modules = import_report(script_path)
+        print(f"{script}: imports {total:.1f} ms")
+        for ms, name in sorted(modules, reverse=True)[:6]:
+            print(f"    {ms:>7.1f} ms  {name.strip()}")
+
+    print()
+    if not has_display():
+        print("No display: control panel time-to-interactive not measured.")
+        return
+    print(f"{'Script':>32} | {'ready s (best)':>14} | target {target_s:g} s")
+    for script in SCRIPTS:
+        times = [time_to_interactive(os_path.join(repo_folder, script)) for _ in range(n_runs)]
+        times = [t for t in times if t is not None]
+        if not times:
+            print(f"{script:>32} | {'no panel':>14} |")
+            continue
+        print(f"{script:>32} | {min(times):>14.3f} | {'ok' if min(times) <= target_s else 'MISSED'}")
+
+
+if __name__ == '__main__':
+    main(*[float(a) for a in argv[1:2]], *[int(a) for a in argv[2:3]])
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: preparing the key-sized stimulus images from the PNGs (cold
+cache, same work as before the cache existed) vs. from the disk cache.
+
+Copies each experiment's stimuli/ folder (without its .cache, which any
+session that has run will have filled) to a temporary folder, so the cold
+pass really is cold and the real cache is left alone, then checks the cached pixels are identical to a fresh
+decode + resize.
+
+    python benchmarks/bench_stimulus_cache.py [n_sessions]
+"""
+from os import listdir, path as os_path
+from shutil import copytree, ignore_patterns
+from sys import argv, path as sys_path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+sys_path.insert(0, os_path.dirname(os_path.dirname(os_path.abspath(__file__))))
+from p003_engine import geometry
+from p003_engine.stimulus_cache import cache_folder_name, load_key_image
+
+repo_folder = os_path.dirname(os_path.dirname(os_path.abspath(__file__)))
+
+
+def prepare_session(stimuli_folder):
+    pngs = sorted(f for f in listdir(stimuli_folder) if f.endswith(".png"))
+    return [load_key_image(os_path.join(stimuli_folder, f), geometry.key_pixels)
+            for f in pngs]
+
+
+def main(n_sessions=8):
+    from PIL import Image
+    print(f"{'Experiment':>10} | {'PNGs':>4} | {'cold ms':>8} | {'cached ms':>9} | {'speedup':>7}")
+    for experiment in ["P003B.ii", "P003Fb", "P003Fc"]:
+        with TemporaryDirectory() as temp_folder:
+            stimuli_folder = os_path.join(temp_folder, "stimuli")
+            copytree(os_path.join(repo_folder, experiment, "stimuli"), stimuli_folder,
+                     ignore = ignore_patterns(cache_folder_name))
+
+            t0 = perf_counter()
+            cold = prepare_session(stimuli_folder)
+            cold_ms = (perf_counter() - t0) * 1000
+            assert not any(cached for _, cached in cold)
+
+            t0 = perf_counter()
+            for _ in range(n_sessions):
+                warm = prepare_session(stimuli_folder)
+            warm_ms = (perf_counter() - t0) * 1000 / n_sessions
+            assert all(cached for _, cached in warm)
+
+            for (cold_img, _), (warm_img, _) in zip(cold, warm):
+                assert cold_img.tobytes() == warm_img.tobytes()
+
+            pngs = sorted(f for f in listdir(stimuli_folder) if f.endswith(".png"))
+            reference = (Image.open(os_path.join(stimuli_folder, pngs[0]))
+                         .convert("RGBA")
+                         .resize((geometry.key_pixels, geometry.key_pixels), Image.LANCZOS))
+            assert reference.tobytes() == warm[0][0].tobytes()
+
+        print(f"{experiment:>10} | {len(cold):>4} | {cold_ms:>8.1f} | "
+              f"{warm_ms:>9.2f} | {cold_ms / warm_ms:>6.0f}x")
+    print("Cached images are identical to a fresh decode + resize.")
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:2]])
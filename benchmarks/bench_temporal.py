@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: per-trial IRT metrics (p003_engine/temporal.py) for n_trials
+synthetic 10 s trials (about 15 key pecks each), vectorized vs. a
+per-trial Python loop.
+
+The loop is only run on the first 20,000 trials; both agree there.
+
+    python benchmarks/bench_temporal.py [n_trials]
+"""
+from math import nan, sqrt
+from os import path as os_path
+from sys import argv, path as sys_path
+from time import perf_counter
+
+sys_path.insert(0, os_path.dirname(os_path.dirname(os_path.abspath(__file__))))
+import numpy as np
+from p003_engine.temporal import bin_labels, bout_gap, summary, trial_metrics
+
+CHECKED = ["Responses", "Latency", "IRTs", "MeanIRT", "SDIRT", "CVIRT", "Bouts",
+           "MeanBoutLength", "Pauses", "MeanPause"]
+
+
+def synthetic_trials(n_trials, rng):
+    per_trial = rng.poisson(15, n_trials)
+    trial_index = np.repeat(np.arange(n_trials), per_trial)
+    trials = {"session": np.arange(n_trials) // 180, "trial": np.arange(n_trials) % 180 + 1,
+              "subject": np.arange(n_trials) // 180 % 8, "trial_type": rng.integers(0, 3, n_trials),
+              "reinforced": rng.random(n_trials) < 0.5}
+    # In time order within each trial, like the rows of a data file
+    trial_time = np.round(rng.uniform(0, 10, len(trial_index)), 5)
+    trial_time = trial_time[np.lexsort((trial_time, trial_index))]
+    responses = {"session": trials["session"][trial_index], "trial": trials["trial"][trial_index],
+                 "trial_time": trial_time}
+    return responses, trials
+
+
+def loop_metrics(responses, trials, n_trials):
+    times = [[] for _ in range(n_trials)]
+    for session, trial, time in zip(responses["session"].tolist(), responses["trial"].tolist(),
+                                    responses["trial_time"].tolist()):
+        times[session * 180 + trial - 1].append(time)
+    results = []
+    for trial_times in times:
+        trial_times.sort()
+        n = len(trial_times)
+        irts = [b - a for a, b in zip(trial_times, trial_times[1:])]
+        mean = sum(irts) / len(irts) if irts else nan
+        sd = sqrt(sum((irt - mean) ** 2 for irt in irts) / (len(irts) - 1)) if len(irts) > 1 else nan
+        pauses = [irt for irt in irts if irt > bout_gap]
+        bouts = len(pauses) + 1 if n else 0
+        results.append([n, trial_times[0] if n else nan, len(irts), mean, sd, sd / mean,
+                        bouts, n / bouts if bouts else nan, len(pauses),
+                        sum(pauses) / len(pauses) if pauses else nan])
+    return results
+
+
+def main(n_trials=200000):
+    rng = np.random.default_rng(0)
+    responses, trials = synthetic_trials(n_trials, rng)
+    n_responses = len(responses["trial"])
+
+    t0 = perf_counter()
+    metrics = trial_metrics(responses, trials)
+    numpy_s = perf_counter() - t0
+    t0 = perf_counter()
+    summary(responses, trials)
+    summary_s = perf_counter() - t0
+
+    n_loop = min(n_trials, 20000)
+    in_loop = responses["session"] * 180 + responses["trial"] - 1 < n_loop
+    loop_responses = {name: values[in_loop] for name, values in responses.items()}
+    t0 = perf_counter()
+    expected = loop_metrics(loop_responses, trials, n_loop)
+    loop_s = perf_counter() - t0
+    for i, values in enumerate(expected):
+        got = [metrics[name][i] for name in CHECKED]
+        assert np.allclose(got, values, equal_nan = True, rtol = 1e-9, atol = 1e-9), i
+    assert sum(metrics[label].sum() for label in bin_labels()) == (responses["trial_time"] < 10).sum()
+
+    print(f"{n_trials:,} trials, {n_responses:,} responses")
+    print(f"{'Engine':>20} | {'responses/s':>12}")
+    print(f"{'loop (per trial)':>20} | {in_loop.sum() / loop_s:>12,.0f}")
+    print(f"{'numpy (per trial)':>20} | {n_responses / numpy_s:>12,.0f}")
+    print(f"{'numpy (summary)':>20} | {n_responses / summary_s:>12,.0f}")
+    print("Both give the same metrics.")
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:2]])
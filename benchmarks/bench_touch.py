@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: per-event cost of the key peck handler under a touchscreen "tap
+storm", with and without the TouchFilter (p003_engine/touch.py).
+
+A headless P003e session is stopped 1 s into its first trial. Then the
+key gets n_seconds of taps at 50 Hz; the screen reports each tap as 1 to 4
+events a few ms (and px) apart, with Tk-style event.time stamps. The events
+go to: key_press() directly (no filter, as before), the filtered handler
+keeping every event (merge_ms = 0) and the filtered handler as set up
+(merge_ms = 40, merge_px = 20).
+
+    python benchmarks/bench_touch.py [n_seconds] [rate_hz]
+"""
+from random import Random
+from sys import argv, path as sys_path
+from os import path as os_path
+from time import perf_counter
+
+repo_folder = os_path.dirname(os_path.dirname(os_path.abspath(__file__)))
+sys_path.insert(0, repo_folder)
+from p003_engine import geometry
+from p003_engine.simulation import PeckEvent, load_experiment, run_session
+
+
+class NoPecks(object):
+    # The bird stays still; the storm is delivered by hand
+    def next_interval(self, screen):
+        return 1e6
+
+    def next_location(self, screen):
+        return geometry.key_center
+
+
+def tap_storm(n_seconds, rate_hz, seed=0):
+    # [(event, tap number)]: each tap at rate_hz is reported 1-4 times,
+    # 0-15 ms and up to 3 px apart
+    rng = Random(seed)
+    events = []
+    for tap in range(int(n_seconds * rate_hz)):
+        tap_ms = int(tap * 1000 / rate_hz)
+        x = geometry.key_center[0] + rng.randint(-60, 60)
+        y = geometry.key_center[1] + rng.randint(-60, 60)
+        for repeat in range(rng.randint(1, 4)):
+            event = PeckEvent(x + rng.randint(-3, 3), y + rng.randint(-3, 3))
+            event.time = tap_ms + (rng.randint(0, 15) if repeat else 0)
+            events.append((event, tap))
+    return events
+
+
+def in_trial(screen_class, merge_ms):
+    # A headless session 1 s into its first trial (the key is up), its
+    # TouchFilter merging events within merge_ms
+    screen = run_session(screen_class, "Jagger", "RR5", NoPecks(), seed = 0,
+                         crash_after = (screen_class.first_ITI_duration
+                                        + screen_class.ITI_duration) / 1000 + 1)
+    assert screen.trial_type != "NA"
+    screen.touch.merge_s = merge_ms / 1000
+    return screen
+
+
+def main(n_seconds=60, rate_hz=50):
+    screen_class = load_experiment(os_path.join(repo_folder, "P003e/P003E_ExpProgram_RP.py"))
+    events = tap_storm(n_seconds, rate_hz)
+    n_taps = int(n_seconds * rate_hz)
+
+    results = []
+    for label, merge_ms, filtered in [("key_press, no filter", 0, False),
+                                      ("filter, merge_ms = 0", 0, True),
+                                      ("filter, merge_ms = 40", 40, True)]:
+        screen = in_trial(screen_class, merge_ms)
+        handler = (screen.scene.handlers["key"] if filtered
+                   else lambda event: screen.key_press(event, "key_peck"))
+        pecks_before = screen.trial_peck_counter
+        t0 = perf_counter()
+        for event, _ in events:
+            handler(event)
+        elapsed = perf_counter() - t0
+        results.append((label, elapsed / len(events) * 1e6,
+                        screen.trial_peck_counter - pecks_before))
+
+    print(f"{n_seconds} s storm at {rate_hz} Hz: {n_taps:,} taps reported as "
+          f"{len(events):,} touch events\n")
+    print(f"{'Handler':>22} | {'us/event':>8} | {'pecks counted':>13} | {'vs. taps':>8}")
+    for label, us_per_event, counted in results:
+        print(f"{label:>22} | {us_per_event:>8.2f} | {counted:>13,} | {counted / n_taps:>7.2f}x")
+    print("\nTaps only 20 ms apart that land within merge_px of each other are merged too;"
+          "\npigeons don't peck that fast.")
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in argv[1:3]])
@@ -0,0 +1,5 @@
+"""
+Shared code for the P003 experiment programs (P003B.ii, P003e, P003f, P003Fb
+and P003Fc). Each experiment folder adds the repository root to sys.path and
+imports what it needs from here.
+"""
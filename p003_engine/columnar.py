@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Megan C. & Cyrus K.
+
+Compact, typed, column-by-column copies of the session data .csv files, for
+analysis. The .csv files spell every SessionTime out as H:MM:SS.ffffff,
+write "NA" into Xcord/Ycord, and repeat the subject, date and stimulus on
+every row; a ".columns" file next to each .csv stores each column once, as a
+typed array, the same way EventLog (event_log.py) does during a session:
+
+    SessionTime       -- float64 seconds
+    Xcord, Ycord      -- int16, -32768 for "NA"
+    TrialTime         -- float64
+    peck/trial counts -- int32
+    Date              -- int32 day number
+    everything else   -- uint16 codes into one table of distinct strings
+                         (Event, TrialType, TrialColor, Subject...)
+
+A column whose values wouldn't come back exactly (e.g., a hand-edited file)
+is stored as codes instead. Session files from before the engine don't
+always have as many values per row as their header has names: P003e wrote
+a HiddenPatch header but never the value (13 values, 14 names), and P003Fb
+wrote the hidden patch before the date without a name for it (13 values, 12
+names). Their columns are named for what they hold (data_column_names())
+and the header is kept as written. Before a .columns file is written, it is turned
+back into .csv text and compared with the original, byte for byte, so
+to_csv() always gives back the original file.
+
+File layout (all in native byte order, recorded in the header):
+
+    b"P003COL1", uint64 data offset, uint64 header length
+    header      -- JSON: rows, columns (name, kind, typecode, offset),
+                   string table, the .csv header as written and the
+                   size/SHA-256 of the source .csv
+    column data -- one array per column, each starting on an 8-byte boundary
+
+ColumnarSession memory-maps the file, so opening one only reads the header
+and column(name) is a zero-copy memoryview (numpy.asarray() of it is too).
+For the analyses (spatial.py, temporal.py), load_events() gathers chosen
+events from many sessions into flat NumPy arrays, and archive_paths() lists
+the .columns files of a data folder, converting new sessions first.
+
+Converting (parsing the .csv text, times and all) is what takes the time,
+so convert_folder() spreads it over worker processes. Each worker writes
+its own .columns files and only hands back an error message, if any; the
+sessions are then memory-mapped and merged by load_events() in the calling
+process, which costs next to nothing.
+
+    python -m p003_engine.columnar ~/Desktop/Data
+"""
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from csv import QUOTE_MINIMAL, reader, writer
+from datetime import date
+from hashlib import sha256
+from io import StringIO
+from json import dumps, loads
+from mmap import ACCESS_READ, mmap
+from os import cpu_count, path as os_path, replace, walk
+from struct import calcsize, pack, unpack_from
+from sys import argv, byteorder
+
+from p003_engine.event_log import column_types, decode_column, missing_coord, typecodes
+
+magic = b"P003COL1"
+prefix_format = "<8sQQ" # magic, data offset, header length
+columnar_suffix = ".columns"
+
+
+def parse_session_time(text):
+    # "H:MM:SS[.ffffff]" (str of a timedelta) -> seconds
+    hours, minutes, seconds = text.split(":")
+    whole, _, fraction = seconds.partition(".")
+    microseconds = (((int(hours) * 60 + int(minutes)) * 60 + int(whole)) * 1000000
+                    + int(fraction.ljust(6, "0") or 0))
+    return microseconds / 1e6
+
+
+parsers = {
+    "session_time": parse_session_time,
+    "coord": lambda text: missing_coord if text == "NA" else int(text),
+    "float": float,
+    "int": int,
+    "date": lambda text: date.fromisoformat(text).toordinal(),
+    }
+
+
+def csv_text(rows):
+    # The exact text SessionWriter writes for these rows
+    text = StringIO()
+    writer(text, quoting=QUOTE_MINIMAL).writerows(rows)
+    return text.getvalue()
+
+
+def encode_column(kind, texts, code_values, code_index):
+    # Returns (kind, array) for one column of .csv strings, falling back to
+    # "code" if the typed values wouldn't print back exactly
+    if kind != "code":
+        try:
+            values = array(typecodes[kind], map(parsers[kind], texts))
+            if [str(value) for value in decode_column(kind, values, code_values)] == texts:
+                return kind, values
+        except (ValueError, OverflowError):
+            pass
+        kind = "code"
+    codes = array(typecodes["code"])
+    for text in texts:
+        code = code_index.get(text)
+        if code is None:
+            code = code_index[text] = len(code_values)
+            code_values.append(text)
+        codes.append(code)
+    return kind, codes
+
+
+def data_column_names(csv_header, width):
+    # Names of the width values in each row of a session file with this
+    # header (see the legacy layouts above)
+    if width <= len(csv_header):
+        # P003e: HiddenPatch is named but never written
+        return list(csv_header[:width])
+    if width == len(csv_header) + 1 and csv_header[-1] == "Date":
+        # P003Fb: ..., Subject, <hidden patch>, Date
+        return list(csv_header[:-1]) + ["HiddenPatch", "Date"]
+    return list(csv_header) + [f"Column{i + 1}" for i in range(len(csv_header), width)]
+
+
+def convert(csv_path, columnar_path=None):
+    # Writes the .columns copy of one session .csv; returns its path. Raises
+    # ValueError if the .csv couldn't be given back exactly.
+    columnar_path = columnar_path or os_path.splitext(csv_path)[0] + columnar_suffix
+    with open(csv_path, "rb") as data_file:
+        contents = data_file.read()
+    rows = list(reader(contents.decode("utf-8").splitlines()))
+    if not rows:
+        raise ValueError(f"{csv_path} is empty")
+    csv_header = rows[0]
+    width = len(rows[1]) if len(rows) > 1 else len(csv_header)
+    if any(len(row) != width for row in rows[1:]):
+        raise ValueError(f"{csv_path} has rows of different lengths")
+    header_list = data_column_names(csv_header, width)
+
+    code_values, code_index = [], {}
+    kinds, columns = [], []
+    texts_by_column = [list(texts) for texts in zip(*rows[1:])] or [[] for _ in header_list]
+    for name, texts in zip(header_list, texts_by_column):
+        kind, values = encode_column(column_types.get(name, "code"), texts,
+                                     code_values, code_index)
+        kinds.append(kind)
+        columns.append(values)
+
+    # Check the round trip before anything is written
+    decoded = [decode_column(kind, values, code_values) for kind, values in zip(kinds, columns)]
+    if csv_text([csv_header] + list(map(list, zip(*decoded)))).encode("utf-8") != contents:
+        raise ValueError(f"{csv_path} doesn't round-trip exactly (unusual quoting or line endings?)")
+
+    # Column offsets, relative to the start of the data, on 8-byte boundaries
+    offsets, data_size = [], 0
+    for values in columns:
+        offsets.append(data_size)
+        data_size += -(-len(values) * values.itemsize // 8) * 8
+    header = dumps({
+        "rows": len(rows) - 1,
+        "byteorder": byteorder,
+        "columns": [{"name": name, "kind": kind, "typecode": values.typecode, "offset": offset}
+                    for name, kind, values, offset in zip(header_list, kinds, columns, offsets)],
+        "code_values": code_values,
+        "csv_header": csv_header,
+        "source": {"size": len(contents), "sha256": sha256(contents).hexdigest()},
+        }).encode("utf-8")
+    data_offset = -(-(calcsize(prefix_format) + len(header)) // 8) * 8
+
+    # Written to a temporary file first so a half-written copy is never read
+    temp_path = f"{columnar_path}.tmp"
+    with open(temp_path, "wb") as columnar_file:
+        columnar_file.write(pack(prefix_format, magic, data_offset, len(header)))
+        columnar_file.write(header)
+        for values, offset in zip(columns, offsets):
+            columnar_file.seek(data_offset + offset)
+            values.tofile(columnar_file)
+        columnar_file.truncate(data_offset + data_size)
+    replace(temp_path, columnar_path)
+    return columnar_path
+
+
+class ColumnarSession(object):
+    # Read-only view of a .columns file. Use it in a with block, or call
+    # close() once every column() view has been released.
+    def __init__(self, columnar_path):
+        self.columnar_path = columnar_path
+        with open(columnar_path, "rb") as columnar_file:
+            self.buffer = mmap(columnar_file.fileno(), 0, access=ACCESS_READ)
+        file_magic, self.data_offset, header_size = unpack_from(prefix_format, self.buffer)
+        if file_magic != magic:
+            raise ValueError(f"{columnar_path} isn't a .columns file")
+        start = calcsize(prefix_format)
+        header = loads(self.buffer[start:start + header_size])
+        self.n_rows = header["rows"]
+        self.native = header["byteorder"] == byteorder
+        self.columns = {column["name"]: column for column in header["columns"]}
+        self.header_list = [column["name"] for column in header["columns"]]
+        self.csv_header = header.get("csv_header", self.header_list) # As the .csv has it
+        self.code_values = header["code_values"]
+        self.source = header["source"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.buffer.close()
+
+    def kind(self, name):
+        return self.columns[name]["kind"]
+
+    def column(self, name):
+        # The stored values of one column (codes for "code" columns; see
+        # code_values), straight from the mapped file
+        column = self.columns[name]
+        start = self.data_offset + column["offset"]
+        size = self.n_rows * array(column["typecode"]).itemsize
+        if self.native:
+            return memoryview(self.buffer)[start:start + size].cast(column["typecode"])
+        values = array(column["typecode"], self.buffer[start:start + size])
+        values.byteswap()
+        return memoryview(values)
+
+    def values(self, name):
+        # One column as the values the data matrix held ("NA", strings...)
+        view = self.column(name)
+        try:
+            return decode_column(self.kind(name), view, self.code_values)
+        finally:
+            view.release()
+
+    def rows(self):
+        # Every row, header first (as the .csv has it), as lists (like the
+        # old data matrix)
+        return [list(self.csv_header)] + list(map(list, zip(*[self.values(name)
+                                                               for name in self.header_list])))
+
+    def to_csv(self, csv_path):
+        # Writes the original .csv back out, byte for byte
+        with open(csv_path, "w", newline="") as data_file:
+            data_file.write(csv_text(self.rows()))
+
+
+# Columns of load_events() that hold ids into its labels
+label_columns = ["session", "subject", "trial_type", "event"]
+
+
+def load_events(columnar_paths, events):
+    # Gathers the rows of the given events (e.g., ["key_peck"]) from any
+    # number of .columns files into flat NumPy arrays, for the analyses.
+    # Returns (data, labels): data holds one array per column ("session",
+    # "subject", "trial", "trial_type", "event" ids; "x", "y", NaN for "NA";
+    # "session_time", "trial_time" in s) and labels maps each id column to
+    # the list its ids index into. NumPy is only needed by the analyses.
+    import numpy as np
+    labels = {name: [] for name in label_columns}
+    labels["event"] = list(events)
+    ids = {name: {} for name in label_columns}
+    ids["event"] = {event: i for i, event in enumerate(events)}
+    parts = {name: [] for name in ["session", "subject", "trial", "trial_type", "event",
+                                   "x", "y", "session_time", "trial_time"]}
+    numeric_columns = {"Xcord": "coord", "Ycord": "coord", "TrialNum": "int",
+                       "SessionTime": "session_time", "TrialTime": "float"}
+
+    def code_ids(session, column_name, label_name):
+        # Maps the session's codes for one column onto ids into labels[label_name]
+        if session.kind(column_name) != "code":
+            raise ValueError(f"{session.columnar_path}: {column_name} isn't stored as codes")
+        codes = np.asarray(session.column(column_name))
+        lookup = np.full(len(session.code_values), -1, dtype=np.int32)
+        for code in np.unique(codes):
+            value = session.code_values[code]
+            if value not in ids[label_name]:
+                if label_name == "event":
+                    continue # Not one of the events asked for
+                ids[label_name][value] = len(labels[label_name])
+                labels[label_name].append(value)
+            lookup[code] = ids[label_name][value]
+        return lookup[codes]
+
+    for session_number, columnar_path in enumerate(columnar_paths):
+        labels["session"].append(os_path.basename(columnar_path))
+        with ColumnarSession(columnar_path) as session:
+            for name, kind in numeric_columns.items():
+                if session.kind(name) != kind:
+                    raise ValueError(f"{columnar_path}: {name} isn't stored as {kind}")
+            event = code_ids(session, "Event", "event")
+            keep = np.flatnonzero(event >= 0)
+            parts["event"].append(event[keep])
+            for name, column_name in [("x", "Xcord"), ("y", "Ycord")]:
+                values = np.asarray(session.column(column_name))[keep].astype(np.float64)
+                values[values == missing_coord] = np.nan
+                parts[name].append(values)
+            parts["session_time"].append(np.asarray(session.column("SessionTime"))[keep])
+            parts["trial_time"].append(np.asarray(session.column("TrialTime"))[keep])
+            parts["trial"].append(np.asarray(session.column("TrialNum"))[keep])
+            parts["trial_type"].append(code_ids(session, "TrialType", "trial_type")[keep])
+            parts["subject"].append(code_ids(session, "Subject", "subject")[keep])
+            parts["session"].append(np.full(len(keep), session_number, dtype=np.int32))
+
+    data = {name: (np.concatenate(arrays) if arrays else np.zeros(0))
+            for name, arrays in parts.items()}
+    return data, labels
+
+
+def archive_paths(data_folder, workers=None, **filters):
+    # .columns paths of the sessions in a data folder, oldest first,
+    # converting any .csv without an up-to-date copy first (in workers
+    # processes, see convert_folder()). filters are those of
+    # SessionManifest.sessions() (experiment, subject, since...).
+    from p003_engine.manifest import SessionManifest
+    failed = convert_folder(data_folder, workers)[2]
+    if failed:
+        print(f"WARNING: {len(failed)} session files in {data_folder} couldn't be converted "
+              f"and are left out (see above)")
+    manifest = SessionManifest(data_folder)
+    manifest.update()
+    paths = [os_path.splitext(manifest.file_path(entry))[0] + columnar_suffix
+             for entry in manifest.sessions(**filters)]
+    return [path for path in paths if os_path.exists(path)]
+
+
+def convert_file(csv_path):
+    # convert() for convert_folder()'s worker processes: returns the error
+    # message instead of raising, and nothing bigger than that
+    try:
+        convert(csv_path)
+    except (ValueError, UnicodeDecodeError) as error:
+        return str(error)
+    return None
+
+
+def convert_folder(data_folder, workers=None):
+    # Converts every session .csv under data_folder that has no up-to-date
+    # .columns copy; returns (converted, skipped, failed paths). The files
+    # are spread over workers processes (default: one per CPU); each writes
+    # its .columns file itself, so no rows travel between processes.
+    from p003_engine.manifest import data_file_pattern
+    pending, skipped = [], 0
+    for folder, subfolders, file_names in walk(data_folder):
+        subfolders.sort()
+        for file_name in sorted(file_names):
+            if not data_file_pattern.match(file_name):
+                continue
+            csv_path = os_path.join(folder, file_name)
+            columnar_path = os_path.splitext(csv_path)[0] + columnar_suffix
+            if (os_path.exists(columnar_path)
+                    and os_path.getmtime(columnar_path) >= os_path.getmtime(csv_path)):
+                skipped += 1
+            else:
+                pending.append(csv_path)
+
+    workers = min(workers or cpu_count() or 1, len(pending))
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as executor:
+            errors = list(executor.map(convert_file, pending,
+                                       chunksize=max(1, len(pending) // (workers * 4))))
+    else:
+        errors = [convert_file(csv_path) for csv_path in pending]
+    failed = []
+    for csv_path, error in zip(pending, errors):
+        if error:
+            print(f"Not converted: {error}")
+            failed.append(csv_path)
+    return len(pending) - len(failed), skipped, failed
+
+
+if __name__ == '__main__':
+    for data_folder in argv[1:]:
+        converted, skipped, failed = convert_folder(os_path.expanduser(data_folder))
+        print(f"{data_folder}: {converted} converted, {skipped} up to date, {len(failed)} failed")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Megan C. & Cyrus K.
+
+Terminal feedback for a session, written by a background thread. Printing a
+line for every peck from the Tkinter thread means a bird hammering the key
+waits on the terminal (slow on the Pi's console or over SSH). ConsoleEcho
+only puts each message on a queue; a worker thread formats whatever has
+piled up and writes it out in one go. Once close() has run (at the end of
+the session, or when the program exits), messages are written right away
+instead.
+
+Verbosity levels, from least to most output:
+
+    "silent"   -- nothing
+    "trials"   -- session/trial messages and trial outcomes, no pecks
+    "summary"  -- as "trials", plus one line per second counting the pecks
+    "events"   -- every event, one line each (the old behaviour), capped at
+                  max_lines_per_second; extra lines are counted instead
+"""
+from atexit import register, unregister
+from collections import Counter
+from datetime import timedelta
+from queue import Empty, Queue
+import sys
+from threading import Thread
+from time import monotonic
+
+levels = ["silent", "trials", "summary", "events"]
+
+
+def event_line(outcome, x, y, trial_type, session_time):
+    return (f"{outcome:>30} | x: {x: ^3} y: {y:^3} | "
+            f"{trial_type:^5} | {timedelta(seconds = session_time)}")
+
+
+class ConsoleEcho(object):
+    def __init__(self, verbosity="events", max_lines_per_second=20, stream=None):
+        if verbosity not in levels:
+            raise ValueError(f"verbosity must be one of {levels}")
+        self.level = levels.index(verbosity)
+        self.max_lines_per_second = max_lines_per_second
+        self.stream = stream # None: whatever sys.stdout is when writing
+        self.messages = Queue()
+        self.worker = None
+        self.closed = False
+        if self.level > 0:
+            self.worker = Thread(target=self._work, name="console", daemon=True)
+            self.worker.start()
+            register(self.close)
+
+    # The two methods below are called from the Tkinter thread; they only
+    # queue the message (or write it right away once closed)
+
+    def info(self, text, verbosity="trials"):
+        # A message shown at the given verbosity level and above
+        if self.level >= levels.index(verbosity):
+            if self.closed:
+                self.write([text])
+            else:
+                self.messages.put(("info", text))
+
+    def event(self, outcome, x, y, trial_type, session_time):
+        # One line of write_data(); pecks have coordinates, trial outcomes don't
+        if self.level > 0:
+            if self.closed:
+                if x == "NA" or self.level == 3:
+                    self.write([event_line(outcome, x, y, trial_type, session_time)])
+            else:
+                self.messages.put(("event", outcome, x, y, trial_type, session_time))
+
+    def close(self):
+        # Writes out anything still queued and stops the worker (once; the
+        # exit hook goes too, so closed sessions don't pile hooks up)
+        if self.closed:
+            return
+        self.closed = True
+        if self.worker is not None:
+            unregister(self.close)
+            if self.worker.is_alive():
+                self.messages.put(None)
+                self.worker.join(5.0)
+
+    def write(self, lines):
+        stream = self.stream or sys.stdout
+        stream.write("\n".join(lines) + "\n")
+        stream.flush()
+
+    def _work(self):
+        window_start = monotonic() # Current one-second window
+        lines_this_window = 0
+        suppressed = 0
+        peck_counts = Counter()
+        running = True
+        while running:
+            # Wait for a message, but wake up for the end of the window
+            batch = []
+            try:
+                batch.append(self.messages.get(
+                    timeout = max(0.0, window_start + 1 - monotonic())))
+                while True:
+                    batch.append(self.messages.get_nowait())
+            except Empty:
+                pass
+
+            lines = []
+            for message in batch:
+                if message is None:
+                    running = False
+                    break
+                if message[0] == "info":
+                    lines.append(message[1])
+                    continue
+                _, outcome, x, y, trial_type, session_time = message
+                if x == "NA" or self.level == 3:
+                    # Trial outcomes always get a line; pecks only in "events"
+                    if x != "NA" and lines_this_window >= self.max_lines_per_second:
+                        suppressed += 1
+                        continue
+                    lines_this_window += x != "NA"
+                    lines.append(event_line(outcome, x, y, trial_type, session_time))
+                elif self.level == 2:
+                    peck_counts[outcome] += 1
+
+            if monotonic() >= window_start + 1 or not running:
+                if suppressed:
+                    lines.append(f"{'':>30}   ... {suppressed} more events this second")
+                if peck_counts:
+                    lines.append("  1 s: " + ", ".join(f"{count} {outcome}"
+                                                       for outcome, count in sorted(peck_counts.items())))
+                window_start = monotonic()
+                lines_this_window = suppressed = 0
+                peck_counts.clear()
+
+            if lines:
+                self.write(lines)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Megan C. & Cyrus K.
+
+The ExperimenterControlPanel (CP) shared by every P003 experiment, plus the
+run_experiment() entry point each experiment script calls. The program is
+largely recursive and self-contained within each object, and a macro-level
+overview is:
+
+    ControlPanel -----------> MainScreen ------------> PaintProgram
+         |                        |                         |
+    Collects main           Runs the actual         Gets passed subject
+    variables, passes      experiment, saves        name, but operates
+    to Mainscreen          data when exited          independently
+
+As soon as a pigeon and condition are picked, the CP runs the session's
+preflight (MainScreen.preflight(): stimulus assignments, stimulus images,
+trial order, data folder), so that problems show up before the bird is in
+the box and the spacebar starts the session right away.
+
+Sessions can be run one after the other without restarting the program:
+each new session reuses the last one's window (see main_screen.Chamber)
+and the box hardware, which is only shut down when the CP is closed. The
+PaintProgram runs then too, for every bird whose session ended.
+"""
+from os import getcwd, makedirs, path as os_path
+from sys import setrecursionlimit
+from tkinter import Tk, Label, Button, StringVar, OptionMenu, IntVar, \
+     Radiobutton
+
+from p003_engine.hardware import operant_box_version, box, missing_modules, paint_queued
+from p003_engine.journal import find_resumable, recover_sessions
+
+# Below  is just a safety measure to prevent too many recursive loops). It
+# doesn't need to be changed.
+setrecursionlimit(5000)
+
+
+# The CP exists "behind the scenes" throughout the entire session, and if it
+# is exited, the session will terminate.
+class ExperimenterControlPanel(object):
+    # Settings below are overwritten by each experiment's subclass
+    experiment_name = "P003"
+    data_folder = "P003_data" # The folder within Desktop/Data where subject data is kept
+    pigeon_name_list = []
+    condition_label = None # e.g., "Experimental Phase" or "Condition" (None if no menu)
+    condition_titles = []
+    main_screen_class = None # The experiment's MainScreen subclass
+
+    def __init__(self, experiment_directory):
+        # Folder of the experiment script (stimuli and assignment .csv files)
+        self.experiment_directory = experiment_directory
+        # Next up, we need to do a couple things that will be different based
+        # on whether the program is being run in the operant boxes or on a
+        # personal computer, like the location where data files should be stored.
+        if operant_box_version:
+            # Setup the data directory in "Desktop/Data"
+            self.data_folder_directory = str(os_path.expanduser('~'))+"/Desktop/Data/" + self.data_folder
+        else: # If not, just save in the current directory the program us being run in
+            self.data_folder_directory = getcwd() + "/data"
+
+        # If the last session was interrupted (e.g., the program crashed),
+        # rebuild its data file from the event journal (see journal.py)
+        for csv_path in recover_sessions(self.data_folder_directory):
+            print(f"\n ** INTERRUPTED SESSION RECOVERED: {csv_path} **")
+
+        # Session plan of the pigeon/condition picked (see run_preflight())
+        self.preflight_plan = None
+        self.preflight_choice = None
+        # The current (or last) session and its window, reused by the next one
+        self.MS = None
+        self.chamber = None
+
+        # setup the root Tkinter window
+        self.control_window = Tk()
+        self.control_window.title(f"{self.experiment_name} Control Panel")
+        ##  Next, setup variables within the control panel
+        # Subject ID
+        self.pigeon_name_list = sorted(self.pigeon_name_list) # This alphabetizes the list
+        self.pigeon_name_list.insert(0, "TEST")
+
+        Label(self.control_window, text="Pigeon Name:").pack()
+        self.subject_ID_variable = StringVar(self.control_window)
+        self.subject_ID_variable.set("Select")
+        self.subject_ID_menu = OptionMenu(self.control_window,
+                                          self.subject_ID_variable,
+                                          *self.pigeon_name_list,
+                                          command=self.set_pigeon_ID).pack()
+
+        # Experimental phases/conditions (if the experiment has any)
+        self.condition_variable = StringVar(self.control_window)
+        self.condition_variable.set("Select")
+        if self.condition_label:
+            Label(self.control_window, text=f"{self.condition_label}:").pack()
+            self.condition_menu = OptionMenu(self.control_window,
+                                             self.condition_variable,
+                                             *self.condition_titles,
+                                             command=lambda condition: self.run_preflight()
+                                             ).pack()
+
+        # Record data variable?
+        Label(self.control_window,
+              text = "Record data in seperate data sheet?").pack()
+        self.record_data_variable = IntVar()
+        self.record_data_rad_button1 =  Radiobutton(self.control_window,
+                                   variable = self.record_data_variable, text = "Yes",
+                                   value = True).pack()
+        self.record_data_rad_button2 = Radiobutton(self.control_window,
+                                  variable = self.record_data_variable, text = "No",
+                                  value = False).pack()
+        self.record_data_variable.set(True) # Default set to True
+
+        # Start button
+        self.start_button = Button(self.control_window,
+                                   text = 'Start program',
+                                   bg = "green2",
+                                   command = self.build_chamber_screen).pack()
+        # Or continue the pigeon's last unfinished session (see journal.py)
+        self.resume_button = Button(self.control_window,
+                                    text = 'Resume session',
+                                    command = self.resume_chamber_screen).pack()
+
+        # Printed once the panel is up and handling input (the hardware may
+        # still be setting up in the background; see hardware.py)
+        self.control_window.after_idle(lambda: print("Control panel ready"))
+        # This makes sure that the control panel remains onscreen until exited
+        self.control_window.mainloop() # This loops around the CP object
+        # The CP was closed: only now is the box hardware shut down, and the
+        # birds run today get their paintings (see hardware.py)
+        if operant_box_version and box is not None and box.set_up():
+            box.shutdown()
+        if operant_box_version:
+            paint_queued()
+
+    def set_pigeon_ID(self, pigeon_name):
+        # This function checks to see if a pigeon's data folder currently
+        # exists in the respective "data" folder and, if not, creates one.
+        pigeon_folder = os_path.join(self.data_folder_directory, pigeon_name)
+        if not os_path.isdir(pigeon_folder):
+            makedirs(pigeon_folder)
+            print("\n ** NEW DATA FOLDER FOR %s CREATED **" % pigeon_name.upper())
+        else:
+            print(f"DATA FOLDER FOR {pigeon_name.upper()} EXISTS")
+        self.run_preflight()
+
+    def chosen_session(self):
+        # (pigeon, condition) picked in the menus, or None if not both yet
+        subject_ID = str(self.subject_ID_variable.get())
+        if subject_ID not in self.pigeon_name_list:
+            return None
+        if self.condition_label is None:
+            return subject_ID, None
+        if self.condition_variable.get() == "Select":
+            return None
+        return subject_ID, self.condition_variable.get()
+
+    def run_preflight(self):
+        # Builds the session plan for the pigeon/condition picked (see
+        # MainScreen.preflight()) and reports any problem with it right away.
+        # Returns whether the session is ready to start.
+        choice = self.chosen_session()
+        if choice is None:
+            return False
+        if choice == self.preflight_choice and self.preflight_plan is not None:
+            return True
+        self.preflight_plan, self.preflight_choice = None, choice
+        try:
+            self.preflight_plan = self.main_screen_class.preflight(
+                choice[0], choice[1], self.data_folder_directory, self.experiment_directory)
+        except (ValueError, OSError) as e:
+            print(f"\n ERROR: Session for {choice[0]} can't start: {e}")
+            return False
+        plan = self.preflight_plan["plan"]
+        print(f"Session ready: {len(plan['trial_assignment_list'])} trials, "
+              f"{len(set(plan['stimulus_assignments'].values()))} stimuli")
+        return True
+
+    def build_chamber_screen(self):
+        # Once the green "start program" button is pressed, then the mainscreen
+        # object is created and pops up in a new window. It gets passed the
+        # important inputs from the control panel.
+        if self.session_running():
+            return
+        if self.subject_ID_variable.get() in self.pigeon_name_list:
+            if self.condition_label is None or self.condition_variable.get() != "Select":
+                # Usually already done when the pigeon/condition were picked
+                if not self.run_preflight():
+                    return
+                if not self.hardware_ready(): # Setup started at import (usually long done)
+                    return
+                print("Operant Box Screen Built")
+                self.MS = self.main_screen_class(
+                    str(self.subject_ID_variable.get()), # subject_ID
+                    self.record_data_variable.get(), # Boolean for recording data (or not)
+                    self.data_folder_directory, # directory for data folder
+                    self.experiment_directory, # directory of the experiment script
+                    self.condition_variable.get() if self.condition_label else None, # e.g., "RR2" or "INS"
+                    preflight_plan = self.preflight_plan,
+                    chamber = self.chamber
+                    )
+                self.chamber = self.MS.chamber
+                # Each plan (trial order, hidden patch) is used for one session only
+                self.preflight_plan, self.preflight_choice = None, None
+            else:
+                print(f"\n ERROR: Input {self.condition_label} Before Starting Session")
+        else:
+            print("\n ERROR: Input Correct Pigeon ID Before Starting Session")
+
+
+    def resume_chamber_screen(self):
+        # Like build_chamber_screen(), but picks the pigeon's last unfinished
+        # session back up after its last completed trial, into the same data
+        # file (the condition is the one the session was started with)
+        if self.session_running():
+            return
+        subject_ID = str(self.subject_ID_variable.get())
+        if subject_ID not in self.pigeon_name_list:
+            print("\n ERROR: Input Correct Pigeon ID Before Resuming Session")
+            return
+        resume = find_resumable(self.data_folder_directory, subject_ID)
+        if resume is None:
+            print(f"\n ERROR: No Unfinished Session of {subject_ID} to Resume")
+            return
+        if not self.hardware_ready():
+            return
+        print(f"Resuming {resume['data_file']} at trial {resume['checkpoint']['trials'] + 1}")
+        self.MS = self.main_screen_class(
+            subject_ID,
+            self.record_data_variable.get(),
+            self.data_folder_directory,
+            self.experiment_directory,
+            resume["plan"]["condition"],
+            resume = resume,
+            chamber = self.chamber)
+        self.chamber = self.MS.chamber
+
+    def hardware_ready(self):
+        # Waits for the box setup; False (with the reason printed) if the
+        # box can't be used, so no session starts without its hardware
+        if not operant_box_version:
+            return True
+        if box is None:
+            print(f"\n ERROR: Cannot find hopper hardware ({', '.join(missing_modules)})! "
+                  "Check desktop, then restart the program.")
+            return False
+        try:
+            box.ready()
+        except Exception as error:
+            print(f"\n ERROR: Operant box setup failed ({error!r})! "
+                  "Check the box, then restart the program.")
+            return False
+        return True
+
+    def session_running(self):
+        # Only one session at a time (they share the window and the box)
+        if self.MS is not None and not self.MS.session_ended:
+            print("\n ERROR: End the Current Session (esc) Before Starting Another")
+            return True
+        return False
+
+
+def run_experiment(control_panel_class, experiment_directory):
+    # Finally, this is the code that actually runs:
+    try:
+        return control_panel_class(experiment_directory)
+    except:
+        # If an unexpected error, make sure to clean up the GPIO board
+        if operant_box_version and box is not None and box.set_up():
+            box.commands.drain(2.0) # Let any queued command finish first
+            box.release_servo()
+            box.rpi_board.stop()
+        raise
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Megan C. & Cyrus K.
+
+Compact in-memory log of session events. The data matrix used to be a list
+holding one 12-to-14 item list per peck, full of per-row strings, floats and
+date objects. EventLog keeps one typed array per column instead:
+
+    session_time  -- float64 seconds, printed as H:MM:SS.ffffff
+    coord         -- int16 pixel (e.g., Xcord); "NA" for non-peck events
+    float         -- float64 (e.g., TrialTime)
+    int           -- int32 counter (e.g., TargetPeckNum)
+    date          -- int32 day number, printed as YYYY-MM-DD
+    code          -- uint16 index into a table of distinct values (event
+                     names, trial types, colors, the subject...), so each
+                     distinct string is only stored once
+
+Rows are only turned back into Python values when they're read (e.g., by
+SessionWriter at each ITI), and they come out exactly as the old lists did,
+so the .csv files are unchanged. Like the old matrix, row 0 is the header.
+"""
+from array import array
+from datetime import date, timedelta
+
+# How each data column is stored; any other column is stored as a "code"
+column_types = {
+    "SessionTime": "session_time",
+    "Xcord": "coord",
+    "Ycord": "coord",
+    "Event": "code",
+    "TrialTime": "float",
+    "TrialType": "code",
+    "TargetPeckNum": "int",
+    "BackgroundPeckNum": "int",
+    "TrialNum": "int",
+    "TrialColor": "code",
+    "Subject": "code",
+    "ExpPhase": "code",
+    "HiddenPatch": "code",
+    "Date": "date",
+    }
+
+typecodes = {"session_time": "d", "coord": "h", "float": "d", "int": "i",
+             "date": "i", "code": "H"}
+
+missing_coord = -32768 # int16 stand-in for "NA" coordinates
+
+
+def decode_column(kind, values, code_values):
+    # Turns stored values of one column back into the Python values the data
+    # matrix held; code_values is the table "code" values index into
+    if kind == "code":
+        return [code_values[value] for value in values]
+    if kind == "coord":
+        return ["NA" if value == missing_coord else value for value in values]
+    if kind == "session_time":
+        return [str(timedelta(seconds = value)) for value in values]
+    if kind == "date":
+        # Nearly every event of a session shares one date
+        dates = {}
+        return [dates.get(value) or dates.setdefault(value, date.fromordinal(value))
+                for value in values]
+    return list(values)
+
+
+class EventLog(object):
+    def __init__(self, header_list):
+        self.header_list = list(header_list)
+        self.kinds = [column_types.get(column, "code") for column in self.header_list]
+        self.columns = [array(typecodes[kind]) for kind in self.kinds]
+        self.code_values = [] # Distinct values of every "code" column...
+        self.code_index = {} # ...and their positions in code_values
+        self.n_events = 0
+
+    def intern(self, value):
+        code = self.code_index.get(value)
+        if code is None:
+            code = self.code_index[value] = len(self.code_values)
+            self.code_values.append(value)
+        return code
+
+    def append(self, row):
+        # row holds one value per column, in header_list order
+        for column, kind, value in zip(self.columns, self.kinds, row):
+            if kind == "code":
+                column.append(self.intern(value))
+            elif kind == "coord":
+                column.append(missing_coord if value == "NA" else value)
+            elif kind == "date":
+                column.append(value.toordinal())
+            else:
+                column.append(value)
+        self.n_events += 1
+
+    def decode(self, kind, values):
+        # Turns a run of stored values from one column back into Python values
+        return decode_column(kind, values, self.code_values)
+
+    def __len__(self):
+        # Rows including the header, like the old list of lists
+        return self.n_events + 1
+
+    def __getitem__(self, index):
+        # Rows come out as the lists of values the old data matrix held
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("EventLog only supports contiguous slices")
+            rows = []
+            if start == 0 and stop > 0:
+                rows.append(list(self.header_list))
+                start = 1
+            # Event i is row i + 1 (row 0 is the header)
+            events = slice(start - 1, max(start, stop) - 1)
+            columns = [self.decode(kind, column[events])
+                       for column, kind in zip(self.columns, self.kinds)]
+            rows.extend(map(list, zip(*columns)))
+            return rows
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("EventLog index out of range")
+        if index == 0:
+            return list(self.header_list)
+        return self[index:index + 1][0]
+
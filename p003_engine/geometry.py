@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Megan C. & Cyrus K.
+
+Screen and key geometry shared by every P003 experiment. All coordinates are
+in pixels on the 1024x768 operant box touchscreen, as [X1, Y1, X2, Y2].
+"""
+mainscreen_width = 1024 # width of the experimental canvas screen
+mainscreen_height = 768 # height of the experimental canvas screen
+
+# Coordinates for the key
+# key_coord_list =  [384, 256, 640, 512]
+key_coord_list = [416, 288, 608, 480] # 75% = 192 d
+#key_coord_list =  [448, 320, 576, 448] # 50% = 128 d
+key_pixels = key_coord_list[2] - key_coord_list[0] # Key diameter (192 px)
+key_center = ((key_coord_list[0] + key_coord_list[2]) // 2,
+              (key_coord_list[1] + key_coord_list[3]) // 2) # (512, 384)
+
+# The small black dot in the middle of the key
+midpoint_diameter = 10
+midpoint_coord_list = [
+    key_center[0] - (midpoint_diameter // 2),
+    key_center[1] - (midpoint_diameter // 2),
+    key_center[0] + (midpoint_diameter // 2),
+    key_center[1] + (midpoint_diameter // 2)
+    ]
+
+# Black key outline around the key
+outline_size = 20 # pixels beyond key circle
+outline_coords_list = [
+    key_coord_list[0] - outline_size,
+    key_coord_list[1] - outline_size,
+    key_coord_list[2] + outline_size,
+    key_coord_list[3] + outline_size
+    ]
+
+# Hidden patch (P003f): an invisible square placed in one of eight directions
+# around the center of the screen.
+hidden_patch_size = 100
+hidden_patch_distance_from_center = 300
+hidden_patch_locations = ["north", "north-east", "east", "south-east",
+                          "south", "south-west", "west", "north-west"]
+
+
+def hidden_patch_coords(location):
+    # Returns the X1, Y1, X2, Y2 of the hidden patch in a given direction
+    x_screen_midpoint = mainscreen_width // 2
+    y_screen_midpoint = mainscreen_height // 2
+    x_offset = {"east": 1, "north-east": 1, "south-east": 1,
+                "west": -1, "north-west": -1, "south-west": -1}.get(location, 0)
+    y_offset = {"north": -1, "north-east": -1, "north-west": -1,
+                "south": 1, "south-east": 1, "south-west": 1}.get(location, 0)
+    patch_x = x_screen_midpoint + (x_offset * hidden_patch_distance_from_center)
+    patch_y = y_screen_midpoint + (y_offset * hidden_patch_distance_from_center)
+    return [patch_x - (hidden_patch_size/2),
+            patch_y - (hidden_patch_size/2),
+            patch_x + (hidden_patch_size/2),
+            patch_y + (hidden_patch_size/2)]
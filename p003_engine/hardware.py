@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Megan C. & Cyrus K.
+
+Operant box hardware shared by every P003 experiment: the hopper servo, the
+hopper light and the house light (all driven through pigpio), plus the P033
+art scripts that run once a session is over.
+
+Setting the box up (connecting to pigpiod, reading Hopper_vals.csv,
+mapping the touchscreen) is done on a background thread as soon as this
+module is imported, so the control panel comes up without waiting for it;
+box stands in for the OperantBox and waits for the setup only if it is used
+before the setup is done. The P033 art scripts are only imported when they
+run: each session that ends queues its bird (queue_painting()), and the
+paintings are made once the control panel is closed (paint_queued()), so
+they don't hold up the next bird. The box is set up once per program: between
+sessions it is only reset (end_session()), so the control panel can run
+one bird after another; shutdown() is left for when the program exits.
+
+pigpio commands are round trips over a socket to the pigpiod daemon, so
+OperantBox doesn't send them from the Tkinter thread. Each command is put
+on a HardwareQueue and sent by a worker thread, which also logs when the
+command was issued (e.g., the moment a trial was decided to be reinforced)
+and when pigpiod acknowledged it.
+
+The first variable declared is whether the program is the operant box version
+for pigeons, or the test version for humans to view. It is automatically set
+to True if the user is "blaisdelllab" (e.g., running on a rapberry pi) or
+False if not. The output of os_path.expanduser('~') should be
+"/home/blaisdelllab" on the RPis.
+"""
+from atexit import register
+from csv import writer, QUOTE_MINIMAL
+from importlib.util import find_spec
+from os import popen, path as os_path
+from queue import Queue
+from sys import path as sys_path
+from threading import Thread
+from time import monotonic, sleep
+
+if os_path.basename(os_path.expanduser('~')) == "blaisdelllab":
+    operant_box_version = True
+    print("*** Running operant box version *** \n")
+else:
+    operant_box_version = False
+    print("*** Running test version (no hardware) *** \n")
+
+
+class HardwareQueue(object):
+    # Runs hardware commands, in order, on one worker thread. Each entry of
+    # the log is [command, issued, acknowledged, error], with times from
+    # time.monotonic() (the same clock as SessionClock)
+    log_header = ["Command", "IssuedTime", "AckTime", "LatencyMs", "Error"]
+
+    def __init__(self):
+        self.commands = Queue()
+        self.log = []
+        self.stopping = False
+        self.worker = Thread(target=self._work, name="hardware", daemon=True)
+        self.worker.start()
+        # Commands still waiting when the program ends (e.g., the hopper
+        # going down at shutdown) are given a few seconds to finish
+        register(self.drain, 5.0)
+
+    def submit(self, command, function, *args):
+        # Returns right away; the worker calls function(*args)
+        self.commands.put((command, monotonic(), function, args))
+
+    def after_pending(self, function, *args):
+        # Calls function(*args) on the worker once every command queued so
+        # far has been acknowledged (and logged); not logged itself
+        self.commands.put((None, None, function, args))
+
+    def _work(self):
+        while True:
+            item = self.commands.get()
+            if item is None:
+                break
+            command, issued, function, args = item
+            if command is None: # See after_pending()
+                try:
+                    function(*args)
+                except Exception as e:
+                    print(f"ERROR: {function.__name__} failed: {e!r}")
+                continue
+            error = ""
+            try:
+                function(*args)
+            except Exception as e:
+                error = repr(e)
+                print(f"ERROR: hardware command {command} failed: {error}")
+            self.log.append([command, issued, monotonic(), error])
+
+    def stop(self):
+        # The worker exits once every command queued so far has run
+        if not self.stopping:
+            self.stopping = True
+            self.commands.put(None)
+
+    def new_log(self):
+        # Starts an empty command log (e.g., for the next session). Called
+        # on the worker, so commands queued before it stay in the old log
+        self.log = []
+
+    def drain(self, timeout=None):
+        # Stops the worker and waits (up to timeout s) for it to finish
+        self.stop()
+        self.worker.join(timeout)
+
+    def write_log(self, file_path, origin=0.0):
+        # Writes the command log with times in seconds since origin (e.g.,
+        # SessionClock.origin, to line up with the session data). Use
+        # after_pending(write_log, ...) to include commands still queued.
+        with open(file_path, 'w', newline='') as log_file:
+            log_writer = writer(log_file, quoting=QUOTE_MINIMAL)
+            log_writer.writerow(self.log_header)
+            for command, issued, acked, error in list(self.log):
+                log_writer.writerow([command,
+                                     round(issued - origin, 6),
+                                     round(acked - origin, 6),
+                                     round((acked - issued) * 1000, 3),
+                                     error])
+
+
+class OperantBox(object):
+    # Setup GPIO numbers (NOT PINS; gpio only compatible with GPIO num)
+    servo_GPIO_num = 2
+    hopper_light_GPIO_num = 13
+    house_light_GPIO_num = 21
+
+    def __init__(self):
+        # Import additional libraries...
+        import pigpio # import pi, OUTPUT
+        import csv
+
+        # Setup use of pi()
+        self.rpi_board = pigpio.pi()
+
+        # Then set each pin to output
+        self.rpi_board.set_mode(self.servo_GPIO_num,
+                                pigpio.OUTPUT) # Servo motor...
+        self.rpi_board.set_mode(self.hopper_light_GPIO_num,
+                                pigpio.OUTPUT) # Hopper light LED...
+        self.rpi_board.set_mode(self.house_light_GPIO_num,
+                                pigpio.OUTPUT) # House light LED...
+
+        # Setup the servo motor
+        self.rpi_board.set_PWM_frequency(self.servo_GPIO_num,
+                                         50) # Default frequency is 50 MhZ
+
+        # Next grab the up/down
+        hopper_vals_csv_path = str(os_path.expanduser('~')+"/Desktop/Box_Info/Hopper_vals.csv")
+
+        # Store the proper UP/DOWN values for the hopper from csv file
+        with open(hopper_vals_csv_path) as f:
+            up_down_table = list(csv.reader(f))
+        self.hopper_up_val = up_down_table[1][0]
+        self.hopper_down_val = up_down_table[1][1]
+
+        # Lastly, run the shell script that maps the touchscreen to operant box monitor
+        popen("sh /home/blaisdelllab/Desktop/Hardware_Code/map_touchscreen.sh")
+
+        # Everything below is sent by the hardware worker thread
+        self.commands = HardwareQueue()
+
+    # The public methods only queue a command and return right away.
+
+    def house_light(self, on):
+        self.commands.submit("house_light_on" if on else "house_light_off",
+                             self._house_light, on)
+
+    def reinforce(self):
+        self.commands.submit("hopper_up", self._reinforce)
+
+    def reset(self):
+        self.commands.submit("reset", self._reset)
+
+    def start_session(self):
+        # New command log for the session; the servo gets its PWM back
+        self.commands.submit("start_session", self._start_session)
+
+    def end_session(self):
+        # Hopper down, lights off and servo released, keeping the connection
+        # to pigpiod for the next session. The 1 s wait for the hopper
+        # happens on the worker, not the GUI
+        self.commands.submit("end_session", self._end_session)
+
+    def shutdown(self):
+        # Only once, when the program exits
+        self.commands.submit("shutdown", self._shutdown)
+        self.commands.stop()
+
+    # The methods below talk to pigpiod directly (on the worker thread)
+
+    def _house_light(self, on):
+        self.rpi_board.write(self.house_light_GPIO_num, on)
+
+    def _reinforce(self):
+        # Hopper up with the hopper light on and the house light off
+        self.rpi_board.write(self.house_light_GPIO_num,
+                             False) # Turn off the house light
+        self.rpi_board.write(self.hopper_light_GPIO_num,
+                             True) # Turn on the hopper light
+        self.rpi_board.set_servo_pulsewidth(self.servo_GPIO_num,
+                                            self.hopper_up_val) # Move hopper to up position
+
+    def _reset(self):
+        # Turns all the stimuli off from the previous trial (during the ITI)
+        self.rpi_board.write(self.hopper_light_GPIO_num,
+                             False) # Turn off the hopper light
+        self.rpi_board.set_servo_pulsewidth(self.servo_GPIO_num,
+                                            self.hopper_down_val) # Hopper down
+        self.rpi_board.write(self.house_light_GPIO_num,
+                             False) # Turn off house light
+
+    def release_servo(self):
+        # Turns off the PWM signal to the servo (called directly after a crash)
+        self.rpi_board.set_PWM_dutycycle(self.servo_GPIO_num,
+                                         False)
+        self.rpi_board.set_PWM_frequency(self.servo_GPIO_num,
+                                         False)
+
+    def _start_session(self):
+        self.commands.new_log()
+        self.rpi_board.set_PWM_frequency(self.servo_GPIO_num,
+                                         50) # Default frequency is 50 MhZ
+
+    def _end_session(self):
+        # Return hopper to down state and stop driving the servo
+        self._reset()
+        sleep(1) # Give the servo 1 s to get back down
+        self.release_servo()
+
+    def _shutdown(self):
+        # Return hopper to down state and kill the RPi board connection
+        self._end_session()
+        self.rpi_board.stop() # Kill RPi board
+
+
+class BackgroundBox(object):
+    # Stands in for the OperantBox while it is set up on a background thread.
+    # Any attribute (box.reset(), box.commands...) waits for the setup first.
+    def __init__(self):
+        self.box = None
+        self.error = None
+        self.thread = Thread(target=self._setup, name="box_setup", daemon=True)
+        self.thread.start()
+
+    def _setup(self):
+        try:
+            self.box = OperantBox()
+        except Exception as e:
+            self.error = e
+
+    def ready(self, timeout=None):
+        # Waits for the setup and returns the OperantBox; raises whatever
+        # the setup raised (e.g., no Hopper_vals.csv)
+        self.thread.join(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.box
+
+    def set_up(self):
+        # True once the box is ready to use (without raising)
+        self.thread.join()
+        return self.box is not None
+
+    def __getattr__(self, name):
+        return getattr(self.ready(), name)
+
+
+def paint_program(subject_ID):
+    # Runs the P033 art program for one subject (imported only now)
+    import graph
+    import polygon_fill
+    polygon_fill.main(subject_ID)
+
+
+paintings_due = [] # Subjects whose sessions ended, in order, until the CP is closed
+
+
+def queue_painting(subject_ID):
+    # Called when a session ends; each subject is painted once
+    if subject_ID not in paintings_due:
+        paintings_due.append(subject_ID)
+
+
+def paint_queued():
+    # Runs the P033 art program for every subject queued, once the control
+    # panel is closed and no session can start anymore
+    while paintings_due:
+        paint_program(paintings_due.pop(0))
+
+
+# Hopper/other specific libraries from files on operant box computers. Only
+# checked for here (importing them would take time); they're imported when used
+box = None # Stays None if any of them is missing
+missing_modules = []
+if operant_box_version:
+    #...including art scripts
+    sys_path.insert(0, str(os_path.expanduser('~')+"/Desktop/Experiments/P033/"))
+    missing_modules = [name for name in ["pigpio", "graph", "polygon_fill"]
+                       if not find_spec(name)]
+    if not missing_modules:
+        box = BackgroundBox()
+    else:
+        input(f"ERROR: Cannot find hopper hardware ({', '.join(missing_modules)})! Check desktop.")
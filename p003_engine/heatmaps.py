@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Megan C. & Cyrus K.
+
+Peck-density heatmaps (1024 x 768, the touchscreen) per subject and trial
+type, with the key drawn on top as build_keys() shows it. Run offline over
+a data folder (needs NumPy and Pillow).
+
+Pecks are counted into cell x cell px bins (np.bincount over all pecks at
+once) instead of being drawn one by one; the counts are smoothed, log-scaled
+and colored only when an image is made.
+
+The counts are cached in the data folder (".heatmap_cache/"), keyed on the
+settings (events, cell size) and holding the path and SHA-256 (see
+manifest.py) of every session already counted. Each update only loads and counts the
+sessions that aren't in the cache yet; if a session counted before was
+changed or removed, everything is recounted. Only the images of
+subject/trial type pairs that got new pecks are redrawn.
+
+    python -m p003_engine.heatmaps ~/Desktop/Data/P003Fc_data [output folder]
+"""
+from hashlib import sha256
+from os import listdir, makedirs, path as os_path, replace
+from sys import argv
+
+import numpy as np
+
+from p003_engine import geometry
+from p003_engine.columnar import columnar_suffix, convert_folder
+from p003_engine.manifest import SessionManifest
+from p003_engine.spatial import group_ids, load_pecks
+
+cache_version = 1 # Bump if the way pecks are counted ever changes
+cache_folder_name = ".heatmap_cache"
+# Pecks made while the key is onscreen (ITI pecks land on a blank screen)
+heatmap_events = ["key_peck", "background_peck", "hidden_patch_peck"]
+default_cell = 4 # px; a 256 x 192 grid
+smoothing = 2.0 # Gaussian SD, in cells
+
+# Colors from no pecks to the most pecks, interpolated into a 256-entry table
+color_stops = [(0, 0, 4), (40, 11, 84), (101, 21, 110), (159, 42, 99),
+               (212, 72, 66), (245, 125, 21), (250, 193, 39), (252, 255, 164)]
+
+
+def color_table():
+    stops = np.asarray(color_stops, dtype=np.float64)
+    positions = np.linspace(0, 1, len(stops))
+    levels = np.linspace(0, 1, 256)
+    return np.stack([np.interp(levels, positions, stops[:, i]) for i in range(3)],
+                    axis=1).astype(np.uint8)
+
+
+def grid_shape(cell):
+    return (-(-geometry.mainscreen_height // cell), -(-geometry.mainscreen_width // cell))
+
+
+def count_pecks(pecks, labels, cell):
+    # {(subject, trial type): counts (rows x columns)} for a batch of pecks
+    rows, columns = grid_shape(cell)
+    group, group_keys, n_groups = group_ids(pecks, ("subject", "trial_type"))
+    cells = (np.clip(pecks["y"], 0, geometry.mainscreen_height - 1) // cell * columns
+             + np.clip(pecks["x"], 0, geometry.mainscreen_width - 1) // cell).astype(np.int64)
+    counts = np.bincount(group * (rows * columns) + cells,
+                         minlength=n_groups * rows * columns).reshape(n_groups, rows, columns)
+    return {(labels["subject"][subject], labels["trial_type"][trial_type]): counts[i]
+            for i, (subject, trial_type) in enumerate(zip(group_keys["subject"],
+                                                          group_keys["trial_type"]))}
+
+
+class HeatmapCache(object):
+    def __init__(self, data_folder, events=heatmap_events, cell=default_cell):
+        self.data_folder = data_folder
+        self.events = list(events)
+        self.cell = cell
+        settings = f"v{cache_version}|{cell}|{','.join(self.events)}"
+        self.cache_path = os_path.join(data_folder, cache_folder_name,
+                                       sha256(settings.encode()).hexdigest()[:16] + ".npz")
+        self.sessions = set() # "path|SHA-256" of every session counted
+        self.counts = {} # (subject, trial type) -> counts
+        if os_path.exists(self.cache_path):
+            with np.load(self.cache_path) as cached:
+                self.sessions = set(cached["sessions"].tolist())
+                for key, counts in zip(cached["groups"].tolist(), cached["counts"]):
+                    self.counts[tuple(key.split("\t"))] = counts
+
+    def update(self):
+        # Counts the pecks of any session not counted yet; returns the
+        # (subject, trial type) pairs whose counts changed
+        convert_folder(self.data_folder)
+        manifest = SessionManifest(self.data_folder)
+        manifest.update()
+        current = {}
+        for entry in manifest.sessions():
+            columnar_path = os_path.splitext(manifest.file_path(entry))[0] + columnar_suffix
+            if os_path.exists(columnar_path):
+                current[f"{entry['Path']}|{entry['SHA256']}"] = columnar_path
+
+        if not self.sessions <= set(current):
+            # A counted session was changed or removed: start over
+            self.sessions, self.counts = set(), {}
+        new_sessions = [session for session in current if session not in self.sessions]
+        if not new_sessions:
+            return set()
+        pecks, labels = load_pecks([current[session] for session in new_sessions], self.events)
+        changed = set()
+        for key, counts in count_pecks(pecks, labels, self.cell).items():
+            self.counts[key] = self.counts[key] + counts if key in self.counts else counts
+            changed.add(key)
+        self.sessions.update(new_sessions)
+        self.save()
+        return changed
+
+    def save(self):
+        # Written to a temporary file first so a half-written cache is never read
+        makedirs(os_path.dirname(self.cache_path), exist_ok=True)
+        keys = sorted(self.counts)
+        temp_path = f"{self.cache_path}.tmp"
+        with open(temp_path, "wb") as cache_file:
+            np.savez(cache_file, sessions=np.asarray(sorted(self.sessions), dtype=str),
+                     groups=np.asarray(["\t".join(key) for key in keys], dtype=str),
+                     counts=np.asarray([self.counts[key] for key in keys], dtype=np.uint32)
+                                .reshape((len(keys),) + grid_shape(self.cell)))
+        replace(temp_path, self.cache_path)
+
+
+def smooth(counts, sigma):
+    # Separable Gaussian blur of a 2-D array (edges padded with zeros)
+    if sigma <= 0:
+        return counts.astype(np.float64)
+    radius = int(3 * sigma + 0.5)
+    kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma) ** 2)
+    kernel /= kernel.sum()
+    blurred = np.apply_along_axis(np.convolve, 1, counts.astype(np.float64), kernel, "same")
+    return np.apply_along_axis(np.convolve, 0, blurred, kernel, "same")
+
+
+def render(counts, image_path, cell=default_cell, sigma=smoothing, title=None):
+    # Writes one heatmap .png (1024 x 768) with the key outline on top
+    from PIL import Image, ImageDraw
+    density = np.log1p(smooth(counts, sigma))
+    if density.max() > 0:
+        density /= density.max()
+    pixels = color_table()[(density * 255).astype(np.uint8)]
+    image = Image.fromarray(pixels, "RGB").resize(
+        (geometry.mainscreen_width, geometry.mainscreen_height), Image.NEAREST)
+
+    draw = ImageDraw.Draw(image)
+    draw.ellipse(geometry.outline_coords_list, outline=(128, 128, 128), width=2)
+    draw.ellipse(geometry.key_coord_list, outline=(255, 255, 255), width=2)
+    draw.ellipse(geometry.midpoint_coord_list, fill=(255, 255, 255))
+    if title:
+        draw.text((10, 10), f"{title}  (n = {int(counts.sum())})", fill=(255, 255, 255))
+    image.save(image_path)
+
+
+def render_folder(data_folder, output_folder=None, events=heatmap_events, cell=default_cell,
+                  sigma=smoothing):
+    # Brings the cache up to date and (re)draws every heatmap whose counts
+    # changed or whose .png is missing; returns the paths drawn
+    output_folder = output_folder or os_path.join(data_folder, "heatmaps")
+    makedirs(output_folder, exist_ok=True)
+    cache = HeatmapCache(data_folder, events, cell)
+    changed = cache.update()
+    existing = set(listdir(output_folder))
+    drawn = []
+    for (subject, trial_type), counts in sorted(cache.counts.items()):
+        file_name = f"{subject}_{trial_type}.png"
+        if (subject, trial_type) in changed or file_name not in existing:
+            render(counts, os_path.join(output_folder, file_name), cell, sigma,
+                   f"{subject}  {trial_type}")
+            drawn.append(os_path.join(output_folder, file_name))
+    return drawn
+
+
+if __name__ == '__main__':
+    data_folder = os_path.expanduser(argv[1])
+    drawn = render_folder(data_folder, argv[2] if len(argv) > 2 else None)
+    print(f"{len(drawn)} heatmaps drawn")
+    for image_path in drawn:
+        print(image_path)
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Megan C. & Cyrus K.
+
+Crash-safe journal of session events. The data .csv is only written during
+the ITIs (and not at all if "Record data" is off), so if the program dies
+mid-session, everything since the last ITI is lost. While a session runs,
+SessionJournal appends every event, as soon as it is recorded, to
+<data folder>/.journal/<data file name>.journal:
+
+    - Each event is one small binary record holding the values EventLog
+      (event_log.py) already stored, so nothing is formatted during the
+      session. New strings (event names, trial types...) get a record of
+      their own the first time they show up.
+    - Records are written straight to the OS (no Python buffer), so they
+      survive the program crashing or being killed. At every trial
+      boundary (the ITI) the file is also synced to disk (fsync), so a power
+      cut can cost at most the trial in progress. Each record carries a
+      CRC-32, and a torn or garbled tail is ignored when reading it back.
+    - The session plan (trial order, hidden patch...) is journaled when
+      the session starts, and a checkpoint (trials done, events so far,
+      random number generator state) at every ITI.
+    - When a session runs all its trials the journal is deleted. If it is
+      stopped early (Escape) the journal is kept, so it can be resumed.
+
+Any journal still there on the next launch belongs to an unfinished
+session. If it was interrupted (no SessionEnds), recover_sessions() (called
+by the control panel) rebuilds it into the usual data .csv, byte for byte
+what SessionWriter would have written. Journals still held open by a
+running program are left alone.
+
+The control panel's "Resume session" button continues a subject's latest
+unfinished session: find_resumable() reads back its plan and last
+checkpoint, and MainScreen restores the events up to the last completed
+trial (events of the unfinished trial are dropped, as that trial is run
+again), the trial counter and the random state, then carries on with the
+next trial into the same data file. Starting a new session for the
+subject instead retires its old journals.
+
+    python -m p003_engine.journal ~/Desktop/Data/P003Fc_data
+"""
+from csv import QUOTE_MINIMAL, writer
+from json import dumps, loads
+from os import fsync, listdir, makedirs, path as os_path, remove, replace
+from struct import Struct, error as struct_error
+from sys import argv
+from zlib import crc32
+
+from p003_engine.event_log import EventLog, column_types, decode_column, typecodes
+
+try:
+    from fcntl import LOCK_EX, LOCK_NB, LOCK_UN, flock
+except ImportError: # Windows: journals can't be locked
+    flock = None
+
+journal_folder_name = ".journal"
+journal_suffix = ".journal"
+magic = b"P003JNL1"
+prefix = Struct("<8sI") # magic, header length
+record_prefix = Struct("<BHI") # record type, payload length, CRC-32 of the payload
+code_record, event_record, plan_record, checkpoint_record = 1, 2, 3, 4
+
+
+def event_struct(kinds):
+    # One event's values, in header order, as EventLog stores them
+    return Struct("<" + "".join(typecodes[kind] for kind in kinds))
+
+
+def code_text(value):
+    # The text csv.writer writes for a value
+    return "" if value is None else str(value)
+
+
+def record(record_type, payload):
+    return record_prefix.pack(record_type, len(payload), crc32(payload)) + payload
+
+
+def journal_path(data_folder, data_file):
+    # data_file is relative to the data folder, e.g., Wario/Wario_..._data.csv
+    return os_path.join(data_folder, journal_folder_name,
+                        os_path.splitext(os_path.basename(data_file))[0] + journal_suffix)
+
+
+class SessionJournal(object):
+    def __init__(self, data_folder, data_file, header_list, sync=True):
+        # data_file: where the session's .csv goes, relative to data_folder
+        self.path = journal_path(data_folder, data_file)
+        self.sync = sync
+        self.kinds = [column_types.get(column, "code") for column in header_list]
+        self.event_struct = event_struct(self.kinds)
+        self.codes_written = 0 # Entries of the EventLog's code_values already journaled
+        self.events_written = 0
+        makedirs(os_path.dirname(self.path), exist_ok=True)
+        # Unbuffered: every write goes straight to the OS
+        self.journal_file = open(self.path, "xb", buffering=0)
+        if flock is not None:
+            # Tells recover_sessions() the journal is in use
+            flock(self.journal_file.fileno(), LOCK_EX | LOCK_NB)
+        header = dumps({"data_file": data_file, "header_list": list(header_list),
+                        "kinds": self.kinds}).encode("utf-8")
+        self.journal_file.write(prefix.pack(magic, len(header)) + header)
+        self.commit()
+
+    def append(self, event_log):
+        # Journals every event (and new string) of event_log not written yet;
+        # called right after each EventLog.append()
+        records = []
+        code_values = event_log.code_values
+        while self.codes_written < len(code_values):
+            records.append(record(code_record,
+                                  code_text(code_values[self.codes_written]).encode("utf-8")))
+            self.codes_written += 1
+        pack = self.event_struct.pack
+        columns = event_log.columns
+        while self.events_written < event_log.n_events:
+            i = self.events_written
+            records.append(record(event_record, pack(*[column[i] for column in columns])))
+            self.events_written += 1
+        self.journal_file.write(b"".join(records))
+
+    def write_plan(self, plan):
+        # The session plan, once the session is set up (a JSON-able dictionary)
+        self.journal_file.write(record(plan_record, dumps(plan).encode("utf-8")))
+
+    def checkpoint(self, event_log, state):
+        # What it takes to resume after the trial just completed (a
+        # JSON-able dictionary), along with every event so far
+        self.append(event_log)
+        state = dict(state, events=self.events_written)
+        self.journal_file.write(record(checkpoint_record, dumps(state).encode("utf-8")))
+
+    def commit(self):
+        # Group commit: pushes everything written so far to disk (trial boundaries)
+        if self.sync:
+            fsync(self.journal_file.fileno())
+
+    def close(self, remove_file=True):
+        # At the end of a normal session; the journal isn't needed anymore
+        if self.journal_file is None:
+            return
+        if flock is not None:
+            flock(self.journal_file.fileno(), LOCK_UN)
+        self.journal_file.close()
+        self.journal_file = None
+        if remove_file:
+            remove(self.path)
+
+
+def read_journal(path):
+    # Returns (header, code texts, events as tuples of stored values, notes),
+    # up to the first torn or garbled record; notes holds the "plan" and the
+    # last "checkpoint" (None if there isn't one)
+    with open(path, "rb") as journal_file:
+        contents = journal_file.read()
+    if len(contents) < prefix.size or contents[:len(magic)] != magic:
+        raise ValueError(f"{path} isn't a session journal")
+    _, header_length = prefix.unpack_from(contents)
+    header = loads(contents[prefix.size:prefix.size + header_length].decode("utf-8"))
+    unpack = event_struct(header["kinds"]).unpack
+    code_texts, events = [], []
+    notes = {"plan": None, "checkpoint": None}
+    position = prefix.size + header_length
+    while position + record_prefix.size <= len(contents):
+        record_type, length, checksum = record_prefix.unpack_from(contents, position)
+        payload = contents[position + record_prefix.size:position + record_prefix.size + length]
+        if len(payload) != length or crc32(payload) != checksum:
+            break
+        try:
+            if record_type == code_record:
+                code_texts.append(payload.decode("utf-8"))
+            elif record_type == event_record:
+                events.append(unpack(payload))
+            elif record_type == plan_record:
+                notes["plan"] = loads(payload.decode("utf-8"))
+            elif record_type == checkpoint_record:
+                notes["checkpoint"] = loads(payload.decode("utf-8"))
+            else:
+                break
+        except (ValueError, struct_error):
+            break
+        position += record_prefix.size + length
+    return header, code_texts, events, notes
+
+
+def ended(header, code_texts, events):
+    # True if the last event is SessionEnds (the session was stopped, not interrupted)
+    event_column = header["header_list"].index("Event")
+    return bool(events) and code_texts[events[-1][event_column]] == "SessionEnds"
+
+
+def restore_log(header, code_texts, events):
+    # An EventLog holding the journaled events, as if they had just been
+    # recorded (strings come back as the text written to the .csv)
+    event_log = EventLog(header["header_list"])
+    for i, column in enumerate(event_log.columns):
+        column.extend(event[i] for event in events)
+    for text in code_texts:
+        event_log.code_index.setdefault(text, len(event_log.code_values))
+        event_log.code_values.append(text)
+    event_log.n_events = len(events)
+    return event_log
+
+
+def rebuild_csv(path, data_folder):
+    # Writes the data .csv of a journal; returns its path (None if the
+    # session never recorded an event)
+    header, code_texts, events, _ = read_journal(path)
+    if not events:
+        return None
+    columns = [decode_column(kind, values, code_texts)
+               for kind, values in zip(header["kinds"], zip(*events))]
+    csv_path = os_path.join(data_folder, header["data_file"])
+    makedirs(os_path.dirname(csv_path), exist_ok=True)
+    # Written to a temporary file first, then swapped in for any partial .csv
+    temp_path = f"{csv_path}.tmp"
+    with open(temp_path, "w", newline='') as data_file:
+        csv_writer = writer(data_file, quoting=QUOTE_MINIMAL)
+        csv_writer.writerow(header["header_list"])
+        csv_writer.writerows(zip(*columns))
+        data_file.flush()
+        fsync(data_file.fileno())
+    replace(temp_path, csv_path)
+    return csv_path
+
+
+def in_use(path):
+    # True if a running program still holds the journal
+    if flock is None:
+        return False
+    with open(path, "rb") as journal_file:
+        try:
+            flock(journal_file.fileno(), LOCK_EX | LOCK_NB)
+            return False
+        except OSError:
+            return True
+
+
+def journal_paths(data_folder):
+    journal_folder = os_path.join(data_folder, journal_folder_name)
+    if not os_path.isdir(journal_folder):
+        return []
+    return [os_path.join(journal_folder, file_name) for file_name in sorted(listdir(journal_folder))
+            if file_name.endswith(journal_suffix)]
+
+
+def recover_sessions(data_folder):
+    # Rebuilds the .csv of every interrupted session in data_folder whose
+    # .csv is missing or older than its journal; returns the .csv paths
+    # written. The journals are kept, so the sessions can be resumed.
+    recovered = []
+    for path in journal_paths(data_folder):
+        if in_use(path):
+            continue
+        try:
+            header, code_texts, events, _ = read_journal(path)
+            csv_path = os_path.join(data_folder, header["data_file"])
+            if (not events or ended(header, code_texts, events)
+                    or (os_path.exists(csv_path)
+                        and os_path.getmtime(csv_path) >= os_path.getmtime(path))):
+                continue
+            recovered.append(rebuild_csv(path, data_folder))
+        except (ValueError, KeyError, OSError) as error:
+            print(f"Couldn't recover {path}: {error}")
+    return recovered
+
+
+def find_resumable(data_folder, subject_ID):
+    # The subject's latest unfinished session that can be resumed, or None:
+    # {"path", "data_file", "plan", "checkpoint", "header", "code_texts",
+    # "events" (up to the last completed trial), "session_time" (of the
+    # last event journaled)}
+    for path in sorted(journal_paths(data_folder), key=os_path.getmtime, reverse=True):
+        if in_use(path):
+            continue
+        try:
+            header, code_texts, events, notes = read_journal(path)
+        except (ValueError, OSError):
+            continue
+        if (not header["data_file"].startswith(f"{subject_ID}/") or notes["plan"] is None
+                or notes["checkpoint"] is None):
+            continue
+        if notes["checkpoint"]["trials"] >= len(notes["plan"]["trial_assignment_list"]):
+            continue # Every trial was run
+        session_time = header["header_list"].index("SessionTime")
+        return {"path": path, "data_file": header["data_file"], "plan": notes["plan"],
+                "checkpoint": notes["checkpoint"], "header": header, "code_texts": code_texts,
+                "events": events[:notes["checkpoint"]["events"]],
+                "session_time": events[-1][session_time] if events else 0.0}
+    return None
+
+
+def retire_journals(data_folder, subject_ID):
+    # Once a new session of the subject starts, its unfinished ones can't be
+    # resumed anymore; their .csv files are brought up to date first
+    recover_sessions(data_folder)
+    for path in journal_paths(data_folder):
+        if os_path.basename(path).startswith(f"{subject_ID}_") and not in_use(path):
+            remove(path)
+
+
+if __name__ == '__main__':
+    for csv_path in recover_sessions(os_path.expanduser(argv[1])):
+        print(f"Recovered {csv_path}")
@@ -0,0 +1,811 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Megan C. & Cyrus K.
+
+The MainScreen object that runs a P003 session in the operant box. It is
+shared by every experiment; each experiment script subclasses it and fills in
+its own settings (trial counts, durations, data columns) and a handful of
+hooks (which stimuli a bird gets, which trial types exist, and which outcome
+policy each trial type follows).
+
+A macro-level overview of a session is:
+
+    spacebar -> first_ITI -> ITI -> start_signal_period -> build_keys
+                              ^                                 |
+                              |                     calculate_trial_outcome
+                              |                                 |
+                              +------------ (hopper) <----------+
+
+Everything that doesn't need the window (reading the bird's stimulus
+assignments, decoding the stimulus images, building the trial order) can
+be done ahead of time by MainScreen.preflight(), which the control panel
+runs as soon as a bird and condition are picked. The resulting plan is
+passed to the MainScreen, so the spacebar only has to start the clock.
+
+One control panel can run many sessions, one after the other. The operant
+box window, its Canvas and the stimulus PhotoImages (a Chamber) are made by
+the first session and handed to the next one, which only resets its own
+state; the window is hidden in between. The box hardware stays connected
+(see hardware.py).
+"""
+from csv import DictReader
+from datetime import datetime, date
+from os import makedirs, path as os_path, remove, replace
+from random import choice, getstate, setstate
+from tempfile import TemporaryFile
+from time import perf_counter
+from tkinter import Toplevel, Canvas, BOTH, TclError
+
+from p003_engine import geometry
+from p003_engine.console import ConsoleEcho
+from p003_engine.event_log import EventLog
+from p003_engine.hardware import operant_box_version, box, queue_painting
+from p003_engine.journal import SessionJournal, journal_folder_name, restore_log, \
+     retire_journals
+from p003_engine.scene import TrialScene
+from p003_engine.scheduler import SessionClock
+from p003_engine.sequences import constrained_shuffle
+from p003_engine.session_writer import SessionWriter
+from p003_engine.stimulus_cache import load_key_image
+from p003_engine.touch import TouchFilter
+
+
+class Chamber(object):
+    # The operant box window and Canvas, plus the stimulus PhotoImages made
+    # so far ({PNG path: PhotoImage}), kept for the control panel's next
+    # session
+    def __init__(self, root, mastercanvas):
+        self.root = root
+        self.mastercanvas = mastercanvas
+        self.photo_images = {}
+
+
+class MainScreen(object):
+    # Settings below are overwritten by each experiment's subclass
+    experiment_name = "P003" # Shown onscreen and in the window title
+    window_title = "Spatial Variability"
+    data_file_tag = "P003" # Used in the data file name
+    stimulus_csv_name = "" # Per-subject stimulus assignments (in the experiment folder)
+    uses_image_stimuli = False # PNG stimuli (True) or solid colors (False)
+    hidden_patch_enabled = False # P003f hidden patch
+    ITI_duration = 6000 # duration of inter-trial interval (ms)
+    trial_timer_duration = 10000 # Duration of each trial (ms)
+    hopper_duration = 4000 # duration of accessible hopper (ms)
+    hopper_duration_by_subject = {} # Selective hopper timing by subject
+    first_ITI_duration = 30000 # Delay after the spacebar before the first trial (ms)
+    max_trials = 80 # Max number of trials within a session (reset once the plan is built)
+    max_consecutive_trials = 3 # No more than this many of a trial code in a row
+    console_verbosity = "events" # Terminal feedback: "silent", "trials", "summary" or "events"
+    console_max_lines_per_second = 20 # Cap on per-peck lines in "events" mode
+    session_time_source = None # Clock for session timing (None: time.monotonic)
+    sync_data_file = True # fsync the data .csv (and the journal) at every ITI
+    journal_events = True # Journal every event as it happens (see journal.py)
+    touch_merge_ms = 40 # Touch events this close (ms and px) to the last peck are
+    touch_merge_px = 20 # the same peck (see touch.py); 0 ms keeps every event
+    header_list = ["SessionTime", "Xcord", "Ycord", "Event", "TrialTime",
+                   "TrialType", "TargetPeckNum", "BackgroundPeckNum",
+                   "TrialNum", "TrialColor", "Subject", "Date"] # Column headers
+
+    def __init__(self, subject_ID, record_data, data_folder_directory,
+                 experiment_directory, condition=None, resume=None, preflight_plan=None,
+                 chamber=None):
+        ## Firstly, we need to set up all the variables passed from within
+        # the control panel object to this MainScreen object. We do this
+        # by setting each argument as "self." objects to make them global
+        # within this object.
+        self.subject_ID = subject_ID
+        self.record_data = record_data
+        self.data_folder_directory = data_folder_directory
+        self.experiment_directory = experiment_directory # Folder of the experiment script
+        self.condition = condition # e.g., "RR2" (P003e) or "INS" (P003Fb/Fc)
+        self.resume = resume # Unfinished session to pick back up (see journal.find_resumable)
+        self.preflight_plan = preflight_plan # Session plan built ahead of time (see preflight())
+        # Terminal feedback is written by a background thread (see console.py)
+        self.console = ConsoleEcho(self.console_verbosity,
+                                   self.console_max_lines_per_second)
+
+        ## Set up the visual Canvas, or reuse the last session's (chamber)
+        self.mainscreen_height = geometry.mainscreen_height
+        self.mainscreen_width = geometry.mainscreen_width
+        if chamber is None:
+            self.build_window()
+            chamber = Chamber(self.root, self.mastercanvas)
+        else:
+            self.root, self.mastercanvas = chamber.root, chamber.mastercanvas
+            self.mastercanvas.delete("all") # The last session's items and bindings
+            self.root.deiconify()
+        self.chamber = chamber
+        self.bind_window_keys()
+
+        # Timing variables. All session and trial times come from the
+        # monotonic SessionClock; start_time (wall clock) only names the file
+        self.start_time = datetime.now()  # This will be reset once the session actually starts
+        self.clock = SessionClock(self.root, self.session_time_source) # Absolute, drift-free trial deadlines
+        self.trial_start = 0.0 # Session time the current trial's ITI began, resets each trial
+        self.hopper_duration = self.hopper_duration_by_subject.get(
+            self.subject_ID, self.hopper_duration)
+
+        # These are additional "under the hood" variables that need to be declared
+        self.session_data_frame = EventLog(self.header_list) # This where trial-by-trial data is stored (row 0 is the column headers)
+        self.current_trial_counter = 0 # This counts the number of trials that have passed
+        self.trial_type = "NA"
+        self.trial_peck_counter = 0
+        self.background_peck_counter = 0
+        self.hidden_patch_peck_counter = 0
+        self.hidden_patch_location = "NA"
+        self.stimulus_assignments_dict = {}
+        self.stimulus_images = {}
+        self.image_preparation_time = None # Seconds spent preparing stimulus images
+        self.image_decoding_time = None # Seconds the preflight spent decoding them
+        self.outcome_policies = {}
+        self.trial_assignment_list = []
+        self.session_writer = None # Streaming .csv writer, opened at the first ITI
+        self.journal = None # Crash-safe copy of every event, opened with the session
+        self.all_trials_run = False
+        self.session_ended = False # Set by exit_program()
+
+        # Every touch goes through the TouchFilter first, which drops the
+        # extra events the touchscreen sometimes reports for one peck
+        self.touch = TouchFilter(self.touch_merge_ms, self.touch_merge_px,
+                                 self.clock.now, lambda: self.current_trial_counter)
+
+        # Every onscreen item (backgrounds, keys, hidden patch, feedback
+        # text) is built and bound once here, then shown or hidden by phase
+        self.scene = TrialScene(
+            self.mastercanvas,
+            on_ITI_peck = self.touch.handler(
+                "iti_bkgrd", lambda event: self.write_data(event, "ITI_peck")),
+            on_background_peck = self.touch.handler(
+                "bkgrd", lambda event: self.background_press(event)),
+            on_start_signal_peck = self.touch.handler(
+                "start_key", lambda event: self.start_signal_press(event, "start_signal_press")),
+            on_key_peck = self.touch.handler(
+                "key", lambda event: self.key_press(event, "key_peck")),
+            on_hidden_patch_peck = self.touch.handler(
+                "hidden_patch", lambda event: self.hidden_patch_press(event))
+                                   if self.hidden_patch_enabled else None,
+            uses_image_stimuli = self.uses_image_stimuli)
+
+        ## Finally, start the recursive loop that runs the program:
+        self.place_birds_in_box()
+
+    def build_window(self):
+        # Sets up self.root (the Toplevel window) and self.mastercanvas
+        self.root = Toplevel()
+        self.root.title(f"{self.experiment_name}: {self.window_title}") # this is the title of the window
+
+        # If the version is the one running in the boxes...
+        if operant_box_version:
+            # Then fullscreen (on a 1024x768p screen). Assumes that both screens
+            # that are being used have identical dimensions
+            self.root.geometry(f"{self.mainscreen_width}x{self.mainscreen_height}+1920+0")
+            self.root.attributes('-fullscreen',
+                                 True)
+            self.mastercanvas = Canvas(self.root,
+                                   bg="black")
+            self.mastercanvas.pack(fill = BOTH,
+                                   expand = True)
+        # If we want to run a "human-friendly" version
+        else:
+            # No keybinds and  1024x768p fixed window
+            self.mastercanvas = Canvas(self.root,
+                                   bg="black",
+                                   height=self.mainscreen_height,
+                                   width = self.mainscreen_width)
+            self.mastercanvas.pack()
+
+    def bind_window_keys(self):
+        # Binds the keys of the window to this session (also when the window
+        # is reused from the last session)
+        self.root.bind("<Escape>", self.exit_program) # bind exit program to the "esc" key
+        # Closing the window ends the session the same way (the window is
+        # only hidden, for the next session)
+        self.root.protocol("WM_DELETE_WINDOW", lambda: self.exit_program(None))
+        if operant_box_version:
+            # Keybind relevant keys
+            self.cursor_visible = True # Cursor starts on...
+            self.change_cursor_state() # turn off cursor UNCOMMENT
+            self.root.bind("<c>",
+                           lambda event: self.change_cursor_state()) # bind cursor on/off state to "c" key
+
+    # %% Experiment hooks. Each experiment's subclass overrides these.
+
+    def select_stimulus_assignments(self, row):
+        # Given the subject's row of the stimulus assignments .csv, returns a
+        # dictionary of {trial type: color or PNG filename}
+        return {k: v for k, v in row.items() if k != "Subject" and v.strip()}
+
+    def potential_trial_assignments(self):
+        # Returns the list of trial codes for one session (to be shuffled)
+        return list(self.stimulus_assignments_dict) * 20
+
+    def trial_run_key(self, trial_code):
+        # Trial codes with the same key count as "identical" for the
+        # no-more-than-three-in-a-row rule
+        return trial_code
+
+    def build_outcome_policies(self):
+        # Returns a dictionary of {trial type: OutcomePolicy}
+        raise NotImplementedError
+
+    def session_label(self):
+        # Extra lines for the "place bird in box" screen
+        return f"Subject: {self.subject_ID}"
+
+    def data_file_name(self):
+        return f"{self.subject_ID}_{self.start_time.strftime('%Y-%m-%d_%H.%M.%S')}_{self.data_file_tag}_data.csv"
+
+    # %% Session setup
+
+    def read_subject_assignments(self):
+        # Reads the subject's row from the stimulus assignments .csv, which
+        # sits next to the experiment script
+        stimuli_csv_path = os_path.join(self.experiment_directory,
+                                        self.stimulus_csv_name)
+        with open(stimuli_csv_path, 'r', encoding='utf-8-sig') as f:
+            for row in DictReader(f):
+                if row["Subject"] == self.subject_ID:
+                    return row
+        raise ValueError(f"No row for subject {self.subject_ID} in {stimuli_csv_path}")
+
+    def decode_stimulus_images(self):
+        # Returns ({PNG filename: key-sized PIL image}, number of cache hits)
+        # for the assigned stimuli. Resized copies are cached on disk (see
+        # stimulus_cache.py), so only the first session with a given PNG has
+        # to decode and resample it.
+        stimuli_folder = os_path.join(self.experiment_directory, "stimuli")
+        key_images = {}
+        cache_hits = 0
+        for fname in self.stimulus_assignments_dict.values():
+            if fname not in key_images:
+                key_images[fname], cached = load_key_image(os_path.join(stimuli_folder, fname),
+                                                           geometry.key_pixels)
+                cache_hits += cached
+        return key_images, cache_hits
+
+    def load_stimulus_images(self, key_images=None, decoding=None):
+        # Preloads each assigned PNG into a PhotoImage the size of the key
+        # (key_images: already decoded by preflight(), which took decoding =
+        # (seconds, cache hits) to do it). PIL is only needed by the
+        # image-based experiments.
+        from PIL import ImageTk
+        prep_start = perf_counter()
+        stimuli_folder = os_path.join(self.experiment_directory, "stimuli")
+        photo_images = self.chamber.photo_images # Kept from earlier sessions
+        fnames = set(self.stimulus_assignments_dict.values())
+        cache_hits = None # Nothing decoded: every PhotoImage kept from the last session
+        if key_images is None and not all(os_path.join(stimuli_folder, fname) in photo_images
+                                          for fname in fnames):
+            key_images, cache_hits = self.decode_stimulus_images()
+        self.stimulus_images = {}
+        for tt, fname in self.stimulus_assignments_dict.items():
+            png_path = os_path.join(stimuli_folder, fname)
+            # One PhotoImage per file, even if several trial types share it
+            if png_path not in photo_images:
+                photo_images[png_path] = ImageTk.PhotoImage(key_images[fname])
+            self.stimulus_images[tt] = photo_images[png_path]
+        self.report_image_preparation(perf_counter() - prep_start,
+                                      len(fnames), cache_hits, decoding)
+
+    def report_image_preparation(self, seconds, n_images, cache_hits, preflight=None):
+        # Timing hook, called once per session after the stimuli are ready.
+        # cache_hits is None if nothing had to be decoded; preflight is the
+        # (seconds, cache hits) of the decoding preflight() did beforehand.
+        self.image_preparation_time = seconds
+        self.image_decoding_time = preflight[0] if preflight is not None else None
+        if preflight is not None:
+            source = (f"decoded by the preflight in {preflight[0]*1000:.1f} ms, "
+                      f"{preflight[1]}/{n_images} from cache")
+        elif cache_hits is None:
+            source = "kept from the last session"
+        else:
+            source = f"{cache_hits}/{n_images} from cache"
+        self.console.info(f"Stimulus images ready in {seconds*1000:.1f} ms ({source})")
+
+    def build_trial_assignment_list(self):
+        # Trials should be quasi-randomly ordered, such that there were no
+        # more than three of a single cue across consecutive trials (e.g.,
+        # never PAV, PAV, PAV, PAV). Each reshuffle stops at the first run
+        # that is too long, so a valid order turns up quickly (see
+        # sequences.py).
+        return constrained_shuffle(self.potential_trial_assignments(),
+                                   self.max_consecutive_trials,
+                                   key=self.trial_run_key)
+
+    def build_plan(self):
+        # Works out the session's stimuli, trial order and hidden patch
+        # (everything but the start time in session_plan()), checking that
+        # every trial type has a stimulus and an outcome policy. Needs no
+        # window, only subject_ID, condition and experiment_directory.
+        self.stimulus_assignments_dict = self.select_stimulus_assignments(
+            self.read_subject_assignments())
+        self.outcome_policies = self.build_outcome_policies()
+        self.trial_assignment_list = self.build_trial_assignment_list()
+        if not self.trial_assignment_list:
+            raise ValueError(f"No trials for subject {self.subject_ID} ({self.condition})")
+        for tt in sorted(set(self.trial_assignment_list)):
+            if tt not in self.stimulus_assignments_dict:
+                raise ValueError(f"No stimulus for trial type {tt} "
+                                 f"(subject {self.subject_ID}, {self.condition})")
+            if tt not in self.outcome_policies:
+                raise ValueError(f"No outcome policy for trial type {tt}")
+        if self.hidden_patch_enabled:
+            # Select hidden patch
+            self.hidden_patch_location = choice(geometry.hidden_patch_locations)
+        return {"condition": self.condition,
+                "stimulus_assignments": self.stimulus_assignments_dict,
+                "trial_assignment_list": self.trial_assignment_list,
+                "hidden_patch_location": self.hidden_patch_location}
+
+    def apply_plan(self, plan, key_images=None, decoding=None):
+        # Sets the session up from a plan (see build_plan()); key_images:
+        # the stimuli already decoded, if they were (decoding: how long that
+        # took, see load_stimulus_images())
+        self.stimulus_assignments_dict = plan["stimulus_assignments"]
+        if self.uses_image_stimuli:
+            self.load_stimulus_images(key_images, decoding)
+        self.outcome_policies = self.build_outcome_policies()
+        self.trial_assignment_list = plan["trial_assignment_list"]
+        self.max_trials = len(self.trial_assignment_list)
+        if self.hidden_patch_enabled:
+            self.hidden_patch_location = plan["hidden_patch_location"]
+            self.scene.place_hidden_patch(
+                geometry.hidden_patch_coords(self.hidden_patch_location))
+
+    def setup_session(self):
+        # Pulls in everything the session needs before the first trial, or
+        # takes it from the preflight if the control panel ran one
+        if self.preflight_plan is not None:
+            self.apply_plan(self.preflight_plan["plan"], self.preflight_plan["key_images"],
+                            self.preflight_plan["decoding"])
+        else:
+            self.apply_plan(self.build_plan())
+
+    @classmethod
+    def preflight(cls, subject_ID, condition, data_folder_directory, experiment_directory):
+        # Run by the control panel once a bird and condition are picked, so
+        # none of it waits until the spacebar: builds the session plan,
+        # decodes the stimulus images and checks that the data folder can be
+        # written to. Returns {"plan", "key_images", "decoding"} (decoding:
+        # seconds and cache hits of the image decoding); raises ValueError (bad
+        # or missing assignments) or OSError (missing stimulus, folder that
+        # can't be written to) describing the problem.
+        planner = cls.__new__(cls) # No window: only what build_plan() uses
+        planner.subject_ID = subject_ID
+        planner.condition = condition
+        planner.experiment_directory = experiment_directory
+        planner.hidden_patch_location = "NA"
+        plan = planner.build_plan()
+        key_images = decoding = None
+        if cls.uses_image_stimuli:
+            decode_start = perf_counter()
+            key_images, cache_hits = planner.decode_stimulus_images()
+            decoding = (perf_counter() - decode_start, cache_hits)
+        if data_folder_directory:
+            for folder in [os_path.join(data_folder_directory, subject_ID),
+                           os_path.join(data_folder_directory, journal_folder_name)]:
+                makedirs(folder, exist_ok = True)
+                with TemporaryFile(dir = folder):
+                    pass
+        return {"plan": plan, "key_images": key_images, "decoding": decoding}
+
+    def place_birds_in_box(self):
+        # This is the default screen run until the birds are placed into the
+        # box and the space bar is pressed. It then proceedes to the ITI. It only
+        # runs in the operant box version. After the space bar is pressed, the
+        # "first_ITI" function is called for the only time prior to the first trial
+
+        def first_ITI(event):
+            # Is initial delay before first trial starts. It first deletes all the
+            # objects off the mnainscreen (making it blank), unbinds the spacebar to
+            # the first_ITI link, followed by a pause before the first trial to
+            # let birds settle in and acclimate.
+            self.console.info("Spacebar pressed -- SESSION STARTED")
+            self.clear_canvas()
+            self.root.unbind("<space>")
+            self.start_time = datetime.now() # Set start time
+            self.clock.start() # Session time 0; every deadline is counted from here
+            self.trial_type = "NA"
+            if operant_box_version:
+                box.start_session()
+
+            if self.resume is not None:
+                self.resume_session()
+            else:
+                self.setup_session()
+                if self.journal_events and self.data_folder_directory:
+                    # Every event from here on is journaled, even if data
+                    # isn't recorded, so an interrupted session can be
+                    # recovered or resumed; older unfinished sessions of
+                    # this bird can't be resumed anymore
+                    retire_journals(self.data_folder_directory, self.subject_ID)
+                    self.journal = SessionJournal(self.data_folder_directory,
+                                                  f"{self.subject_ID}/{self.data_file_name()}",
+                                                  self.header_list, sync = self.sync_data_file)
+                    self.journal.write_plan(self.session_plan())
+
+            # After the order of stimuli per trial is determined, we can start.
+            # If running a test session, the duration of intervals can be
+            # lowered significantly to make more efficient
+            if self.subject_ID == "TEST": # If test, don't worry about ITI delays
+                self.ITI_duration = 1000
+                self.hopper_duration = 1000
+                self.clock.after(1000, self.ITI)
+            else:
+                self.clock.after(self.first_ITI_duration, self.ITI)
+
+        # The runs first, setting up the spacebar trigger
+        self.root.bind("<space>", first_ITI) # bind cursor state to "space" key
+        resuming = (f"\nResuming at trial {self.resume['checkpoint']['trials'] + 1}"
+                    if self.resume is not None else "")
+        self.scene.show_message(f"{self.experiment_name} \n"
+                                "Place bird in box, then press space \n"
+                                f"{self.session_label()}{resuming}")
+
+    def session_plan(self):
+        # Everything resume_session() needs that can't be rebuilt from the
+        # events (journaled once the session is set up)
+        return {"start_time": self.start_time.isoformat(),
+                "condition": self.condition,
+                "stimulus_assignments": self.stimulus_assignments_dict,
+                "trial_assignment_list": self.trial_assignment_list,
+                "hidden_patch_location": self.hidden_patch_location}
+
+    def resume_session(self):
+        # Instead of setup_session(): picks an unfinished session back up
+        # after its last completed trial, with the same plan, data file,
+        # events and random state (see journal.py). The events of the
+        # unfinished trial are dropped; that trial is run again.
+        plan, checkpoint = self.resume["plan"], self.resume["checkpoint"]
+        self.start_time = datetime.fromisoformat(plan["start_time"]) # Same data file
+        self.clock.start(self.resume["session_time"]) # Session time carries on
+        self.apply_plan(plan)
+        self.session_data_frame = restore_log(self.resume["header"], self.resume["code_texts"],
+                                              self.resume["events"])
+        self.current_trial_counter = checkpoint["trials"]
+        version, internal_state, gauss_next = checkpoint["random_state"]
+        setstate((version, tuple(internal_state), gauss_next))
+
+        if self.journal_events and self.data_folder_directory:
+            # A new journal holding only the events kept replaces the old one
+            old_path = f"{self.resume['path']}.old"
+            replace(self.resume["path"], old_path)
+            self.journal = SessionJournal(self.data_folder_directory, self.resume["data_file"],
+                                          self.header_list, sync = self.sync_data_file)
+            self.journal.write_plan(plan)
+            self.journal.checkpoint(self.session_data_frame, checkpoint)
+            self.journal.commit()
+            remove(old_path)
+        self.write_data(None, "SessionResumed")
+        self.console.info(f"Resumed {self.resume['data_file']} after trial {self.current_trial_counter}")
+
+    ## %% ITI
+    # Every trial (including the first) "starts" with an ITI. The ITI function
+    # does several different things:
+    #   1) Checks to see if any session constraints have been reached
+    #   2) Resets the hopper and any trial-by-trial variables
+    #   3) Increases the trial counter by one
+    #   4) Moves on to the next trial after a delay
+    #
+    def ITI(self):
+        # Blank the screen, leaving only the ITI background so that pecks
+        # during the ITI are saved
+        self.scene.show_ITI()
+
+        # This turns all the stimuli off from the previous trial (during the
+        # ITI). Needs to happen every ITI.
+        if operant_box_version:
+            box.reset()
+
+        # First, check to see if any session limits have been reached (e.g.,
+        # if the max time or reinforcers earned limits are reached).
+        if self.current_trial_counter == self.max_trials:
+            self.console.info("Trial max reached")
+            self.all_trials_run = True
+            self.exit_program("event")
+
+        # Else, after a timer move on to the next trial. Note that,
+        # although the after() function is given here, the rest of the code
+        # within this function is still executed before moving on. Timers
+        # are set from when this ITI was *due*, not when it actually ran,
+        # so a late callback doesn't push back the rest of the session.
+        else:
+            # Print text on screen if a test (should be black if an experimental trial)
+            if not operant_box_version or self.subject_ID == "TEST":
+                self.scene.show_message(f"ITI ({int(self.ITI_duration/1000)} sec.)")
+
+            # Reset other variables for the following trial.
+            self.trial_start = self.clock.anchor # Set trial start time (note that it includes the ITI, which is subtracted later)
+            self.trial_peck_counter = 0 # Reset trial peck counter each trial
+            self.background_peck_counter = 0 # Also reset background counter
+            self.hidden_patch_peck_counter = 0 # And hidden patch trials
+
+            if self.journal is not None:
+                # Enough to resume from here if the session is interrupted
+                self.journal.checkpoint(self.session_data_frame,
+                                        {"trials": self.current_trial_counter,
+                                         "random_state": getstate()})
+            self.write_comp_data(False) # update data .csv with trial data from the previous trial
+
+            # Increase trial counter by one, then pick the aligned trial code
+            self.current_trial_counter += 1
+            self.trial_type = self.trial_assignment_list[self.current_trial_counter - 1]
+
+            if self.current_trial_counter == 1:
+                self.clock.after(self.ITI_duration, self.start_signal_period,
+                                 trial = self.current_trial_counter)
+            else:
+                # Next, set a delay timer to proceed to the next trial
+                self.clock.after(self.ITI_duration, self.build_keys,
+                                 trial = self.current_trial_counter)
+
+            # Finally, print terminal feedback "headers" for each event within the next trial
+            self.console.info(f"\n{'*'*30} Trial {self.current_trial_counter} begins {'*'*30}") # Terminal feedback...
+            self.console.info(f"{'Event Type':>30} | Xcord. Ycord. | Trial | Session Time",
+                              verbosity = "events")
+
+    #%%
+    """
+    This function is called one single time at the very beginning of the
+    session. It simply builds a blank square and requires one peck to start
+    the program. This was called to make sure that pigeons were "ready" to
+    start the session, given that trials progressed on a timer. More info
+    about building Canvas widgets in the following section.
+    """
+    def start_signal_period(self):
+        # We need to turn on the houselight as soon as the trial starts
+        if operant_box_version:
+            box.house_light(True) # Turn on house light
+        # Background (pecks count as background pecks) and the white square
+        self.scene.show_start_signal()
+
+    def start_signal_press(self, event, event_type):
+        # Write data for the peck
+        self.write_data(event, event_type)
+        self.clear_canvas()
+        # Proceed to the first trial 1 s after the peck
+        self.clock.mark()
+        self.clock.after(1000, self.build_keys, trial = self.current_trial_counter)
+
+
+    """
+    The code below is very straightforward. It builds the key for the specific
+    trial, ties a function to the background and key, and then starts a 10s
+    timer for the trial. Key pecks are incrementally counted and calculated
+    at the end of the timer to see if the criterion is met.
+    """
+
+    def build_keys(self):
+        # Reset trial time as soon as keys are built if
+        if self.current_trial_counter == 1:
+            self.trial_start = self.clock.anchor - (self.ITI_duration/1000)# Set trial start time (note that it includes the ITI, which is subtracted later)
+
+        # We need to turn on the houselight as soon as the trial starts
+        if operant_box_version:
+            box.house_light(True) # Turn on house light
+
+        # Then show the background and key. The background is a button the
+        # size of the screen to track any pecks; the key is built on top of
+        # it, so pecks on the key will NOT count as background pecks. All of
+        # these items already exist (see scene.py); only the stimulus
+        # changes from trial to trial.
+        if self.uses_image_stimuli:
+            # Stimulus image .png, centered in the key circle
+            self.scene.show_key(image = self.stimulus_images.get(self.trial_type),
+                                hidden_patch = self.hidden_patch_enabled)
+        else:
+            self.scene.show_key(fill = self.stimulus_assignments_dict[self.trial_type],
+                                hidden_patch = self.hidden_patch_enabled)
+
+        # Lastly, start a timer for the trial (untimed trials, like FR2,
+        # only end once their response requirement is met)
+        if self.outcome_policies[self.trial_type].timed:
+            self.trial_timer = self.clock.after(self.trial_timer_duration,
+                                                self.calculate_trial_outcome,
+                                                trial = self.current_trial_counter)
+        else:
+            self.trial_timer = None
+
+    def key_press(self, event, event_type):
+        # This is the function that is called whenever a key is pressed. It
+        # simply increments the counter and writes a line of data.
+        # Add to peck counter
+        self.trial_peck_counter += 1
+        # Write data for the peck
+        self.write_data(event, event_type)
+        # Some schedules (e.g., FR2) reinforce right after the peck
+        if self.outcome_policies[self.trial_type].peck_outcome(self.trial_peck_counter):
+            self.clear_canvas()
+            self.clock.mark() # The hopper is timed from this peck
+            self.reinforce_trial()
+
+    def background_press(self, event):
+        # This is the function that is called whenever the background is
+        # pressed. It simply increments the counter and writes a line of data.
+        # Add to background counter
+        self.background_peck_counter += 1
+        # Write data for the peck
+        self.write_data(event, "background_peck")
+
+    def hidden_patch_press(self, event):
+        # This is the function that is called whenever the hidden patch is
+        # pressed. It simply increments the counter and writes a line of data.
+        self.hidden_patch_peck_counter += 1
+        # Write data for the peck
+        self.write_data(event, "hidden_patch_peck", self.hidden_patch_location)
+
+    def calculate_trial_outcome(self):
+        # This function is called once the 10s timer elapses and calculates
+        # whether the trial will be reinforced or not, according to the
+        # outcome policy of the current trial type.
+        self.clear_canvas()
+
+        reinforced = self.outcome_policies[self.trial_type].trial_outcome(
+            self.trial_peck_counter, self.background_peck_counter)
+
+        # If a reinforcement is earned...
+        if reinforced:
+            self.reinforce_trial()
+
+        # If not reinforced, just proceed to the ITI
+        else:
+            self.write_data(None, "nonreinforced_trial")
+            self.ITI()
+
+    def reinforce_trial(self):
+        # Raises the hopper, then proceeds to the ITI once the hopper
+        # duration has passed
+        self.write_data(None, "reinforced_trial")
+        if not operant_box_version or self.subject_ID == "TEST":
+            self.scene.show_message(f"Trial Reinforced \nFood accessible ({int(self.hopper_duration/1000)} s)") # just onscreen feedback
+
+        # Next send output to the box's hardware
+        if operant_box_version:
+            box.reinforce()
+
+        self.clock.after(self.hopper_duration, self.ITI, label = "hopper_end",
+                         trial = self.current_trial_counter)
+
+    # %% Outside of the main loop functions, there are several additional
+    # repeated functions that are called either outside of the loop or
+    # multiple times across phases.
+
+    def change_cursor_state(self):
+        # This function toggles the cursor state on/off.
+        # May need to update accessibility settings on your machince.
+        if self.cursor_visible: # If cursor currently on...
+            self.root.config(cursor="none") # Turn off cursor
+            self.console.info("### Cursor turned off ###")
+            self.cursor_visible = False
+        else: # If cursor currently off...
+            self.root.config(cursor="") # Turn on cursor
+            self.console.info("### Cursor turned on ###")
+            self.cursor_visible = True
+
+    def clear_canvas(self):
+         # This is by far the most called function across the program. It
+         # hides every object on the Canvas. The objects themselves are
+         # built once per session (see scene.py) and reused, so nothing
+         # piles up underneath; hidden objects can't be pecked.
+        try:
+            self.scene.hide_all()
+        except TclError:
+            self.console.info("No screen to exit")
+
+    def exit_program(self, event):
+        # This function can be called two different ways: automatically (when
+        # time/reinforcer session constraints are reached) or manually (via the
+        # "End Program" button in the control panel or bound "esc" key).
+
+        # The program does a few different things:
+        #   1) Return hopper to down state, in case session was manually ended
+        #       during reinforcement (it shouldn't be)
+        #   2) Turn cursor back on
+        #   3) Writes compiled data matrix to a .csv file
+        #   4) Hides the window (kept, with the box hardware, for the next
+        #       session; see Chamber)
+        #   5) Queues the subject for the Paint object, which creates an
+        #       onscreen Paint Canvas once the control panel is closed (so
+        #       the next bird doesn't wait for it; see hardware.py)
+        def other_exit_funcs():
+            if operant_box_version:
+                box.end_session()
+
+                if not self.cursor_visible:
+                    self.change_cursor_state() # turn cursor back on, if applicable
+            self.clock.stop() # Timers still pending won't run anymore
+            self.write_comp_data(True) # write data for end of session
+            self.root.withdraw() # hide Canvas
+            self.console.info("\n GUI window exited")
+
+        if self.session_ended:
+            return
+        self.session_ended = True
+        self.clear_canvas()
+        other_exit_funcs()
+        self.console.info("\n You may start the next session, or close the control panel"
+                          " to run the paint program and exit.")
+        self.console.close() # Write out any remaining feedback
+        if operant_box_version:
+            queue_painting(self.subject_ID) # paint object, run when the CP closes
+
+    def write_data(self, event, outcome, hidden_patch="NA"):
+        # This function writes a new data line after EVERY peck. Data is
+        # organized into a matrix (a table, stored column by column as
+        # compact arrays; see event_log.py). This matrix is appended to
+        # throughout the session, then written to a .csv at every ITI.
+        if event != None:
+            x, y = event.x, event.y
+        else: # There are certain data events that are not pecks.
+            x, y = "NA", "NA"
+
+        now = round(self.clock.now(), 6)
+        self.console.event(outcome, x, y, self.trial_type, now)
+        row = {
+            "SessionTime": now, # Seconds (written out as H:MM:SS.ffffff)
+            "Xcord": x, # X coordinate of a peck
+            "Ycord": y, # Y coordinate of a peck
+            "Event": outcome, # Type of event (e.g., background peck, target presentation, session end, etc.)
+            "TrialTime": round((now - self.trial_start - (self.ITI_duration/1000)), 5), # Time into this trial minus ITI (if session ends during ITI, will be negative)
+            "TrialType": self.trial_type, # e.g., PAV, INS_2, 35.3
+            "TargetPeckNum": self.trial_peck_counter, # Count of button pecks that trial
+            "BackgroundPeckNum": self.background_peck_counter, # Background peck counter
+            "TrialNum": self.current_trial_counter, # Trial count within session (1 - max # trials)
+            "TrialColor": self.stimulus_assignments_dict.get(self.trial_type, "NA"), # Trial color/PNG
+            "Subject": self.subject_ID, # Name of subject (same across datasheet)
+            "ExpPhase": self.condition, # Phase name (e.g., RR2)
+            "HiddenPatch": hidden_patch, # Hidden patch location, if pecked
+            "Date": date.today() # Today's date as "MM-DD-YYYY"
+            }
+        self.session_data_frame.append([row[column] for column in self.header_list])
+        if self.journal is not None:
+            self.journal.append(self.session_data_frame)
+
+    def write_comp_data(self, SessionEnded):
+        # The following function creates a .csv data document. It is either
+        # called after each trial during the ITI (SessionEnded ==False) or
+        # one the session finishes (SessionEnded). If the first time the
+        # function is called, it will produce a new .csv out of the
+        # session_data_matrix variable, named after the subject, date, and
+        # training phase. Consecutive iterations of the function only append
+        # the rows added since the last call, then sync the file to disk.
+        if SessionEnded:
+            self.write_data(None, "SessionEnds") # Writes end of session to df
+        if self.record_data : # If experimenter has choosen to automatically record data in seperate sheet:
+            myFile_loc = f"{self.data_folder_directory}/{self.subject_ID}/{self.data_file_name()}" # location of written .csv
+            # Only the rows added since the last flush are appended to the .csv
+            if self.session_writer is None or self.session_writer.file_path != myFile_loc:
+                self.session_writer = SessionWriter(myFile_loc)
+            self.session_writer.flush(self.session_data_frame,
+                                      sync = self.sync_data_file) # Write new event/trial data
+            if SessionEnded:
+                self.session_writer.close()
+                # Intended vs. actual time of every timed event, next to the data
+                self.clock.write_log(myFile_loc[:-len(".csv")] + "_timing.csv")
+                # Every raw touch event, and whether it was merged as a duplicate
+                self.touch.write_log(myFile_loc[:-len(".csv")] + "_touch.csv")
+                if operant_box_version:
+                    # Issue/acknowledge times of every hopper and light command,
+                    # written by the hardware worker once the end-of-session
+                    # commands (hopper down, lights off, servo released) are
+                    # acknowledged too
+                    box.commands.after_pending(box.commands.write_log,
+                                               myFile_loc[:-len(".csv")] + "_hardware.csv",
+                                               self.clock.origin)
+            self.console.info(f"\n- Data file written to {myFile_loc}")
+        if self.journal is not None:
+            if SessionEnded:
+                # The journal is only kept if the session was stopped
+                # early, so it can be resumed
+                self.journal.close(remove_file = self.all_trials_run)
+                self.journal = None
+            else:
+                self.journal.commit() # Group commit at each trial boundary
+        if SessionEnded:
+            n_events, mean_late, max_late = self.clock.lateness_summary()
+            self.console.info(f"- {n_events} timed events; lateness mean {mean_late:.1f} ms, max {max_late:.1f} ms")
+            self.console.info(f"- {self.touch.raw_count} touch events, "
+                              f"{self.touch.duplicate_count} merged as duplicate pecks")
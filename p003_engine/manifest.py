@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Megan C. & Cyrus K.
+
+Index of the session data files under a data folder (e.g., ~/Desktop/Data,
+or one experiment's <exp>_data folder), so analyses don't have to re-open
+and re-parse every .csv just to find the sessions they want.
+
+The index is a .csv ("session_manifest.csv") at the top of the data folder,
+one line per session file:
+
+    Path        -- relative to the data folder, e.g., Wario/Wario_2026-..._P003Fc_data.csv
+    Experiment  -- the data file tag (P003e, P003f, P003Fb, P003Fc, P003Bii)
+    Subject, StartTime (YYYY-MM-DD HH:MM:SS), Phase (P003e only)
+    Size, MtimeNs, SHA256 -- of the file as last indexed
+    Rows, Trials -- data rows (without the header) and highest TrialNum
+    Complete    -- 1 if the last event is SessionEnds
+
+update() only stats the files; a file is re-read (hashed and counted) only
+if it is new or its size or mtime changed, and files that are gone are
+dropped. The _timing/_hardware/_touch side files of each session aren't
+indexed.
+
+    python -m p003_engine.manifest ~/Desktop/Data [experiment] [subject]
+"""
+from csv import DictReader, DictWriter, QUOTE_MINIMAL, reader
+from hashlib import sha256
+from os import path as os_path, replace, stat, walk
+from re import compile as re_compile
+from sys import argv
+
+manifest_name = "session_manifest.csv"
+manifest_columns = ["Path", "Experiment", "Subject", "StartTime", "Phase", "Size",
+                    "MtimeNs", "SHA256", "Rows", "Trials", "Complete"]
+integer_columns = ["Size", "MtimeNs", "Rows", "Trials", "Complete"]
+
+# <Subject>_<YYYY-MM-DD_HH.MM.SS>_<tag>_data[-Phase-<phase>].csv (see
+# MainScreen.data_file_name)
+data_file_pattern = re_compile(
+    r"^(?P<subject>.+)_(?P<date>\d{4}-\d{2}-\d{2})_(?P<time>\d{2}\.\d{2}\.\d{2})"
+    r"_(?P<experiment>[^_]+)_data(?:-Phase-(?P<phase>[^_]+))?\.csv$")
+
+
+def read_session_file(file_path):
+    # Hash, data rows and highest trial number of one session file
+    with open(file_path, "rb") as data_file:
+        contents = data_file.read()
+    rows = list(reader(contents.decode("utf-8").splitlines()))
+    header, rows = (rows[0], rows[1:]) if rows else ([], [])
+    trials = 0
+    if "TrialNum" in header:
+        column = header.index("TrialNum")
+        trials = max((int(row[column]) for row in rows
+                      if len(row) > column and row[column].isdigit()), default=0)
+    complete = ("Event" in header and bool(rows) and len(rows[-1]) > header.index("Event")
+                and rows[-1][header.index("Event")] == "SessionEnds")
+    return sha256(contents).hexdigest(), len(rows), trials, int(complete)
+
+
+class SessionManifest(object):
+    def __init__(self, data_folder):
+        self.data_folder = data_folder
+        self.manifest_path = os_path.join(data_folder, manifest_name)
+        self.entries = {} # Path -> entry (dictionary of manifest_columns)
+        if os_path.exists(self.manifest_path):
+            with open(self.manifest_path, newline='') as manifest_file:
+                for entry in DictReader(manifest_file):
+                    for column in integer_columns:
+                        entry[column] = int(entry[column])
+                    self.entries[entry["Path"]] = entry
+
+    def scan(self):
+        # (relative path, file name match, full path) of every session file
+        for folder, subfolders, file_names in walk(self.data_folder):
+            subfolders.sort()
+            for file_name in sorted(file_names):
+                match = data_file_pattern.match(file_name)
+                if match is None:
+                    continue
+                file_path = os_path.join(folder, file_name)
+                relative_path = os_path.relpath(file_path, self.data_folder).replace(os_path.sep, "/")
+                yield relative_path, match, file_path
+
+    def update(self):
+        # Brings the manifest up to date; returns (added, changed, removed)
+        added = changed = 0
+        seen = set()
+        for relative_path, match, file_path in self.scan():
+            seen.add(relative_path)
+            file_stat = stat(file_path)
+            entry = self.entries.get(relative_path)
+            if (entry is not None and entry["Size"] == file_stat.st_size
+                    and entry["MtimeNs"] == file_stat.st_mtime_ns):
+                continue # Unchanged since it was indexed
+            digest, rows, trials, complete = read_session_file(file_path)
+            if entry is None:
+                added += 1
+            else:
+                changed += 1
+            self.entries[relative_path] = {
+                "Path": relative_path,
+                "Experiment": match["experiment"],
+                "Subject": match["subject"],
+                "StartTime": f"{match['date']} {match['time'].replace('.', ':')}",
+                "Phase": match["phase"] or "",
+                "Size": file_stat.st_size,
+                "MtimeNs": file_stat.st_mtime_ns,
+                "SHA256": digest,
+                "Rows": rows,
+                "Trials": trials,
+                "Complete": complete,
+                }
+        removed = [path for path in self.entries if path not in seen]
+        for path in removed:
+            del self.entries[path]
+        if added or changed or removed or not os_path.exists(self.manifest_path):
+            self.save()
+        return added, changed, len(removed)
+
+    def save(self):
+        # Writes to a temporary file first so a half-written manifest is never read
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, 'w', newline='') as manifest_file:
+            manifest_writer = DictWriter(manifest_file, manifest_columns, quoting=QUOTE_MINIMAL)
+            manifest_writer.writeheader()
+            manifest_writer.writerows(sorted(self.entries.values(),
+                                             key=lambda entry: entry["Path"]))
+        replace(temp_path, self.manifest_path)
+
+    def sessions(self, experiment=None, subject=None, since=None, until=None,
+                 complete=None, phase=None):
+        # Entries matching every filter given, oldest first. since/until are
+        # dates, datetimes or "YYYY-MM-DD[ HH:MM:SS]" strings (inclusive).
+        since = str(since) if since is not None else None
+        until = str(until) if until is not None else None
+        matches = []
+        for entry in self.entries.values():
+            if experiment is not None and entry["Experiment"] != experiment:
+                continue
+            if subject is not None and entry["Subject"] != subject:
+                continue
+            if phase is not None and entry["Phase"] != phase:
+                continue
+            if complete is not None and entry["Complete"] != int(complete):
+                continue
+            if since is not None and entry["StartTime"] < since:
+                continue
+            if until is not None and entry["StartTime"][:len(until)] > until:
+                continue
+            matches.append(entry)
+        return sorted(matches, key=lambda entry: entry["StartTime"])
+
+    def file_path(self, entry):
+        return os_path.join(self.data_folder, *entry["Path"].split("/"))
+
+
+if __name__ == '__main__':
+    manifest = SessionManifest(os_path.expanduser(argv[1]))
+    added, changed, removed = manifest.update()
+    print(f"{added} new, {changed} changed, {removed} removed; "
+          f"{len(manifest.entries)} sessions in {manifest.manifest_path}")
+    for entry in manifest.sessions(*(argv[2:4])):
+        print(f"{entry['StartTime']} | {entry['Experiment']:>7} | {entry['Subject']:>10} | "
+              f"{entry['Trials']:>4} trials | {entry['Rows']:>6} rows | "
+              f"{'complete' if entry['Complete'] else 'incomplete'}")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Megan C. & Cyrus K.
+
+Trial-outcome policies. Each trial type in an experiment maps onto one of the
+policies below, which decides whether that trial is reinforced:
+
+    Pavlovian      -- reinforced with a fixed probability, pecks don't matter
+                      (P003B.ii CSs; PAV is p = 1.0 and EXT is p = 0.0)
+    RandomRatio    -- a 1-in-rr "dice roll" per key peck (P003e, P003f,
+                      P003Fb), sampled in closed form
+    VariableRatio  -- one response requirement drawn per trial (P003Fc)
+    FixedRatio     -- reinforced as soon as the Nth key peck happens (FR2)
+
+Instrumental (INS) versions start out nonreinforced and become reinforced
+when the schedule is met; omission (OMS) versions start out reinforced and
+are cancelled when the schedule is met.
+"""
+from random import choice, random
+
+
+class OutcomePolicy(object):
+    # If timed is True, the trial lasts for the trial timer and the outcome
+    # is calculated when it runs out. Untimed trials (e.g., FR) only end
+    # through peck_outcome().
+    timed = True
+
+    def trial_outcome(self, key_pecks, background_pecks):
+        # Called at the end of the trial timer; returns True if reinforced
+        raise NotImplementedError
+
+    def peck_outcome(self, key_pecks):
+        # Called after each key peck; returns True if the trial should be
+        # reinforced right away
+        return False
+
+
+class Pavlovian(OutcomePolicy):
+    def __init__(self, probability):
+        self.probability = probability # 0-1
+
+    def trial_outcome(self, key_pecks, background_pecks):
+        # Outcome depends only on the CS-specific p (pecks do not matter)
+        if self.probability >= 1:
+            return True
+        if self.probability <= 0:
+            return False
+        return random() < self.probability
+
+
+class RandomRatio(OutcomePolicy):
+    def __init__(self, rr_sched, omission=False):
+        self.rr_sched = rr_sched # e.g., 2, 5, 20, or 50
+        self.omission = omission
+
+    def schedule_probability(self, key_pecks):
+        # Rolling a 1-in-rr die once per peck meets the schedule if any roll
+        # comes up 0, which happens with p = 1 - (1 - 1/rr)^pecks
+        if key_pecks <= 0:
+            return 0.0
+        return 1.0 - (1.0 - 1.0 / self.rr_sched) ** key_pecks
+
+    def trial_outcome(self, key_pecks, background_pecks):
+        # One draw against the closed-form probability gives the same
+        # distribution as rolling a die for every peck, in constant time
+        schedule_met = random() < self.schedule_probability(key_pecks)
+        return schedule_met != self.omission
+
+
+class VariableRatio(OutcomePolicy):
+    def __init__(self, vr_sched, omission=False):
+        self.vr_sched = vr_sched # e.g., 2, 5, 20, or 50
+        self.omission = omission
+        # Per-trial requirements are drawn from these bands (inclusive):
+        # ±15% for 50; ±30% otherwise
+        band = 0.15 if vr_sched == 50 else 0.30
+        self.low = max(1, int(round((1 - band) * vr_sched)))
+        self.high = max(self.low, int(round((1 + band) * vr_sched)))
+
+    def trial_outcome(self, key_pecks, background_pecks):
+        # Count *all* pecks (key + background) toward the VR criterion
+        total_pecks = key_pecks + background_pecks
+        requirement = choice(range(self.low, self.high + 1))
+        return (total_pecks >= requirement) != self.omission
+
+
+class FixedRatio(OutcomePolicy):
+    timed = False
+
+    def __init__(self, ratio):
+        self.ratio = ratio
+
+    def trial_outcome(self, key_pecks, background_pecks):
+        return key_pecks >= self.ratio
+
+    def peck_outcome(self, key_pecks):
+        return key_pecks >= self.ratio
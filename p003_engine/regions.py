@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Megan C. & Cyrus K.
+
+Screen regions of the 1024x768 touchscreen, worked out once from the key,
+outline and hidden patch geometry (geometry.py). What a peck hits used to
+be left to Tk: whichever item was topmost under it (background, outline
+oval, stimulus image, stimulus oval, midpoint, hidden patch) and had a
+binding. region_map() instead labels every pixel, so classifying a peck is
+one lookup:
+
+    background     -- none of the below
+    key_core       -- inside the key circle (the stimulus)
+    key_rim        -- the black outline ring, inside the key square
+    key_rim_outer  -- the black outline ring, outside the key square
+    key_corner     -- inside the key square, outside the outline ring (the
+                      corners of the start key and of PNG stimuli)
+    hidden_patch   -- the P003f hidden patch, if its location is given
+
+The regions don't overlap, except that the hidden patch is on top. What
+each region counts as depends on what is shown (see scene.py): the start
+key is the key square (core, rim and corners), and the key is the outline
+oval (core and both rims) plus the corners when it shows a PNG, just as
+when Tk decided. The outline counting as key is intended: pecks just off
+the stimulus are key pecks.
+
+The same map re-classifies archived pecks offline (region_ids(); needs
+NumPy):
+
+    python -m p003_engine.regions ~/Desktop/Data/P003Fc_data [subject event ...]
+"""
+from math import ceil, floor, sqrt
+from os import path as os_path
+from sys import argv
+
+from p003_engine import geometry
+
+region_names = ["background", "key_core", "key_rim", "key_rim_outer", "key_corner",
+                "hidden_patch"]
+BACKGROUND, KEY_CORE, KEY_RIM, KEY_RIM_OUTER, KEY_CORNER, HIDDEN_PATCH = range(len(region_names))
+OFF_SCREEN = 255 # region_ids() of pecks outside the screen (or without coordinates)
+
+# What the start key and the key are made of
+start_key_regions = frozenset([KEY_CORE, KEY_RIM, KEY_CORNER])
+key_regions = frozenset([KEY_CORE, KEY_RIM, KEY_RIM_OUTER])
+image_key_regions = key_regions | {KEY_CORNER}
+
+region_maps = {} # {hidden patch coordinates (or None): map}, built once each
+
+
+def oval_span(coords, y):
+    # (first, last) x of the pixels of row y inside the oval, or None
+    x1, y1, x2, y2 = coords
+    rx, ry = (x2 - x1) / 2, (y2 - y1) / 2
+    t = ((y - y1 - ry) / ry) ** 2
+    if t > 1:
+        return None
+    half = rx * sqrt(1 - t)
+    return ceil(x1 + rx - half), floor(x1 + rx + half)
+
+
+def rectangle_span(coords, y):
+    # (first, last) x of the pixels of row y inside the rectangle, or None
+    x1, y1, x2, y2 = coords
+    if not y1 <= y <= y2:
+        return None
+    return ceil(x1), floor(x2)
+
+
+def fill(row, span, region, within=None):
+    # Sets row[first:last + 1] to region (clipped to the screen and to within)
+    if span is None:
+        return
+    first, last = max(span[0], 0), min(span[1], geometry.mainscreen_width - 1)
+    if within is not None:
+        first, last = max(first, within[0]), min(last, within[1])
+    if first <= last:
+        row[first:last + 1] = bytes([region]) * (last - first + 1)
+
+
+def region_map(hidden_patch=None):
+    # The region of every pixel, row by row (index y * width + x), as a
+    # bytearray. hidden_patch: the patch's [X1, Y1, X2, Y2], if shown.
+    # Each map is built once (about a ms) and shared.
+    key = tuple(hidden_patch) if hidden_patch is not None else None
+    if key in region_maps:
+        return region_maps[key]
+    width = geometry.mainscreen_width
+    regions = bytearray(width * geometry.mainscreen_height) # All background (0)
+    for y in range(geometry.mainscreen_height):
+        row = bytearray(width)
+        square = rectangle_span(geometry.key_coord_list, y)
+        # Bottom to top, each covering the last
+        fill(row, square, KEY_CORNER)
+        fill(row, oval_span(geometry.outline_coords_list, y), KEY_RIM_OUTER)
+        if square is not None:
+            fill(row, oval_span(geometry.outline_coords_list, y), KEY_RIM, within = square)
+        fill(row, oval_span(geometry.key_coord_list, y), KEY_CORE)
+        if hidden_patch is not None:
+            fill(row, rectangle_span(hidden_patch, y), HIDDEN_PATCH)
+        regions[y * width:(y + 1) * width] = row
+    region_maps[key] = regions
+    return regions
+
+
+def region_at(regions, x, y):
+    # Region of the pixel at x, y, or None if it is off the screen
+    if 0 <= x < geometry.mainscreen_width and 0 <= y < geometry.mainscreen_height:
+        return regions[int(y) * geometry.mainscreen_width + int(x)]
+    return None
+
+
+def region_ids(x, y, hidden_patch=None):
+    # region_at() for whole arrays of coordinates (NaN: no coordinates),
+    # with OFF_SCREEN for pecks that are off the screen
+    import numpy as np
+    regions = np.frombuffer(region_map(hidden_patch), dtype=np.uint8)
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    on_screen = ((x >= 0) & (x < geometry.mainscreen_width)
+                 & (y >= 0) & (y < geometry.mainscreen_height)) # False for NaN
+    ids = np.full(x.shape, OFF_SCREEN, dtype=np.uint8)
+    ids[on_screen] = regions[y[on_screen].astype(np.int64) * geometry.mainscreen_width
+                             + x[on_screen].astype(np.int64)]
+    return ids
+
+
+def region_counts(pecks, by=("subject", "event"), hidden_patch=None):
+    # Pecks per region of every group of pecks (as loaded by
+    # spatial.load_pecks()) sharing the values of the columns in by;
+    # returns {column: array}, the group's by values first
+    import numpy as np
+    from p003_engine.spatial import group_ids
+    names = region_names + ["off_screen"]
+    ids = region_ids(pecks["x"], pecks["y"], hidden_patch).astype(np.int64)
+    ids[ids == OFF_SCREEN] = len(region_names)
+    group, group_keys, n_groups = group_ids(pecks, list(by))
+    counts = np.bincount(group * len(names) + ids,
+                         minlength = n_groups * len(names)).reshape(n_groups, len(names))
+    return dict(group_keys, **{name: counts[:, i] for i, name in enumerate(names)})
+
+
+if __name__ == '__main__':
+    # Pecks per region and group (default: per subject and event) over every
+    # session in a data folder, converting sessions to .columns as needed
+    from p003_engine.columnar import archive_paths
+    from p003_engine.spatial import load_pecks, metrics_table
+    from p003_engine.tables import print_table
+    pecks, labels = load_pecks(archive_paths(os_path.expanduser(argv[1])))
+    print_table(metrics_table(region_counts(pecks, by = argv[2:] or ["subject", "event"]),
+                              labels))
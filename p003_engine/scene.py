@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Megan C. & Cyrus K.
+
+The onscreen items of a session, built once and then shown or hidden.
+
+Every phase of a trial used to start by deleting everything on the Canvas
+and drawing (and re-binding) it again from scratch. TrialScene instead
+creates each item a single time and afterwards only flips item states and
+swaps the stimulus fill or image.
+
+Pecks aren't routed by Tk's item stacking anymore: one binding on the
+Canvas looks up the peck's screen region (see regions.py) and, given what
+is shown, picks the handler. What can be pecked in each phase is unchanged
+(nothing that is hidden takes pecks).
+
+Items, bottom to top (order matters, as shapes built on top of each other
+cover each other):
+
+    iti_bkgrd     -- black screen during the ITI (pecks are "ITI_peck")
+    bkgrd         -- black screen during a trial (background pecks)
+    start_key     -- white square that starts the session
+    key           -- outline, stimulus image (PNG experiments), stimulus
+                     oval and midpoint
+    hidden_patch  -- invisible square (P003f)
+    message       -- onscreen feedback text
+"""
+from p003_engine import geometry
+from p003_engine.regions import HIDDEN_PATCH, image_key_regions, key_regions, region_at, \
+     region_map, start_key_regions
+
+
+class TrialScene(object):
+    def __init__(self, canvas, on_ITI_peck, on_background_peck,
+                 on_start_signal_peck, on_key_peck, on_hidden_patch_peck=None,
+                 uses_image_stimuli=False):
+        self.canvas = canvas
+        width, height = geometry.mainscreen_width, geometry.mainscreen_height
+        # Where a peck lands decides which of these runs (see target_at())
+        self.handlers = {"iti_bkgrd": on_ITI_peck,
+                         "bkgrd": on_background_peck,
+                         "start_key": on_start_signal_peck,
+                         "key": on_key_peck,
+                         "hidden_patch": on_hidden_patch_peck}
+        self.regions = region_map()
+        self.phase = None # "ITI", "start_signal", "key" or None (nothing to peck)
+        self.key_regions = key_regions
+        self.hidden_patch_shown = False
+        canvas.bind("<Button-1>", self.peck)
+
+        # Backgrounds. They only differ in how their pecks are recorded
+        for tag in ["iti_bkgrd", "bkgrd"]:
+            canvas.create_rectangle(0, 0, width, height,
+                                    fill = "black",
+                                    outline = "black",
+                                    tags = (tag, "scene"))
+
+        canvas.create_rectangle(geometry.key_coord_list,
+                                outline = "black",
+                                fill = "white",
+                                tags = ("start_key", "scene"))
+
+        # The key: a black outline, then the stimulus, then the midpoint
+        canvas.create_oval(geometry.outline_coords_list,
+                           outline = "black",
+                           fill = "black",
+                           tags = ("key", "scene"))
+        self.stimulus_image = None
+        if uses_image_stimuli:
+            self.stimulus_image = canvas.create_image(geometry.key_center[0],
+                                                      geometry.key_center[1],
+                                                      anchor = "center",
+                                                      tags = ("key", "scene"))
+        # Solid color for color experiments; a fine outline around the
+        # image (no fill) for PNG experiments
+        self.stimulus_oval = canvas.create_oval(geometry.key_coord_list,
+                                                outline = "black",
+                                                fill = "",
+                                                tags = ("key", "scene"))
+        canvas.create_oval(geometry.midpoint_coord_list,
+                           fill = "black",
+                           outline = "black",
+                           tags = ("key", "scene"))
+
+        self.hidden_patch = None
+        if on_hidden_patch_peck is not None:
+            self.hidden_patch = canvas.create_rectangle(0, 0, 0, 0,
+                                                        outline = "black",
+                                                        fill = "black",
+                                                        tags = ("hidden_patch", "scene"))
+
+        self.message = canvas.create_text(512, 374,
+                                          fill = "white",
+                                          font = "Times 25 italic bold",
+                                          tags = ("message", "scene"))
+        self.hide_all()
+
+    def place_hidden_patch(self, coords):
+        # The hidden patch location is picked once per session
+        if self.hidden_patch is not None:
+            self.canvas.coords(self.hidden_patch, *coords)
+            self.regions = region_map(coords)
+
+    def target_at(self, x, y):
+        # What a peck at x, y hits given what is shown: "iti_bkgrd", "bkgrd",
+        # "start_key", "key", "hidden_patch" or None (nothing shown there)
+        region = region_at(self.regions, x, y)
+        if region is None or self.phase is None:
+            return None
+        if self.phase == "ITI":
+            return "iti_bkgrd"
+        if self.phase == "start_signal":
+            return "start_key" if region in start_key_regions else "bkgrd"
+        if region == HIDDEN_PATCH and self.hidden_patch_shown:
+            return "hidden_patch"
+        return "key" if region in self.key_regions else "bkgrd"
+
+    def peck(self, event):
+        # The Canvas's one <Button-1> binding
+        target = self.target_at(event.x, event.y)
+        if target is not None:
+            self.handlers[target](event)
+
+    def hide_all(self):
+        # Blank screen; nothing can be pecked
+        self.canvas.itemconfigure("scene", state = "hidden")
+        self.phase = None
+        self.hidden_patch_shown = False
+
+    def show_message(self, text):
+        self.canvas.itemconfigure(self.message, text = text, state = "normal")
+
+    def show_ITI(self, text=None):
+        self.hide_all()
+        self.canvas.itemconfigure("iti_bkgrd", state = "normal")
+        self.phase = "ITI"
+        if text is not None:
+            self.show_message(text)
+
+    def show_start_signal(self):
+        self.hide_all()
+        self.canvas.itemconfigure("bkgrd", state = "normal")
+        self.canvas.itemconfigure("start_key", state = "normal")
+        self.phase = "start_signal"
+
+    def show_key(self, fill="", image=None, hidden_patch=False):
+        # Swaps in this trial's stimulus (a color, or a PhotoImage), then
+        # shows the background and key
+        self.hide_all()
+        self.canvas.itemconfigure(self.stimulus_oval, fill = fill)
+        self.canvas.itemconfigure("bkgrd", state = "normal")
+        self.canvas.itemconfigure("key", state = "normal")
+        self.phase = "key"
+        self.key_regions = key_regions
+        if self.stimulus_image is not None:
+            if image:
+                self.canvas.itemconfigure(self.stimulus_image, image = image)
+                self.key_regions = image_key_regions # The PNG's corners are key too
+            else:
+                self.canvas.itemconfigure(self.stimulus_image, state = "hidden")
+        if hidden_patch and self.hidden_patch is not None:
+            self.canvas.itemconfigure(self.hidden_patch, state = "normal")
+            self.hidden_patch_shown = True
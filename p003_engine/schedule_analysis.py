@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Megan C. & Cyrus K.
+
+Monte Carlo analysis of the reinforcement schedules, run offline (needs
+NumPy; nothing in a session imports this module). The outcome rules are
+those of outcomes.py, applied to whole arrays of trials at once:
+
+    Pavlovian      -- reinforced with probability p, pecks don't matter
+    RandomRatio    -- a 1-in-rr die per key peck; omission flips the outcome
+    VariableRatio  -- one requirement per trial, uniform over the ±15% (VR50)
+                      or ±30% band, against key + background pecks
+    FixedRatio     -- reinforced once the Nth key peck happens
+
+Two tables come out, both as (header, rows) so they can be printed or saved
+as .csv and compared across designs (experiments, conditions, subjects):
+
+    probability_table() -- P(reinforced) against the number of key pecks in
+                           a trial, simulated and exact
+    session_table()     -- reinforcers per session (mean, SD, 5th and 95th
+                           percentiles) against the bird's key peck rate,
+                           per trial type and in total
+
+Pecks per trial are Poisson around rate x trial duration, with the rate
+itself varying from trial to trial (gamma, coefficient of variation
+rate_cv), i.e., negative binomial counts. FR trials really last until the
+Nth peck; here they're counted over the same window as timed trials.
+
+    python -m p003_engine.schedule_analysis P003Fc/P003Fc_ExpProgram_RP.py Wario INS OMS
+"""
+from sys import argv
+
+import numpy as np
+
+from p003_engine.outcomes import FixedRatio, Pavlovian, RandomRatio, VariableRatio
+from p003_engine.tables import print_table
+
+
+def session_design(screen_class, subject_ID, condition=None):
+    # An experiment's trial plan, outcome policies and trial duration (s).
+    # potential_trial_assignments() and build_outcome_policies() only use the
+    # subject and condition, so the screen is made without opening a window.
+    screen = screen_class.__new__(screen_class)
+    screen.subject_ID = subject_ID
+    screen.condition = condition
+    return (screen.potential_trial_assignments(), screen.build_outcome_policies(),
+            screen.trial_timer_duration / 1000)
+
+
+def describe(policy):
+    # Short schedule label, e.g., "RR5 omission" or "VR50 (43-58)"
+    if isinstance(policy, Pavlovian):
+        return f"p = {policy.probability:g}"
+    if isinstance(policy, RandomRatio):
+        return f"RR{policy.rr_sched}" + (" omission" if policy.omission else "")
+    if isinstance(policy, VariableRatio):
+        return (f"VR{policy.vr_sched} ({policy.low}-{policy.high})"
+                + (" omission" if policy.omission else ""))
+    if isinstance(policy, FixedRatio):
+        return f"FR{policy.ratio}"
+    return type(policy).__name__
+
+
+def reinforced(policy, key_pecks, background_pecks, rng):
+    # trial_outcome() for whole arrays of trials: peck counts in, booleans out
+    key_pecks = np.asarray(key_pecks)
+    shape = np.broadcast(key_pecks, background_pecks).shape
+    if isinstance(policy, Pavlovian):
+        if policy.probability >= 1:
+            return np.ones(shape, dtype=bool)
+        if policy.probability <= 0:
+            return np.zeros(shape, dtype=bool)
+        return rng.random(shape) < policy.probability
+    if isinstance(policy, RandomRatio):
+        schedule_met = rng.random(shape) < 1.0 - (1.0 - 1.0 / policy.rr_sched) ** key_pecks
+        return schedule_met != policy.omission
+    if isinstance(policy, VariableRatio):
+        requirement = rng.integers(policy.low, policy.high + 1, size=shape)
+        return (key_pecks + background_pecks >= requirement) != policy.omission
+    if isinstance(policy, FixedRatio):
+        return np.broadcast_to(key_pecks >= policy.ratio, shape)
+    raise TypeError(f"No vectorized outcome rule for {type(policy).__name__}")
+
+
+def reinforcement_probability(policy, key_pecks, background_pecks=0):
+    # Exact P(reinforced) for the given peck counts
+    key_pecks = np.asarray(key_pecks, dtype=float)
+    if isinstance(policy, Pavlovian):
+        return np.full(key_pecks.shape, min(max(policy.probability, 0.0), 1.0))
+    if isinstance(policy, RandomRatio):
+        p = 1.0 - (1.0 - 1.0 / policy.rr_sched) ** key_pecks
+    elif isinstance(policy, VariableRatio):
+        # Share of the equally likely requirements that the pecks meet
+        n_requirements = policy.high - policy.low + 1
+        p = np.clip(key_pecks + background_pecks - policy.low + 1,
+                    0, n_requirements) / n_requirements
+    elif isinstance(policy, FixedRatio):
+        return (key_pecks >= policy.ratio).astype(float)
+    else:
+        raise TypeError(f"No exact outcome rule for {type(policy).__name__}")
+    return 1.0 - p if policy.omission else p
+
+
+def peck_counts(rate, seconds, shape, rng, rate_cv=0.0):
+    # Pecks per trial: Poisson around rate x seconds, with the rate drawn
+    # per trial from a gamma distribution (mean rate, CV rate_cv)
+    expected = rate * seconds
+    if rate_cv > 0 and expected > 0:
+        expected = rng.gamma(1.0 / rate_cv ** 2, expected * rate_cv ** 2, size=shape)
+    return rng.poisson(expected, size=shape)
+
+
+def probability_table(designs, key_pecks=(0, 1, 2, 3, 5, 10, 20, 35, 50, 75, 100),
+                      background_pecks=0, n_trials=100000, seed=None):
+    # designs: {label: (trial_types, policies, trial_seconds)}, e.g., from
+    # session_design(). One row per design, trial type and peck count.
+    rng = np.random.default_rng(seed)
+    header = ["Design", "TrialType", "Schedule", "KeyPecks", "Simulated", "Exact"]
+    rows = []
+    pecks = np.repeat(np.asarray(key_pecks), n_trials).reshape(len(key_pecks), n_trials)
+    for label, (trial_types, policies, trial_seconds) in designs.items():
+        for tt in dict.fromkeys(trial_types): # Each type once, in plan order
+            simulated = reinforced(policies[tt], pecks, background_pecks, rng).mean(axis=1)
+            exact = reinforcement_probability(policies[tt], key_pecks, background_pecks)
+            for n, p_sim, p_exact in zip(key_pecks, simulated, exact):
+                rows.append([label, tt, describe(policies[tt]), n,
+                             round(float(p_sim), 4), round(float(p_exact), 4)])
+    return header, rows
+
+
+def session_table(designs, key_rates=(0.1, 0.25, 0.5, 1.0, 2.0, 4.0), background_rate=0.0,
+                  rate_cv=0.5, n_sessions=10000, seed=None):
+    # Reinforcers per session for birds pecking the key at each of key_rates
+    # (pecks per second), per trial type and in total ("All")
+    rng = np.random.default_rng(seed)
+    header = ["Design", "KeyPecksPerSec", "TrialType", "Trials",
+              "MeanReinforcers", "SD", "P5", "P95"]
+    rows = []
+
+    def summary(label, rate, tt, n_trials, totals):
+        p5, p95 = np.percentile(totals, [5, 95])
+        rows.append([label, rate, tt, n_trials, round(float(totals.mean()), 3),
+                     round(float(totals.std()), 3), float(p5), float(p95)])
+
+    for label, (trial_types, policies, trial_seconds) in designs.items():
+        counts = {tt: trial_types.count(tt) for tt in trial_types}
+        for rate in key_rates:
+            session_totals = np.zeros(n_sessions, dtype=int)
+            for tt, n_trials in counts.items():
+                shape = (n_sessions, n_trials)
+                outcomes = reinforced(policies[tt],
+                                      peck_counts(rate, trial_seconds, shape, rng, rate_cv),
+                                      peck_counts(background_rate, trial_seconds, shape, rng, rate_cv),
+                                      rng)
+                totals = outcomes.sum(axis=1)
+                session_totals += totals
+                summary(label, rate, tt, n_trials, totals)
+            summary(label, rate, "All", len(trial_types), session_totals)
+    return header, rows
+
+
+if __name__ == '__main__':
+    # Compares the conditions given (e.g., INS OMS, or RR2 RR5 RR20) of one
+    # experiment for one subject
+    from p003_engine.simulation import load_experiment
+    screen_class = load_experiment(argv[1])
+    designs = {f"{screen_class.experiment_name} {condition or ''}".strip():
+               session_design(screen_class, argv[2], condition)
+               for condition in argv[3:] or [None]}
+    print_table(probability_table(designs))
+    print()
+    print_table(session_table(designs, background_rate = 0.1))
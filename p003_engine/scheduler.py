@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Megan C. & Cyrus K.
+
+Drift-free session timing. Chaining root.after(duration, ...) calls measures
+each interval from whenever the previous callback *actually* ran, so every
+bit of lateness (printing, drawing, writing data) is added onto the rest of
+the session. SessionClock instead keeps one monotonic origin per session
+and gives every timed event an absolute deadline:
+
+    deadline = anchor + duration
+
+where the anchor is the deadline of the event that scheduled it (not the
+time it happened to run). If a callback fires late, the next delay handed
+to Tk is shortened by the same amount, so lateness never accumulates.
+Events driven by a peck rather than a timer (the start signal, FR trials)
+re-anchor to the moment of the peck with mark().
+
+Every fired event is logged with its intended and actual session time
+(seconds since the origin), and can be written out with write_log().
+"""
+from csv import writer, QUOTE_MINIMAL
+from time import monotonic
+
+
+class SessionClock(object):
+    log_header = ["Event", "TrialNum", "IntendedTime", "ActualTime", "LatenessMs"]
+
+    def __init__(self, root, time_source=None):
+        self.root = root # Tk widget whose after() runs the callbacks
+        self.time_source = time_source or monotonic # Seconds, never going backwards
+        self.stopped = False
+        self.start()
+
+    def start(self, at=0.0):
+        # (Re)sets the session origin so that it is now session time at
+        # (0 unless a session is resumed); everything is timed from here
+        self.origin = self.time_source() - at
+        self.anchor = at # Intended time of the event currently running
+        self.log = []
+
+    def now(self):
+        # Seconds since the session origin (monotonic)
+        return self.time_source() - self.origin
+
+    def mark(self):
+        # Re-anchors to the current moment, for transitions caused by a peck
+        self.anchor = self.now()
+        return self.anchor
+
+    def after(self, delay_ms, callback, label=None, trial=None):
+        # Schedules callback for anchor + delay_ms, returning the Tk timer id
+        deadline = self.anchor + delay_ms / 1000
+        return self._arm(deadline, callback, label or callback.__name__, trial)
+
+    def cancel(self, timer_id):
+        if timer_id is not None:
+            self.root.after_cancel(timer_id)
+
+    def _arm(self, deadline, callback, label, trial):
+        remaining_ms = max(0, int(round((deadline - self.now()) * 1000)))
+        return self.root.after(remaining_ms,
+                               lambda: self._fire(deadline, callback, label, trial))
+
+    def stop(self):
+        # At the end of a session: timers still pending do nothing when they
+        # come due (the window, and its Tk timers, outlive the session)
+        self.stopped = True
+
+    def _fire(self, deadline, callback, label, trial):
+        if self.stopped:
+            return
+        actual = self.now()
+        if deadline - actual > 0.001:
+            # Tk timers are rounded to the ms; never run more than 1 ms early
+            self._arm(deadline, callback, label, trial)
+            return
+        self.log.append([label, trial, round(deadline, 6), round(actual, 6),
+                         round((actual - deadline) * 1000, 3)])
+        self.anchor = deadline
+        callback()
+
+    def lateness_summary(self):
+        # (number of events, mean lateness, max lateness) in ms
+        if not self.log:
+            return 0, 0.0, 0.0
+        lateness = [row[4] for row in self.log]
+        return len(lateness), sum(lateness) / len(lateness), max(lateness)
+
+    def write_log(self, file_path):
+        with open(file_path, 'w', newline='') as log_file:
+            log_writer = writer(log_file, quoting=QUOTE_MINIMAL)
+            log_writer.writerow(self.log_header)
+            log_writer.writerows(self.log)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Megan C. & Cyrus K.
+
+Quasi-random trial orders with a cap on runs. Every experiment wants its
+trial list shuffled so that no more than max_run trials from the same
+category happen back to back (e.g., never PAV, PAV, PAV, PAV). Categories
+are whatever key() returns for a trial code: the code itself by default,
+or a family such as the INS/OMS prefix in P003f.
+
+Shuffling the whole list and rejecting it until no run is too long is
+exactly uniform over the valid orders, but the acceptance rate falls off
+exponentially with session length and with fewer categories.
+constrained_shuffle() keeps that rejection sampler for the designs that
+actually run, and makes each attempt cheap:
+
+    1. The *categories* are dealt one trial at a time (an incremental
+       Fisher-Yates shuffle), and the attempt is abandoned as soon as a run
+       goes past max_run instead of after the whole list is shuffled and
+       scanned. Rejecting a bad prefix early doesn't change which orders
+       are accepted, so every valid order is still equally likely. The
+       session designs (54-180 trials) need from 1 to a few hundred
+       attempts, about a millisecond in all.
+    2. The trial codes inside each category are shuffled independently
+       and dealt back into that category's slots.
+
+Only if max_attempts attempts all fail (designs where valid orders are
+very rare, such as 1000 trials in 4 categories) does it fall back to
+building a valid order directly: a random category order is built one
+trial at a time, only ever picking a category that still leaves a valid
+way to finish the list, and is then mixed by ~3 n ln n random swaps and
+segment reversals, each kept only if every run stays within max_run. That
+fallback is O(n log n) regardless of how tight the constraint is, but it
+is only *approximately* uniform: the moves are symmetric, so the walk
+tends towards uniform, but a fixed number of moves from a greedy start
+doesn't reach it exactly (see benchmarks/bench_sequences.py).
+"""
+from math import log
+from random import choices, randrange, random, shuffle
+
+
+def _run_length(categories, position, max_run):
+    # Length of the run through position, counted no further than max_run + 1
+    category = categories[position]
+    start = position
+    while start > 0 and categories[start - 1] == category and position - start < max_run:
+        start -= 1
+    end = position
+    while end < len(categories) - 1 and categories[end + 1] == category and end - start < max_run:
+        end += 1
+    return end - start + 1
+
+
+def _can_finish(remaining, last, run, max_run):
+    # A category with c trials left can be split into at most (others + 1)
+    # runs of max_run, less whatever the current run has already used up
+    total = sum(remaining)
+    for category, count in enumerate(remaining):
+        room = max_run * (total - count + 1)
+        if category == last:
+            room -= run
+        if count > room:
+            return False
+    return True
+
+
+def _rejection_order(counts, max_run, max_attempts):
+    # A uniformly random valid category order, or None after max_attempts
+    # rejected attempts. Each attempt deals the categories one position at
+    # a time and stops at the first run longer than max_run.
+    n = sum(counts)
+    order = [category for category, count in enumerate(counts) for _ in range(count)]
+    for _ in range(max_attempts):
+        run = 0
+        for i in range(n):
+            j = i + int(random() * (n - i))
+            order[i], order[j] = order[j], order[i]
+            run = run + 1 if i and order[i] == order[i - 1] else 1
+            if run > max_run:
+                break
+        else:
+            return order
+    return None
+
+
+def _build_valid_order(counts, max_run):
+    remaining = list(counts)
+    last, run = None, 0
+    order = []
+    for _ in range(sum(counts)):
+        candidates, weights = [], []
+        for category, count in enumerate(remaining):
+            if count == 0 or (category == last and run >= max_run):
+                continue
+            next_run = run + 1 if category == last else 1
+            remaining[category] -= 1
+            if _can_finish(remaining, category, next_run, max_run):
+                candidates.append(category)
+                weights.append(count)
+            remaining[category] += 1
+        category = choices(candidates, weights)[0]
+        run = run + 1 if category == last else 1
+        last = category
+        remaining[category] -= 1
+        order.append(category)
+    return order
+
+
+def _mix(order, max_run, n_moves):
+    n = len(order)
+    for _ in range(n_moves):
+        i, j = randrange(n), randrange(n)
+        if i == j:
+            continue
+        if i > j:
+            i, j = j, i
+        if random() < 0.5:
+            if order[i] == order[j]:
+                continue
+            order[i], order[j] = order[j], order[i]
+            if (_run_length(order, i, max_run) > max_run
+                    or _run_length(order, j, max_run) > max_run):
+                order[i], order[j] = order[j], order[i]
+        else:
+            # Reversing order[i:j+1] keeps every neighbor pair inside the
+            # segment, so only the runs at its two ends can change
+            order[i:j + 1] = order[i:j + 1][::-1]
+            if (_run_length(order, i, max_run) > max_run
+                    or _run_length(order, j, max_run) > max_run):
+                order[i:j + 1] = order[i:j + 1][::-1]
+
+
+def constrained_shuffle(trial_codes, max_run, key=None, mixing=3.0, max_attempts=2000):
+    # Returns a new list with the same trial codes, in a random order where
+    # no more than max_run consecutive codes share the same key(code):
+    # uniformly random among those orders, unless max_attempts rejection
+    # attempts fail and the approximate fallback is used (see above).
+    # A list with only one key is returned as is; otherwise raises
+    # ValueError if no valid order exists.
+    if key is None:
+        key = lambda code: code
+    slots = {}
+    for code in trial_codes:
+        slots.setdefault(key(code), []).append(code)
+    groups = list(slots.values())
+    counts = [len(group) for group in groups]
+    n = len(trial_codes)
+    if len(groups) <= 1:
+        # Nothing to interleave (e.g., FR2-only sessions); keep the order
+        return list(trial_codes)
+    if not _can_finish(counts, None, 0, max_run):
+        raise ValueError(f"No order of these {n} trials keeps every run "
+                         f"to {max_run} or fewer")
+
+    order = _rejection_order(counts, max_run, max_attempts)
+    if order is None:
+        # Valid orders are too rare to draw by rejection
+        order = _build_valid_order(counts, max_run)
+        _mix(order, max_run, int(mixing * n * log(n)))
+
+    for group in groups:
+        shuffle(group)
+    return [groups[category].pop() for category in order]
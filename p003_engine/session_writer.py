@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Megan C. & Cyrus K.
+
+Streaming writer for the per-session data .csv files.
+
+The experiment programs used to reopen the session .csv with mode 'w' and
+rewrite the entire session_data_frame during every ITI, which makes the total
+amount of disk I/O grow with the square of the session length. The
+SessionWriter below keeps the file open for the whole session and only appends
+the rows that were added to the data frame since the last flush, so each ITI
+costs the same no matter how far into the session we are. Rows are serialized
+with the exact same csv.writer settings as before, so the finished file is
+byte-for-byte identical to the old full rewrite.
+"""
+from csv import writer, QUOTE_MINIMAL
+from os import fsync
+
+
+class SessionWriter(object):
+    # One SessionWriter exists per session data file. It remembers how many
+    # rows of the session_data_frame have already been written so that each
+    # flush only touches the new ones.
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.rows_written = 0 # Number of data frame rows already on disk
+        self.data_file = None # Opened lazily on the first flush
+        self.csv_writer = None
+
+    def flush(self, session_data_frame, sync=True):
+        # Appends every row of session_data_frame that hasn't been written
+        # yet. If sync is True (e.g., at trial boundaries) the OS buffers are
+        # also pushed to disk with fsync, so a power cut on the Pi can't lose
+        # a finished trial.
+        if self.data_file is None:
+            # Mode 'w' on the first open, just like the old full rewrite
+            # (or 'a' if the writer was closed and is being reused)
+            mode = 'a' if self.rows_written else 'w'
+            self.data_file = open(self.file_path, mode, newline='')
+            self.csv_writer = writer(self.data_file, quoting=QUOTE_MINIMAL)
+        new_rows = session_data_frame[self.rows_written:]
+        if new_rows:
+            self.csv_writer.writerows(new_rows)
+            self.rows_written += len(new_rows)
+        self.data_file.flush()
+        if sync:
+            fsync(self.data_file.fileno())
+        return len(new_rows)
+
+    def close(self):
+        # Closes the file handle (after the final flush at session end)
+        if self.data_file is not None:
+            self.data_file.close()
+            self.data_file = None
+            self.csv_writer = None
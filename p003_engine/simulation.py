@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Megan C. & Cyrus K.
+
+Headless, simulated sessions. run_session() runs an experiment's real
+MainScreen (trial plan, ITI -> build_keys -> calculate_trial_outcome loop,
+outcome policies, data writing) without a display or hardware:
+
+    - VirtualRoot stands in for the Tk window. Its after() timers run in
+      order on a virtual clock that jumps straight to the next one, so a
+      two-hour session takes milliseconds.
+    - VirtualCanvas keeps the onscreen items (see scene.py) and hands a
+      peck at (x, y) to the Canvas's <Button-1> binding, as Tk would.
+      TrialScene then classifies it with its region map (see regions.py),
+      so pecks reach the same handlers as on the touchscreen.
+    - A peck generator (e.g., PoissonPecker) plays the bird.
+
+Stimulus PNGs aren't decoded (there's nothing to show them on). The data
+.csv has exactly the same columns as a real session.
+
+    python -m p003_engine.simulation P003e/P003E_ExpProgram_RP.py Jagger RR5
+"""
+from heapq import heappop, heappush
+from importlib.util import module_from_spec, spec_from_file_location
+from os import makedirs, path as os_path
+from random import expovariate, gauss, random, seed as random_seed, uniform
+from sys import argv, modules
+
+from p003_engine import geometry
+from p003_engine.hardware import operant_box_version
+from p003_engine.main_screen import MainScreen
+
+
+class VirtualRoot(object):
+    # Just the parts of a Tk Toplevel that MainScreen uses
+    def __init__(self):
+        self.now = 0.0 # Virtual seconds
+        self.timers = [] # Heap of (due, id, callback)
+        self.cancelled = set()
+        self.next_id = 0
+        self.key_bindings = {}
+        self.destroyed = False
+        self.withdrawn = False
+
+    def time(self):
+        return self.now
+
+    def after(self, delay_ms, callback):
+        self.next_id += 1
+        heappush(self.timers, (self.now + delay_ms / 1000, self.next_id, callback))
+        return self.next_id
+
+    def after_cancel(self, timer_id):
+        self.cancelled.add(timer_id)
+
+    def bind(self, sequence, callback):
+        self.key_bindings[sequence] = callback
+
+    def unbind(self, sequence):
+        self.key_bindings.pop(sequence, None)
+
+    def press(self, sequence):
+        self.key_bindings[sequence](None)
+
+    def destroy(self):
+        self.destroyed = True
+
+    def withdraw(self):
+        self.withdrawn = True
+
+    def deiconify(self):
+        self.withdrawn = False
+
+    def title(self, *args): pass
+    def geometry(self, *args): pass
+    def attributes(self, *args): pass
+    def config(self, **kwargs): pass
+    def protocol(self, *args): pass
+
+    def run(self, max_time, crash=False):
+        # Runs timers in time order until the window is closed (destroyed,
+        # or hidden at the end of a session). If crash, just stops at
+        # max_time, as if the program had died there.
+        while self.timers and not (self.destroyed or self.withdrawn):
+            due, timer_id, callback = heappop(self.timers)
+            if timer_id in self.cancelled:
+                continue
+            if due > max_time:
+                if crash:
+                    return
+                raise RuntimeError(f"Session still running after {max_time} s")
+            self.now = max(self.now, due)
+            callback()
+
+
+class PeckEvent(object):
+    def __init__(self, x, y):
+        self.x, self.y = x, y
+
+
+class VirtualCanvas(object):
+    # Just the parts of a Tk Canvas that TrialScene uses, plus click(x, y)
+    def __init__(self):
+        self.items = [] # Bottom to top
+        self.on_click = None # The <Button-1> binding
+
+    def _create(self, kind, coords, options):
+        if len(coords) == 1:
+            coords = coords[0]
+        self.items.append({"kind": kind, "coords": list(coords), "state": "normal",
+                           "tags": tuple(options.get("tags", ())), "options": options})
+        return len(self.items) # Item ids start at 1, like Tk
+
+    def create_rectangle(self, *coords, **options):
+        return self._create("rectangle", coords, options)
+
+    def create_oval(self, *coords, **options):
+        return self._create("oval", coords, options)
+
+    def create_image(self, *coords, **options):
+        return self._create("image", coords, options)
+
+    def create_text(self, *coords, **options):
+        return self._create("text", coords, options)
+
+    def _find(self, tag_or_id):
+        if isinstance(tag_or_id, int):
+            return [self.items[tag_or_id - 1]]
+        return [item for item in self.items if tag_or_id in item["tags"]]
+
+    def itemconfigure(self, tag_or_id, state=None, **options):
+        for item in self._find(tag_or_id):
+            if state is not None:
+                item["state"] = state
+            item["options"].update(options)
+
+    def coords(self, tag_or_id, *coords):
+        for item in self._find(tag_or_id):
+            item["coords"] = list(coords)
+
+    def bind(self, sequence, callback):
+        self.on_click = callback
+
+    def delete(self, tag_or_id):
+        # Only delete("all") (a reused Canvas) is needed
+        self.items = []
+
+    def pack(self, **options): pass
+
+    def click(self, x, y):
+        # Delivers a peck at x, y, as Tk would (TrialScene works out what it hit)
+        if self.on_click is not None:
+            self.on_click(PeckEvent(x, y))
+
+
+class PoissonPecker(object):
+    # A bird pecking at random times (Poisson, rate pecks per second). Each
+    # peck lands on the key with probability on_key (scattered around the
+    # key center with SD spread px), otherwise anywhere on the screen.
+    # rate and on_key may also be functions of the MainScreen, e.g., to
+    # peck faster on some trial types.
+    def __init__(self, rate=1.0, on_key=0.8, spread=40):
+        self.rate = rate
+        self.on_key = on_key
+        self.spread = spread
+
+    def value(self, setting, screen):
+        return setting(screen) if callable(setting) else setting
+
+    def next_interval(self, screen):
+        return expovariate(max(self.value(self.rate, screen), 1e-6))
+
+    def next_location(self, screen):
+        if random() < self.value(self.on_key, screen):
+            x = gauss(geometry.key_center[0], self.spread)
+            y = gauss(geometry.key_center[1], self.spread)
+        else:
+            x = uniform(0, geometry.mainscreen_width)
+            y = uniform(0, geometry.mainscreen_height)
+        return (min(max(int(x), 0), geometry.mainscreen_width - 1),
+                min(max(int(y), 0), geometry.mainscreen_height - 1))
+
+
+def load_experiment(script_path):
+    # Imports an experiment script (their file names aren't valid module
+    # names) and returns its MainScreen subclass
+    module_name = "p003_" + os_path.splitext(os_path.basename(script_path))[0].replace(".", "_")
+    spec = spec_from_file_location(module_name, script_path)
+    module = module_from_spec(spec)
+    modules[module_name] = module
+    spec.loader.exec_module(module)
+    for value in vars(module).values():
+        if (isinstance(value, type) and issubclass(value, MainScreen)
+                and value.__module__ == module_name):
+            return value
+    raise ValueError(f"No MainScreen subclass in {script_path}")
+
+
+class HeadlessMixin(object):
+    # Mixed in ahead of an experiment's MainScreen subclass by run_session()
+    console_verbosity = "silent"
+    sync_data_file = False # Simulated data doesn't need to survive a power cut
+
+    @property
+    def session_time_source(self):
+        # Virtual time (also of a window reused from an earlier session)
+        return self.root.time
+
+    def build_window(self):
+        self.root = VirtualRoot()
+        self.mastercanvas = VirtualCanvas()
+
+    def load_stimulus_images(self, key_images=None, decoding=None):
+        # Nothing to display, so the PNGs are only checked to exist
+        stimuli_folder = os_path.join(self.experiment_directory, "stimuli")
+        for tt, fname in self.stimulus_assignments_dict.items():
+            if not os_path.exists(os_path.join(stimuli_folder, fname)):
+                raise FileNotFoundError(os_path.join(stimuli_folder, fname))
+        self.stimulus_images = dict(self.stimulus_assignments_dict)
+
+    def peck_loop(self, pecker):
+        # Schedules the bird's next peck, then delivers it wherever it lands
+        def peck():
+            if self.session_ended: # The bird is out of the box
+                return
+            self.mastercanvas.click(*pecker.next_location(self))
+            self.root.after(pecker.next_interval(self) * 1000, peck)
+        self.root.after(pecker.next_interval(self) * 1000, peck)
+
+
+headless_classes = {}
+
+
+def run_session(screen_class, subject_ID, condition=None, pecker=None,
+                data_folder=None, seed=None, max_session_time=24 * 3600, resume=None,
+                crash_after=None, preflight=None, chamber=None):
+    # Runs one full simulated session and returns the finished MainScreen
+    # (its session_data_frame holds every event). If data_folder is given,
+    # the data .csv is written to data_folder/subject_ID/ as usual. resume:
+    # an unfinished session to continue (see journal.find_resumable).
+    # preflight: the session plan built beforehand (see MainScreen.preflight).
+    # chamber: the window of an earlier session to run this one in (its
+    # screen.chamber), as the control panel does.
+    # crash_after: session seconds after which the program "dies", leaving
+    # its journal behind.
+    if operant_box_version:
+        raise RuntimeError("Simulated sessions are meant for machines without box hardware")
+    if seed is not None:
+        random_seed(seed)
+    if screen_class not in headless_classes:
+        headless_classes[screen_class] = type(f"Headless{screen_class.__name__}",
+                                              (HeadlessMixin, screen_class), {})
+    if data_folder is not None:
+        makedirs(os_path.join(data_folder, subject_ID), exist_ok=True)
+    experiment_directory = os_path.dirname(
+        os_path.abspath(modules[screen_class.__module__].__file__))
+
+    screen = headless_classes[screen_class](subject_ID, data_folder is not None,
+                                            data_folder, experiment_directory, condition,
+                                            resume = resume, preflight_plan = preflight,
+                                            chamber = chamber)
+    screen.peck_loop(pecker or PoissonPecker())
+    screen.root.press("<space>")
+    if crash_after is not None:
+        screen.root.run(crash_after, crash = True)
+        if screen.journal is not None:
+            screen.journal.close(remove_file = False) # Only what hit the disk is left
+        return screen
+    screen.root.run(max_session_time)
+    return screen
+
+
+if __name__ == '__main__':
+    from time import perf_counter
+    screen_class = load_experiment(argv[1])
+    t0 = perf_counter()
+    screen = run_session(screen_class, argv[2], argv[3] if len(argv) > 3 else None,
+                         data_folder = "data")
+    print(f"{screen.current_trial_counter} trials, {len(screen.session_data_frame) - 1} events, "
+          f"{screen.root.now / 60:.1f} simulated minutes in {(perf_counter() - t0) * 1000:.0f} ms")
+    print(f"Data file: {screen.session_writer.file_path}")
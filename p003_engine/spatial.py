@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Megan C. & Cyrus K.
+
+Spatial variability of pecks, run offline over the .columns copies of the
+session files (see columnar.py; needs NumPy).
+
+load_pecks() gathers the x, y of every peck event (key_peck,
+background_peck, ITI_peck and hidden_patch_peck by default) from any number
+of sessions into flat arrays, with the session, subject, trial number, trial
+type and event of each peck. dispersion() then groups them (e.g., per trial,
+or per subject and trial type) and computes, for every group at once:
+
+    Pecks                  -- number of pecks
+    CentroidX, CentroidY   -- mean peck location (px)
+    SDX, SDY               -- standard deviations of x and y (px)
+    EllipseMajorSD/MinorSD -- semi-axes of the 1-SD ellipse (px)
+    EllipseAngle           -- of the major axis, degrees counterclockwise
+                              from +x as seen on the screen (y points down)
+    EllipseArea            -- pi x major x minor (px^2)
+    MeanDistanceToKey      -- mean distance to the key center (512, 384)
+    GridEntropy            -- Shannon entropy (bits) of the pecks over a grid
+                              of grid_cell px squares (0: all in one cell)
+
+SDs use n - 1, so groups with a single peck have NaN SDs.
+
+    python -m p003_engine.spatial ~/Desktop/Data/P003Fc_data [subject trial_type ...]
+"""
+from os import path as os_path
+from sys import argv
+
+import numpy as np
+
+from p003_engine import geometry
+from p003_engine.columnar import load_events
+from p003_engine.tables import print_table
+
+peck_events = ["key_peck", "background_peck", "ITI_peck", "hidden_patch_peck"]
+grid_cell = 64 # px; a 16 x 12 grid on the 1024 x 768 screen
+
+metric_columns = ["Pecks", "CentroidX", "CentroidY", "SDX", "SDY", "EllipseMajorSD",
+                  "EllipseMinorSD", "EllipseAngle", "EllipseArea", "MeanDistanceToKey",
+                  "GridEntropy"]
+
+
+def load_pecks(columnar_paths, events=peck_events):
+    # Every peck with coordinates of the given events, as returned by
+    # columnar.load_events(): (pecks, labels)
+    data, labels = load_events(columnar_paths, events)
+    keep = ~(np.isnan(data["x"]) | np.isnan(data["y"]))
+    return {name: values[keep] for name, values in data.items()}, labels
+
+
+def group_ids(data, by):
+    # Numbers the distinct combinations of the by columns' values. Returns
+    # (group of each row, {column: value of each group}, number of groups).
+    # Each combination becomes one integer (mixed radix), which np.unique
+    # sorts far faster than the rows of a 2-D array.
+    combined = np.zeros(len(next(iter(data.values()))), dtype=np.int64)
+    lows, spans = [], []
+    for name in by:
+        values = data[name].astype(np.int64)
+        lows.append(int(values.min()) if len(values) else 0)
+        spans.append(int(values.max()) - lows[-1] + 1 if len(values) else 1)
+        combined = combined * spans[-1] + (values - lows[-1])
+    combined_keys, group = np.unique(combined, return_inverse=True)
+    n_groups = len(combined_keys)
+    group_keys = {}
+    for name, low, span in reversed(list(zip(by, lows, spans))):
+        combined_keys, group_keys[name] = np.divmod(combined_keys, span)
+        group_keys[name] += low
+    return group.ravel(), {name: group_keys[name] for name in by}, n_groups
+
+
+def dispersion(pecks, by=("session", "trial"), center=geometry.key_center, cell=grid_cell):
+    # Spatial metrics of every group of pecks sharing the values of the
+    # columns in by; returns {column: array}, the group's by values first
+    x, y = pecks["x"], pecks["y"]
+    group, group_keys, n_groups = group_ids(pecks, by)
+
+    def group_sum(weights):
+        return np.bincount(group, weights, minlength=n_groups)
+
+    n = group_sum(None)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        centroid_x, centroid_y = group_sum(x) / n, group_sum(y) / n
+        # Deviations from the group centroid, so large coordinates don't cost precision
+        dx, dy = x - centroid_x[group], y - centroid_y[group]
+        var_x = group_sum(dx * dx) / (n - 1)
+        var_y = group_sum(dy * dy) / (n - 1)
+        cov_xy = group_sum(dx * dy) / (n - 1)
+        var_x[n < 2] = var_y[n < 2] = cov_xy[n < 2] = np.nan
+
+        # Eigenvalues/vector of the 2 x 2 covariance matrix give the SD ellipse
+        half_sum, half_difference = (var_x + var_y) / 2, (var_x - var_y) / 2
+        radius = np.sqrt(half_difference ** 2 + cov_xy ** 2)
+        major, minor = np.sqrt(half_sum + radius), np.sqrt(np.maximum(half_sum - radius, 0))
+        # Screen y points down, so flip it for a counterclockwise angle
+        angle = np.degrees(0.5 * np.arctan2(-2 * cov_xy, var_x - var_y))
+
+        distance = np.hypot(x - center[0], y - center[1])
+
+        # Entropy over grid cells: count pecks per (group, cell) pair
+        columns = -(-geometry.mainscreen_width // cell)
+        n_cells = columns * -(-geometry.mainscreen_height // cell)
+        cells = (np.clip(y, 0, geometry.mainscreen_height - 1) // cell * columns
+                 + np.clip(x, 0, geometry.mainscreen_width - 1) // cell).astype(np.int64)
+        pairs, pair_counts = np.unique(group * n_cells + cells, return_counts=True)
+        pair_group = pairs // n_cells
+        share = pair_counts / n[pair_group]
+        entropy = np.bincount(pair_group, -share * np.log2(share), minlength=n_groups)
+
+    metrics = {name: group_keys[name] for name in by}
+    metrics.update(zip(metric_columns, [
+        n.astype(np.int64), centroid_x, centroid_y, np.sqrt(var_x), np.sqrt(var_y),
+        major, minor, angle, np.pi * major * minor, group_sum(distance) / n, entropy]))
+    return metrics
+
+
+def metrics_table(metrics, labels, digits=2):
+    # (header, rows) of dispersion() results, with ids turned back into labels
+    header = list(metrics)
+    rows = []
+    columns = [labels[name] if name in labels else None for name in header]
+    for values in zip(*metrics.values()):
+        rows.append([column[value] if column is not None
+                     else round(float(value), digits) if isinstance(value, np.floating)
+                     else int(value)
+                     for value, column in zip(values, columns)])
+    return header, rows
+
+
+if __name__ == '__main__':
+    # Metrics per group (default: per subject and trial type) over every
+    # session in a data folder, converting sessions to .columns as needed
+    from p003_engine.columnar import archive_paths
+    pecks, labels = load_pecks(archive_paths(os_path.expanduser(argv[1])))
+    print_table(metrics_table(dispersion(pecks, by = argv[2:] or ["subject", "trial_type"]),
+                              labels))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Megan C. & Cyrus K.
+
+Disk cache of stimulus PNGs, already converted to RGBA and resized to the
+key (192 x 192 px). Decoding and LANCZOS-resampling every PNG takes a
+noticeable moment on the Pis right after the spacebar is pressed; with the
+cache, every session after the first just reads raw pixels back.
+
+Cached files live in a ".cache" folder next to the PNGs and are named after
+a SHA-256 of the PNG's contents plus the size and resampling settings, so
+editing or replacing a stimulus (even under the same file name) simply
+misses the cache and builds a fresh entry. Stale entries are harmless and
+can be deleted at any time.
+
+The cache is filled on first use, or ahead of time with:
+
+    python -m p003_engine.stimulus_cache P003Fc/stimuli [P003Fb/stimuli ...]
+"""
+from hashlib import sha256
+from os import listdir, makedirs, path as os_path, replace
+from sys import argv
+
+cache_version = 1 # Bump if the way images are prepared ever changes
+cache_folder_name = ".cache"
+
+
+def cache_key(png_bytes, size):
+    digest = sha256(f"v{cache_version}|RGBA|LANCZOS|{size}|".encode())
+    digest.update(png_bytes)
+    return digest.hexdigest()
+
+
+def load_key_image(png_path, size):
+    # Returns (RGBA PIL image of size x size, True if it came from the cache).
+    # PIL is only needed by the image-based experiments.
+    from PIL import Image
+    with open(png_path, "rb") as png_file:
+        png_bytes = png_file.read()
+    cache_folder = os_path.join(os_path.dirname(png_path), cache_folder_name)
+    cache_path = os_path.join(cache_folder, cache_key(png_bytes, size) + ".rgba")
+    n_bytes = size * size * 4
+
+    try:
+        with open(cache_path, "rb") as cache_file:
+            pixels = cache_file.read()
+        if len(pixels) == n_bytes:
+            return Image.frombytes("RGBA", (size, size), pixels), True
+    except OSError:
+        pass # Not cached yet
+
+    pil_img = (
+        Image.open(png_path)          # original file
+             .convert("RGBA")         # keep transparency if any
+             .resize((size, size), Image.LANCZOS)
+    )
+    try:
+        # Write to a temporary file first so a half-written entry is never read
+        makedirs(cache_folder, exist_ok=True)
+        temp_path = f"{cache_path}.tmp"
+        with open(temp_path, "wb") as cache_file:
+            cache_file.write(pil_img.tobytes())
+        replace(temp_path, cache_path)
+    except OSError as error:
+        print(f"Could not cache {png_path}: {error}") # Still usable, just slower
+    return pil_img, False
+
+
+def prebuild(stimuli_folder, size):
+    # Fills the cache for every PNG in a folder; returns the number built
+    built = 0
+    for fname in sorted(listdir(stimuli_folder)):
+        if fname.lower().endswith(".png"):
+            _, cached = load_key_image(os_path.join(stimuli_folder, fname), size)
+            built += not cached
+            print(f"{fname:>20} | {'cached' if cached else 'built'}")
+    return built
+
+
+if __name__ == '__main__':
+    from p003_engine import geometry
+    for folder in argv[1:]:
+        print(f"{folder}: {prebuild(folder, geometry.key_pixels)} new cache entries")
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Megan C. & Cyrus K.
+
+Result tables of the offline analyses (schedule_analysis.py, spatial.py...).
+A table is a (header, rows) pair: a list of column names and a list of
+rows, each a list of values in header order.
+"""
+from csv import QUOTE_MINIMAL, writer
+
+
+def print_table(table):
+    header, rows = table
+    widths = [max(len(str(value)) for value in column) for column in zip(header, *rows)]
+    for row in [header] + rows:
+        print(" | ".join(f"{str(value):>{width}}" for value, width in zip(row, widths)))
+
+
+def save_table(table, file_path):
+    header, rows = table
+    with open(file_path, 'w', newline='') as data_file:
+        table_writer = writer(data_file, delimiter=',', quotechar='"', quoting=QUOTE_MINIMAL)
+        table_writer.writerow(header)
+        table_writer.writerows(rows)
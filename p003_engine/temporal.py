@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Megan C. & Cyrus K.
+
+Temporal variability of responding, run offline over the .columns copies of
+the session files (see columnar.py; needs NumPy). Times come from the
+TrialTime column, i.e., seconds since the end of the trial's ITI.
+
+load_trials() gathers the responses (key pecks by default) and the finished
+trials (one reinforced_trial/nonreinforced_trial row each, so trials without
+a single response still count) of any number of sessions. trial_metrics()
+then computes, for every trial at once:
+
+    Responses              -- number of responses
+    Latency                -- TrialTime of the first response
+    IRTs, MeanIRT, SDIRT   -- inter-response times within the trial
+    CVIRT                  -- SDIRT / MeanIRT
+    Bouts                  -- runs of responses separated by IRTs > bout_gap
+    MeanBoutLength         -- responses per bout
+    Pauses, MeanPause      -- the IRTs > bout_gap
+    Rate<a>-<b>s           -- responses/s in each bin of the trial window
+
+and summary() pools them per group of trials (e.g., subject and trial type):
+means over trials, except that the IRT statistics are taken over all the
+group's IRTs together. SDs use n - 1.
+
+    python -m p003_engine.temporal ~/Desktop/Data/P003e_data [subject trial_type ...]
+"""
+from os import path as os_path
+from sys import argv
+
+import numpy as np
+
+from p003_engine.columnar import load_events
+from p003_engine.spatial import group_ids
+from p003_engine.tables import print_table
+
+response_events = ["key_peck"]
+outcome_events = ["reinforced_trial", "nonreinforced_trial"]
+trial_seconds = 10.0 # MainScreen.trial_timer_duration
+bin_seconds = 1.0
+bout_gap = 1.0 # s; a longer IRT ends a bout
+
+trial_columns = ["session", "subject", "trial", "trial_type", "reinforced"]
+
+
+def load_trials(columnar_paths, responses=response_events):
+    # Returns (responses, trials, labels): responses as from
+    # columnar.load_events(), trials with one entry per finished trial
+    # (trial_columns), sorted by session and trial
+    data, labels = load_events(columnar_paths, list(responses) + outcome_events)
+    is_outcome = data["event"] >= len(responses)
+    trials = {name: data[name][is_outcome] for name in trial_columns[:-1]}
+    trials["reinforced"] = data["event"][is_outcome] == len(responses)
+    order = np.lexsort((trials["trial"], trials["session"]))
+    trials = {name: values[order] for name, values in trials.items()}
+    return ({name: values[~is_outcome] for name, values in data.items()}, trials, labels)
+
+
+def bin_labels(window=trial_seconds, width=bin_seconds):
+    edges = np.arange(0, window + width / 2, width)
+    return [f"Rate{start:g}-{end:g}s" for start, end in zip(edges[:-1], edges[1:])]
+
+
+def response_times(responses, trials):
+    # (trial index, TrialTime) of every response, sorted by trial then time.
+    # Responses of unfinished trials (e.g., the session was stopped) are dropped.
+    span = int(max(trials["trial"].max(initial=0), responses["trial"].max(initial=0))) + 1
+    trial_keys = trials["session"].astype(np.int64) * span + trials["trial"]
+    response_keys = responses["session"].astype(np.int64) * span + responses["trial"]
+    index = np.minimum(np.searchsorted(trial_keys, response_keys), max(len(trial_keys) - 1, 0))
+    matched = (trial_keys[index] == response_keys) if len(trial_keys) else index < 0
+    trial, time = index[matched], responses["trial_time"][matched]
+    # Rows are written as they happen, so this is nearly always in order already
+    in_order = np.all((trial[1:] > trial[:-1])
+                      | ((trial[1:] == trial[:-1]) & (time[1:] >= time[:-1])))
+    if not in_order:
+        order = np.lexsort((time, trial))
+        trial, time = trial[order], time[order]
+    return trial, time
+
+
+def trial_metrics(responses, trials, window=trial_seconds, width=bin_seconds, gap=bout_gap,
+                  times=None):
+    # Metrics of every trial; returns {column: array}, trial_columns first.
+    # times: response_times(responses, trials), if already worked out.
+    n_trials = len(trials["trial"])
+    trial, time = times or response_times(responses, trials)
+    irts, irt_trial = irt_list(trial, time)
+
+    def trial_sum(values, index):
+        return np.bincount(index, values, minlength=n_trials)
+
+    n = trial_sum(None, trial).astype(np.int64)
+    latency = np.full(n_trials, np.nan)
+    first = np.r_[True, trial[1:] != trial[:-1]] if len(trial) else np.zeros(0, dtype=bool)
+    latency[trial[first]] = time[first]
+
+    n_irts = np.maximum(n - 1, 0)
+    is_pause = irts > gap
+    n_pauses = trial_sum(is_pause, irt_trial).astype(np.int64)
+    bouts = np.where(n > 0, n_pauses + 1, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_irt, sd_irt = mean_sd(irts, irt_trial, n_irts)
+        metrics = {name: values for name, values in trials.items()}
+        metrics.update({
+            "Responses": n,
+            "Latency": latency,
+            "IRTs": n_irts,
+            "MeanIRT": mean_irt,
+            "SDIRT": sd_irt,
+            "CVIRT": sd_irt / mean_irt,
+            "Bouts": bouts,
+            "MeanBoutLength": n / bouts,
+            "Pauses": n_pauses,
+            "MeanPause": trial_sum(np.where(is_pause, irts, 0.0), irt_trial) / n_pauses,
+            })
+
+    # Responses per bin of the trial window
+    labels = bin_labels(window, width)
+    in_window = (time >= 0) & (time < window)
+    cells = trial[in_window] * len(labels) + (time[in_window] // width).astype(np.int64)
+    counts = np.bincount(cells, minlength=n_trials * len(labels)).reshape(n_trials, len(labels))
+    metrics.update(zip(labels, (counts / width).T))
+    return metrics
+
+
+def irt_list(trial, time):
+    # Every IRT, and the trial it belongs to, from sorted response times
+    same_trial = trial[1:] == trial[:-1]
+    return (time[1:] - time[:-1])[same_trial], trial[1:][same_trial]
+
+
+def mean_sd(values, group, n):
+    # Mean and SD (n - 1) of values per group, given each group's count n
+    n_groups = len(n)
+    mean = np.bincount(group, values, minlength=n_groups) / n
+    deviations = values - mean[group]
+    sd = np.sqrt(np.bincount(group, deviations * deviations, minlength=n_groups) / (n - 1))
+    sd[n < 2] = np.nan
+    return mean, sd
+
+
+def summary(responses, trials, by=("subject", "trial_type"), window=trial_seconds,
+            width=bin_seconds, gap=bout_gap):
+    # Per group of trials: means of the trial metrics, pooled IRT statistics
+    trial, time = response_times(responses, trials)
+    per_trial = trial_metrics(responses, trials, window, width, gap, (trial, time))
+    group, group_keys, n_groups = group_ids(trials, by)
+    irts, irt_trial = irt_list(trial, time)
+    irt_group = group[irt_trial]
+
+    def group_mean(values):
+        # Mean over the group's trials where the value exists
+        has_value = ~np.isnan(values)
+        return (np.bincount(group[has_value], values[has_value], minlength=n_groups)
+                / np.bincount(group[has_value], minlength=n_groups))
+
+    n_trials = np.bincount(group, minlength=n_groups)
+    n_irts = np.bincount(irt_group, minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_irt, sd_irt = mean_sd(irts, irt_group, n_irts)
+        metrics = dict(group_keys)
+        metrics.update({
+            "Trials": n_trials,
+            "ReinforcedShare": group_mean(per_trial["reinforced"].astype(np.float64)),
+            "MeanResponses": group_mean(per_trial["Responses"].astype(np.float64)),
+            "MeanLatency": group_mean(per_trial["Latency"]),
+            "IRTs": n_irts,
+            "MeanIRT": mean_irt,
+            "SDIRT": sd_irt,
+            "CVIRT": sd_irt / mean_irt,
+            "MeanBouts": group_mean(per_trial["Bouts"].astype(np.float64)),
+            "MeanBoutLength": group_mean(per_trial["MeanBoutLength"]),
+            "MeanPause": np.bincount(irt_group, np.where(irts > gap, irts, 0.0), minlength=n_groups)
+                         / np.bincount(irt_group, irts > gap, minlength=n_groups),
+            })
+        for label in bin_labels(window, width):
+            metrics[label] = group_mean(per_trial[label])
+    return metrics
+
+
+if __name__ == '__main__':
+    # Summary per group (default: per subject and trial type) over every
+    # session in a data folder, converting sessions to .columns as needed
+    from p003_engine.columnar import archive_paths
+    from p003_engine.spatial import metrics_table
+    responses, trials, labels = load_trials(archive_paths(os_path.expanduser(argv[1])))
+    print_table(metrics_table(summary(responses, trials, by = argv[2:] or ["subject", "trial_type"]),
+                              labels))
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 2026
+
+@author: Megan C. & Cyrus K.
+
+Touchscreen input in front of the peck handlers. The boxes' touchscreens
+can report one peck as several <Button-1> events a few ms apart, and every
+one of them used to be counted and written as a peck of its own.
+
+TouchFilter timestamps every raw event and merges the ones that land within
+merge_ms and merge_px of the last peck that was kept: those are only logged,
+and the handler (key_press, background_press...) isn't called. Events carry
+their own timestamp (Tk's event.time, in ms, taken when the screen reported
+the touch), so a burst that Tk gets to late isn't merged by mistake; events
+without one (simulated pecks) use the session time instead. merge_ms = 0
+keeps every event.
+
+Every raw event is logged, kept or not, and can be written out next to the
+session data with write_log() (one row per event, with the trial it came in
+and whether it was merged as a duplicate).
+"""
+from csv import writer, QUOTE_MINIMAL
+from time import monotonic
+
+
+class TouchFilter(object):
+    log_header = ["SessionTime", "EventTimeMs", "Xcord", "Ycord", "Target", "TrialNum",
+                  "Duplicate"]
+
+    def __init__(self, merge_ms=40, merge_px=20, session_time=None, trial=None):
+        self.merge_s = merge_ms / 1000
+        self.merge_px_squared = merge_px ** 2
+        self.session_time = session_time or monotonic # Seconds, for the log
+        self.trial = trial or (lambda: "NA") # Trial number, for the log
+        self.last_kept = None # (time in s, x, y) of the last peck that was kept
+        self.log = []
+        self.raw_count = 0
+        self.duplicate_count = 0
+
+    def is_duplicate(self, touch_time, x, y):
+        # Within merge_ms and merge_px of the last peck kept
+        if self.last_kept is None:
+            return False
+        kept_time, kept_x, kept_y = self.last_kept
+        return (0 <= touch_time - kept_time < self.merge_s
+                and (x - kept_x) ** 2 + (y - kept_y) ** 2 <= self.merge_px_squared)
+
+    def handler(self, target, handler):
+        # Returns the event handler to bind instead of handler: it calls
+        # handler(event) only for events that aren't duplicates
+        def on_touch(event):
+            now = self.session_time()
+            event_time = getattr(event, "time", None) # Tk events only
+            touch_time = event_time / 1000 if isinstance(event_time, int) else now
+            duplicate = self.is_duplicate(touch_time, event.x, event.y)
+            self.raw_count += 1
+            self.log.append([round(now, 6), "NA" if event_time is None else event_time,
+                             event.x, event.y, target, self.trial(), duplicate])
+            if duplicate:
+                self.duplicate_count += 1
+                return
+            self.last_kept = (touch_time, event.x, event.y)
+            handler(event)
+        return on_touch
+
+    def write_log(self, file_path):
+        with open(file_path, 'w', newline='') as log_file:
+            log_writer = writer(log_file, quoting=QUOTE_MINIMAL)
+            log_writer.writerow(self.log_header)
+            log_writer.writerows(self.log)